@@ -0,0 +1,289 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from app.database import SessionLocal
+from app.models import Tweet, TwitterUser, HoaxAnalysis, AnalysisSession
+from app.services.twitter_service import TwitterService
+from app.services.openai_service import OpenAIService
+from app.services.brave_search_service import BraveSearchService
+from app.services.bot_detection_service import BotDetectionService, detect_bots_batch
+from app.services.bot_score_cache import BotScoreCache
+from app.services.network_analysis_service import run_network_analysis
+from app.services.pdf_service import generate_hoax_report
+from app.pipeline import StagePipeline
+from app.executors import run_io, run_cpu
+from app.progress import progress_tracker
+from app import job_queue
+from app.config import config
+
+# Initialize services
+twitter_service = TwitterService(use_real_api=False)  # Set True untuk API asli
+openai_service = OpenAIService()
+brave_search_service = BraveSearchService(use_real_api=False)  # Set True untuk API asli
+bot_detection_service = BotDetectionService()
+bot_score_cache = BotScoreCache(config.BOT_SCORE_CACHE_TTL, config.BOT_SCORE_DRIFT_THRESHOLD)
+
+def build_analysis_pipeline(session_id: str, tweet_url: str, tweet_data: Dict[str, Any], user_data: Dict[str, Any],
+                            on_hoax_partial: Optional[Callable[[Dict[str, Any]], None]] = None) -> StagePipeline:
+    """Susun DAG tahap analisis yang bergantung hanya pada data tweet.
+
+    Nama file laporan dan visualisasi memuat session_id karena beberapa
+    worker bisa menyelesaikan analisis pada detik yang sama.
+    """
+    tweet_text = tweet_data.get('text', '')
+    output_name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{session_id}"
+    pipeline = StagePipeline()
+    
+    async def hoax_stage(results):
+        return await openai_service.analyze_hoax_async(tweet_text, user_data, on_hoax_partial, tweet_data.get('tweet_id'))
+    
+    async def bot_stage(results):
+        # Akun yang sering muncul dan profilnya tidak berubah memakai skor tersimpan
+        cached_result = await run_io(bot_score_cache.get, user_data)
+        if cached_result:
+            return cached_result
+        return await run_io(bot_detection_service.detect_bot, user_data)
+    
+    async def fact_check_stage(results):
+        return await brave_search_service.fact_check_tweet_async(tweet_text)
+    
+    async def network_bot_stage(results):
+        network_data = await run_io(twitter_service.get_tweet_network_data, tweet_data.get('tweet_id'))
+        nodes = network_data.get('nodes', [])
+        profiles, bot_results = await score_network_bots([node['id'] for node in nodes])
+        
+        # Probabilitas per node dipakai analisis jaringan untuk bot_influence
+        for node in nodes:
+            if node['id'] in bot_results:
+                node['bot_probability'] = bot_results[node['id']]['bot_probability']
+        return network_data, profiles, bot_results
+    
+    async def network_stage(results):
+        network_data = results['network_bots'][0]
+        network_analysis, visualization_path, influence_chart_path = await run_cpu(
+            run_network_analysis, network_data,
+            f"visualizations/network_{output_name}.html",
+            f"visualizations/influence_{output_name}.html"
+        )
+        return network_data, network_analysis, visualization_path, influence_chart_path
+    
+    async def pdf_stage(results):
+        analysis_data = {
+            'tweet_url': tweet_url,
+            'tweet_data': tweet_data,
+            'hoax_analysis': results['hoax_analysis'],
+            'bot_detection': results['bot_detection'],
+            'fact_check_results': results['fact_check'],
+            'network_analysis': results['network'][1]
+        }
+        return await run_cpu(generate_hoax_report, analysis_data, f"reports/hoax_analysis_{output_name}.pdf")
+    
+    pipeline.add_stage('hoax_analysis', hoax_stage, progress=30)
+    pipeline.add_stage('bot_detection', bot_stage, progress=5)
+    pipeline.add_stage('fact_check', fact_check_stage, progress=15)
+    pipeline.add_stage('network_bots', network_bot_stage, progress=10)
+    pipeline.add_stage('network', network_stage, depends_on=['network_bots'], progress=15)
+    pipeline.add_stage(
+        'pdf_report', pdf_stage,
+        depends_on=['hoax_analysis', 'bot_detection', 'fact_check', 'network'],
+        progress=25
+    )
+    
+    return pipeline
+
+async def score_network_bots(user_ids: List[str]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Deteksi bot untuk semua peserta jaringan.
+    
+    Profil diambil sekaligus, skor tersimpan yang masih berlaku dipakai ulang,
+    dan sisanya dinilai per potongan secara paralel di process pool.
+    Mengembalikan profil dan hasil deteksi, keduanya per user_id.
+    """
+    profiles = await run_io(twitter_service.get_user_profiles, user_ids)
+    users_data = list(profiles.values())
+    bot_results = await run_io(bot_score_cache.get_many, users_data)
+    
+    unscored = [user for user in users_data if user['user_id'] not in bot_results]
+    chunk_size = max(1, config.NETWORK_BOT_CHUNK_SIZE)
+    chunks = [unscored[start:start + chunk_size] for start in range(0, len(unscored), chunk_size)]
+    for chunk_results in await asyncio.gather(*(run_cpu(detect_bots_batch, chunk) for chunk in chunks)):
+        for result in chunk_results:
+            bot_results[result['user_id']] = result
+    
+    return profiles, bot_results
+
+async def close_service_clients():
+    """Tutup pool koneksi HTTP milik event loop yang sedang berjalan"""
+    await brave_search_service.aclose()
+
+async def run_full_analysis(session_id: str, tweet_url: str, worker_id: str):
+    """Jalankan analisis lengkap.
+
+    Pipeline membuka session database sendiri; progress disimpan di memori
+    dan ditulis ke session paling sering sekali per PROGRESS_DB_WRITE_INTERVAL
+    agar stream di proses lain ikut bergerak. Semua hasil ditulis dalam satu
+    transaksi di akhir, hanya jika worker_id masih memegang lease job.
+    Exception dibiarkan naik ke worker agar job bisa dijadwalkan ulang.
+    """
+    last_write = 0.0
+    
+    async def update_progress(progress: int, stage: str = None):
+        nonlocal last_write
+        progress_tracker.update(session_id, progress, stage)
+        
+        now = time.monotonic()
+        if now - last_write < config.PROGRESS_DB_WRITE_INTERVAL:
+            return
+        last_write = now
+        try:
+            # Lease hilang ditangani heartbeat worker, hasil False diabaikan di sini
+            await run_io(job_queue.extend_lease, session_id, worker_id, progress)
+        except Exception as e:
+            print(f"Error saving progress for {session_id}: {e}")
+    
+    await update_progress(10)
+    
+    # 1. Ekstrak data tweet
+    tweet_data = await run_io(twitter_service.get_tweet_data, tweet_url)
+    await update_progress(30, 'extract')
+    
+    # 2. Tahap independen dijalankan paralel, digabung sebelum PDF
+    # Verdict awal dari jawaban OpenAI yang di-stream dikirim ke subscriber sebelum tahap selesai
+    on_hoax_partial = None
+    if config.OPENAI_STREAM_PARTIAL:
+        on_hoax_partial = lambda result: progress_tracker.partial(session_id, 'hoax_analysis', result)
+    
+    pipeline = build_analysis_pipeline(session_id, tweet_url, tweet_data, tweet_data.get('user', {}), on_hoax_partial)
+    
+    async def on_stage_complete(stage, percent):
+        await update_progress(30 + int(percent * 0.65), stage.name)
+    
+    stage_results = await pipeline.run(on_stage_complete)
+    
+    # 3. Simpan semua hasil dalam satu transaksi
+    await run_io(save_analysis_results, session_id, tweet_url, tweet_data, stage_results, worker_id)
+    progress_tracker.finish(session_id, 'completed')
+
+def save_analysis_results(session_id: str, tweet_url: str, tweet_data: Dict[str, Any], stage_results: Dict[str, Any],
+                          worker_id: str):
+    """Tulis user, tweet, hasil analisis, dan status session dalam satu commit.
+
+    Melempar job_queue.LeaseLostError (tanpa menyimpan apa pun) jika lease
+    job sudah diambil alih worker lain.
+    """
+    user_data = tweet_data.get('user', {})
+    hoax_analysis = stage_results['hoax_analysis']
+    bot_analysis = stage_results['bot_detection']
+    fact_check_results = stage_results['fact_check']
+    network_data, network_analysis, visualization_path, influence_chart_path = stage_results['network']
+    pdf_path = stage_results['pdf_report']
+    
+    db = SessionLocal()
+    try:
+        session = db.query(AnalysisSession).filter(
+            AnalysisSession.session_id == session_id
+        ).first()
+        
+        if not session:
+            return
+        if session.lease_owner != worker_id:
+            raise job_queue.LeaseLostError(f"Lease {session_id} tidak lagi dipegang {worker_id}")
+        
+        # Simpan data user
+        user = db.query(TwitterUser).filter(
+            TwitterUser.user_id == user_data.get('user_id')
+        ).first()
+        
+        if not user:
+            user = TwitterUser(
+                user_id=user_data.get('user_id'),
+                username=user_data.get('username'),
+                display_name=user_data.get('display_name'),
+                bio=user_data.get('bio'),
+                followers_count=user_data.get('followers_count', 0),
+                following_count=user_data.get('following_count', 0),
+                tweet_count=user_data.get('tweet_count', 0),
+                verified=user_data.get('verified', False),
+                profile_image_url=user_data.get('profile_image_url'),
+                account_creation_date=user_data.get('account_creation_date')
+            )
+            db.add(user)
+        
+        # Akun yang pernah tersimpan sebagai peserta jaringan kini pengguna yang dianalisis
+        user.is_network_participant = False
+        
+        # Update user dengan hasil bot detection (skor dari cache sudah tersimpan)
+        if not bot_analysis.get('cached'):
+            bot_score_cache.apply(user, user_data, bot_analysis)
+        
+        # Skor bot peserta jaringan yang baru dihitung disimpan untuk analisis berikutnya
+        # (tanpa author, yang barisnya sudah ditangani di atas)
+        _, participant_profiles, participant_bot_results = stage_results['network_bots']
+        participants = [profile for user_id, profile in participant_profiles.items() if user_id != user.user_id]
+        bot_score_cache.store_many(db, participants, participant_bot_results)
+        
+        # Simpan data tweet
+        tweet = db.query(Tweet).filter(
+            Tweet.tweet_id == tweet_data.get('tweet_id')
+        ).first()
+        
+        if not tweet:
+            tweet = Tweet(
+                tweet_id=tweet_data.get('tweet_id'),
+                url=tweet_url,
+                text=tweet_data.get('text'),
+                created_at_twitter=tweet_data.get('created_at'),
+                retweet_count=tweet_data.get('retweet_count', 0),
+                like_count=tweet_data.get('like_count', 0),
+                reply_count=tweet_data.get('reply_count', 0),
+                quote_count=tweet_data.get('quote_count', 0),
+                user_id=user_data.get('user_id')
+            )
+            db.add(tweet)
+        
+        # Simpan hasil analisis
+        analysis = HoaxAnalysis(
+            tweet_id=tweet_data.get('tweet_id'),
+            openai_analysis=hoax_analysis.get('raw_analysis', ''),
+            hoax_probability=hoax_analysis.get('hoax_probability', 0),
+            is_hoax=hoax_analysis.get('is_hoax', False),
+            hoax_reasons=hoax_analysis.get('reasons', []),
+            prompt_template_version=hoax_analysis.get('prompt_template_version'),
+            prompt_tokens=hoax_analysis.get('prompt_tokens', 0),
+            completion_tokens=hoax_analysis.get('completion_tokens', 0),
+            verdict_source=hoax_analysis.get('verdict_source'),
+            fact_check_results=fact_check_results,
+            network_data=network_data,
+            influence_score=network_analysis.get('total_interactions', 0),
+            network_visualization_path=visualization_path,
+            influence_chart_path=influence_chart_path,
+            pdf_report_path=pdf_path
+        )
+        db.add(analysis)
+        db.flush()
+        
+        # Update session dengan hasil dan lepas lease antrian, hanya jika lease masih milik worker ini
+        completed = db.query(AnalysisSession).filter(
+            AnalysisSession.session_id == session_id,
+            AnalysisSession.lease_owner == worker_id,
+            AnalysisSession.status == "processing"
+        ).update({
+            AnalysisSession.analysis_id: analysis.id,
+            AnalysisSession.status: "completed",
+            AnalysisSession.progress: 100,
+            AnalysisSession.lease_owner: None,
+            AnalysisSession.lease_expires_at: None
+        }, synchronize_session=False)
+        
+        if completed != 1:
+            raise job_queue.LeaseLostError(f"Lease {session_id} tidak lagi dipegang {worker_id}")
+        
+        # Session lain yang digabung ke job ini ikut selesai dengan hasil yang sama
+        job_queue.complete_followers(db, session_id, analysis.id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,204 @@
+import csv
+import io
+import json
+import uuid
+from typing import Dict, Any, List, Iterator, Tuple
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import AnalysisBatch, AnalysisSession, HoaxAnalysis
+from app.analysis import twitter_service
+from app.scheduler import analysis_scheduler
+from app.config import config
+
+# Kolom yang dikenali pada CSV/NDJSON/JSON
+URL_FIELDS = ("tweet_url", "url")
+
+# Baris hasil yang dimuat per putaran saat streaming NDJSON
+RESULTS_FETCH_SIZE = 200
+
+
+def parse_batch_payload(content: bytes, filename: str = "", content_type: str = "") -> List[str]:
+    """Ambil daftar URL dari body JSON, file CSV, atau file NDJSON"""
+    text = content.decode("utf-8-sig").strip()
+    if not text:
+        return []
+
+    name = (filename or "").lower()
+    if name.endswith(".csv") or "csv" in (content_type or ""):
+        return _parse_csv(text)
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in (content_type or ""):
+        return _parse_ndjson(text)
+
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        # Bukan JSON tunggal: coba NDJSON lalu CSV / satu URL per baris
+        try:
+            return _parse_ndjson(text)
+        except ValueError:
+            return _parse_csv(text)
+
+    if isinstance(data, dict):
+        data = data.get("tweet_urls", data.get("urls", []))
+    if not isinstance(data, list):
+        raise ValueError("Body JSON harus berupa list URL atau {\"tweet_urls\": [...]}")
+
+    return [url for url in (_url_from_item(item) for item in data) if url]
+
+
+def _url_from_item(item: Any) -> str:
+    """Ambil URL dari string atau object dengan field tweet_url/url"""
+    if isinstance(item, str):
+        return item.strip()
+    if isinstance(item, dict):
+        for field in URL_FIELDS:
+            if item.get(field):
+                return str(item[field]).strip()
+    return ""
+
+
+def _parse_ndjson(text: str) -> List[str]:
+    """Satu JSON (string atau object) per baris"""
+    urls = []
+    for line_number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            url = _url_from_item(json.loads(line))
+        except json.JSONDecodeError:
+            raise ValueError(f"Baris {line_number} bukan JSON yang valid")
+        if url:
+            urls.append(url)
+    return urls
+
+
+def _parse_csv(text: str) -> List[str]:
+    """Kolom tweet_url/url jika ada header, selain itu kolom pertama"""
+    rows = list(csv.reader(io.StringIO(text)))
+    if not rows:
+        return []
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    column = 0
+    for field in URL_FIELDS:
+        if field in header:
+            column = header.index(field)
+            rows = rows[1:]
+            break
+
+    return [row[column].strip() for row in rows if len(row) > column and row[column].strip()]
+
+
+def dedupe_urls(tweet_urls: List[str]) -> Tuple[List[str], List[str], int]:
+    """Pisahkan URL unik per tweet_id, URL tidak valid, dan jumlah duplikat"""
+    unique_urls = []
+    invalid_urls = []
+    seen = set()
+
+    for tweet_url in tweet_urls:
+        tweet_id = twitter_service.extract_tweet_id(tweet_url)
+        if not tweet_id:
+            invalid_urls.append(tweet_url)
+            continue
+        if tweet_id in seen:
+            continue
+        seen.add(tweet_id)
+        unique_urls.append(tweet_url)
+
+    duplicate_count = len(tweet_urls) - len(unique_urls) - len(invalid_urls)
+    return unique_urls, invalid_urls, duplicate_count
+
+
+def create_batch(db: Session, tweet_urls: List[str], user_ip: str = None, user_agent: str = None,
+                 max_concurrency: int = None) -> Tuple[AnalysisBatch, List[str]]:
+    """Buat batch dan jadwalkan semua URL unik (commit dilakukan pemanggil).
+
+    Mengembalikan batch dan daftar URL yang tidak valid.
+    """
+    unique_urls, invalid_urls, duplicate_count = dedupe_urls(tweet_urls)
+
+    batch = AnalysisBatch(
+        batch_id=str(uuid.uuid4()),
+        total_items=len(unique_urls),
+        duplicate_count=duplicate_count,
+        invalid_count=len(invalid_urls),
+        max_concurrency=config.BATCH_MAX_CONCURRENCY if max_concurrency is None else max_concurrency,
+        user_ip=user_ip,
+        user_agent=user_agent or ""
+    )
+    db.add(batch)
+
+    analysis_scheduler.submit_many(db, unique_urls, user_ip, user_agent, batch_id=batch.batch_id)
+    return batch, invalid_urls
+
+
+def get_batch_summary(db: Session, batch: AnalysisBatch) -> Dict[str, Any]:
+    """Progress gabungan batch dari jumlah session per status"""
+    rows = db.query(
+        AnalysisSession.status,
+        func.count(AnalysisSession.id),
+        func.sum(AnalysisSession.progress),
+        func.sum(case((AnalysisSession.cached == True, 1), else_=0))
+    ).filter(AnalysisSession.batch_id == batch.batch_id).group_by(AnalysisSession.status).all()
+
+    counts = {"pending": 0, "processing": 0, "completed": 0, "failed": 0}
+    progress_sum = 0
+    cached_count = 0
+    for status, count, status_progress, status_cached in rows:
+        counts[status] = count
+        progress_sum += status_progress or 0
+        cached_count += status_cached or 0
+
+    total = batch.total_items or 0
+    done = counts["completed"] + counts["failed"]
+
+    return {
+        "batch_id": batch.batch_id,
+        "status": "completed" if done >= total else "processing",
+        "total_items": total,
+        "duplicate_count": batch.duplicate_count,
+        "invalid_count": batch.invalid_count,
+        "cached_count": cached_count,
+        "counts": counts,
+        "progress": int(progress_sum / total) if total else 100,
+        "created_at": batch.created_at
+    }
+
+
+def iter_batch_results(batch_id: str) -> Iterator[str]:
+    """Generator baris NDJSON hasil batch.
+
+    Memakai session database sendiri dan memuat baris per potongan,
+    sehingga batch besar tidak dimuat sekaligus ke memori.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(AnalysisSession, HoaxAnalysis).outerjoin(
+            HoaxAnalysis, HoaxAnalysis.id == AnalysisSession.analysis_id
+        ).filter(
+            AnalysisSession.batch_id == batch_id
+        ).order_by(AnalysisSession.id).yield_per(RESULTS_FETCH_SIZE)
+
+        for session, analysis in query:
+            item = {
+                "session_id": session.session_id,
+                "tweet_url": session.tweet_url,
+                "tweet_id": session.tweet_id,
+                "status": session.status,
+                "cached": bool(session.cached),
+                "error_message": session.error_message
+            }
+            if analysis:
+                item.update({
+                    "hoax_probability": analysis.hoax_probability,
+                    "is_hoax": analysis.is_hoax,
+                    "hoax_reasons": analysis.hoax_reasons,
+                    "influence_score": analysis.influence_score,
+                    "pdf_report_path": analysis.pdf_report_path
+                })
+            yield json.dumps(item, default=str) + "\n"
+    finally:
+        db.close()
@@ -6,6 +6,25 @@ load_dotenv()
 class Config:
     # OpenAI API
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+    OPENAI_REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))  # Per proses; disesuaikan lagi dari header x-ratelimit-*
+    OPENAI_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "200000"))
+    OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))  # Request OpenAI paralel per proses
+    OPENAI_RATE_LIMIT_RETRIES = int(os.getenv("OPENAI_RATE_LIMIT_RETRIES", "3"))  # Percobaan ulang setelah 429
+    OPENAI_BATCH_SIZE = int(os.getenv("OPENAI_BATCH_SIZE", "10"))  # Maksimum tweet per request batch
+    OPENAI_BATCH_WINDOW = float(os.getenv("OPENAI_BATCH_WINDOW", "0.05"))  # Detik menunggu analisis lain untuk digabung (0 = nonaktif)
+    OPENAI_MAX_COMPLETION_TOKENS = int(os.getenv("OPENAI_MAX_COMPLETION_TOKENS", "600"))  # Batas token jawaban analisis satu tweet
+    OPENAI_JSON_MODE = os.getenv("OPENAI_JSON_MODE", "True").lower() == "true"  # response_format json_object (model harus mendukung)
+    OPENAI_STREAM_PARTIAL = os.getenv("OPENAI_STREAM_PARTIAL", "True").lower() == "true"  # Stream jawaban agar verdict awal tampil lebih cepat
+    
+    OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "30"))  # Detik per request (di luar antrean rate limit)
+    OPENAI_RETRIES = int(os.getenv("OPENAI_RETRIES", "2"))  # Percobaan ulang untuk timeout/koneksi/5xx
+    OPENAI_HEDGE_DELAY = float(os.getenv("OPENAI_HEDGE_DELAY", "0"))  # Kirim request cadangan setelah sekian detik (0 = nonaktif)
+    
+    # Prompt Budget Settings
+    PROMPT_MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", "900"))  # Batas token prompt analisis satu tweet
+    PROMPT_MAX_TWEET_TOKENS = int(os.getenv("PROMPT_MAX_TWEET_TOKENS", "400"))  # Teks tweet dipotong di atas batas ini
+    PROMPT_MAX_BIO_TOKENS = int(os.getenv("PROMPT_MAX_BIO_TOKENS", "60"))  # Bio pengguna dipotong di atas batas ini
     
     # Twitter API
     TWITTER_API_KEY = os.getenv("TWITTER_API_KEY")
@@ -14,6 +33,22 @@ class Config:
     
     # Brave Search API
     BRAVE_SEARCH_API_KEY = os.getenv("BRAVE_SEARCH_API_KEY")
+    BRAVE_TIMEOUT = float(os.getenv("BRAVE_TIMEOUT", "10"))  # Detik per request
+    BRAVE_RETRIES = int(os.getenv("BRAVE_RETRIES", "2"))  # Percobaan ulang untuk timeout/koneksi/5xx/429
+    BRAVE_HEDGE_DELAY = float(os.getenv("BRAVE_HEDGE_DELAY", "0"))  # Kirim request cadangan setelah sekian detik (0 = nonaktif)
+    BRAVE_REQUESTS_PER_SECOND = float(os.getenv("BRAVE_REQUESTS_PER_SECOND", "20"))  # Limit per API key sesuai paket Brave
+    FACT_CHECK_MAX_QUERIES = int(os.getenv("FACT_CHECK_MAX_QUERIES", "3"))  # Query paralel per tweet (klaim, nama, varian hoaks)
+    FACT_CHECK_MAX_RESULTS = int(os.getenv("FACT_CHECK_MAX_RESULTS", "15"))  # Hasil gabungan yang disimpan setelah dedup
+    BRAVE_HTTP2 = os.getenv("BRAVE_HTTP2", "True").lower() == "true"  # Butuh paket h2 (httpx[http2])
+    BRAVE_MAX_CONNECTIONS = int(os.getenv("BRAVE_MAX_CONNECTIONS", "20"))  # Koneksi maksimum per pool
+    BRAVE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("BRAVE_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    BRAVE_KEEPALIVE_EXPIRY = float(os.getenv("BRAVE_KEEPALIVE_EXPIRY", "30"))  # Detik koneksi idle dipertahankan
+    
+    # Resilience Settings (berlaku untuk OpenAI dan Brave Search)
+    RETRY_BACKOFF_BASE = float(os.getenv("RETRY_BACKOFF_BASE", "0.5"))  # Detik; digandakan tiap percobaan, dengan jitter
+    RETRY_BACKOFF_MAX = float(os.getenv("RETRY_BACKOFF_MAX", "8"))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))  # Kegagalan berturut-turut sebelum circuit terbuka
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))  # Detik sebelum mencoba dependency lagi
     
     # Telegram Bot
     TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -28,9 +63,46 @@ class Config:
     # Analysis Settings
     HOAX_THRESHOLD = float(os.getenv("HOAX_THRESHOLD", "0.7"))  # Threshold untuk menentukan hoax
     BOT_DETECTION_THRESHOLD = float(os.getenv("BOT_DETECTION_THRESHOLD", "0.6"))  # Threshold untuk menentukan bot
+    NETWORK_BOT_CHUNK_SIZE = int(os.getenv("NETWORK_BOT_CHUNK_SIZE", "5000"))  # Akun peserta jaringan per tugas process pool saat deteksi bot
+    NETWORK_CENTRALITY_MEASURES = [measure.strip() for measure in os.getenv("NETWORK_CENTRALITY_MEASURES", "degree,betweenness,closeness,pagerank").split(",") if measure.strip()]  # Centrality di metrik jaringan
+    NETWORK_CENTRALITY_MAX_NODES = int(os.getenv("NETWORK_CENTRALITY_MAX_NODES", "2000"))  # Betweenness/closeness dilewati untuk graf lebih besar dari ini, 0 = selalu dihitung
+    PRESCREEN_THRESHOLD = float(os.getenv("PRESCREEN_THRESHOLD", "0"))  # Skor lokal di bawah ini tidak dikirim ke OpenAI, 0 = semua dikirim
+    PRESCREEN_MIN_TRAINING_VERDICTS = int(os.getenv("PRESCREEN_MIN_TRAINING_VERDICTS", "1000"))  # Verdict LLM minimal di data latih sebelum pra-klasifikasi boleh melewati OpenAI
+    PRESCREEN_RELOAD_INTERVAL = float(os.getenv("PRESCREEN_RELOAD_INTERVAL", "300"))  # Detik antar pengecekan file model hasil train-prescreen
+    
+    # Executor Settings
+    IO_POOL_SIZE = int(os.getenv("IO_POOL_SIZE", "16"))  # Thread pool untuk klien API/HTTP
+    CPU_POOL_SIZE = int(os.getenv("CPU_POOL_SIZE", str(os.cpu_count() or 2)))  # Process pool untuk graf/PDF, 0 = pakai thread pool
+    
+    # Job Queue Settings
+    EMBEDDED_WORKER = os.getenv("EMBEDDED_WORKER", "True").lower() == "true"  # Worker di dalam proses web
+    WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "2"))  # Job paralel per worker
+    JOB_VISIBILITY_TIMEOUT = int(os.getenv("JOB_VISIBILITY_TIMEOUT", "300"))  # Detik sebelum lease dianggap mati
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BACKOFF = int(os.getenv("JOB_RETRY_BACKOFF", "10"))  # Detik, dikali 2 per percobaan
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))  # Detik saat antrian kosong
+    STREAM_KEEPALIVE_INTERVAL = float(os.getenv("STREAM_KEEPALIVE_INTERVAL", "15"))  # Detik antar keepalive SSE/WebSocket
+    PROGRESS_DB_WRITE_INTERVAL = float(os.getenv("PROGRESS_DB_WRITE_INTERVAL", "2"))  # Detik minimal antar penulisan progress tahap ke database
+    
+    # Batch Settings
+    BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "5000"))  # URL maksimal per batch
+    BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))  # Job satu batch yang diproses bersamaan, 0 = tanpa batas
+    
+    # Cache Settings
+    RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", "3600"))  # Detik hasil analisis tweet yang sama dipakai ulang, 0 = nonaktif
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "604800"))  # Detik respons OpenAI untuk teks yang sama dipakai ulang, 0 = nonaktif
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))  # Entri yang paling lama tidak dipakai (LRU) dibuang di atas batas ini
+    SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "86400"))  # Detik hasil Brave Search untuk query yang sama dipakai ulang, 0 = nonaktif
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000"))  # Batas entri LRU cache pencarian
+    BOT_SCORE_CACHE_TTL = int(os.getenv("BOT_SCORE_CACHE_TTL", "604800"))  # Detik skor bot akun yang profilnya tidak berubah dipakai ulang, 0 = nonaktif
+    BOT_SCORE_DRIFT_THRESHOLD = float(os.getenv("BOT_SCORE_DRIFT_THRESHOLD", "0.1"))  # Perubahan relatif follower/following/tweet yang memicu hitung ulang
+    NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.85"))  # Kemiripan MinHash minimal untuk memakai ulang verdict (selama LLM_CACHE_TTL), 0 = nonaktif
     
     # File paths
     REPORTS_DIR = "reports"
+    PRESCREEN_MODEL_PATH = os.getenv("PRESCREEN_MODEL_PATH", "data/prescreen_model.npz")
+    CREDIBILITY_DATA_PATH = os.getenv("CREDIBILITY_DATA_PATH", "app/data/source_credibility.csv")  # domain,credibility,type per baris
+    CREDIBILITY_RELOAD_INTERVAL = float(os.getenv("CREDIBILITY_RELOAD_INTERVAL", "60"))  # Detik antar pengecekan perubahan file kredibilitas
     VISUALIZATIONS_DIR = "visualizations"
     STATIC_DIR = "static"
     TEMPLATES_DIR = "templates"
@@ -1,6 +1,7 @@
-from sqlalchemy import create_engine
+from datetime import datetime
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker
-from app.models import Base
+from app.models import Base, AnalysisSession
 from app.config import config
 import os
 
@@ -13,12 +14,67 @@ engine = create_engine(
     connect_args={"check_same_thread": False}  # Untuk SQLite
 )
 
+# pysqlite menunda BEGIN sampai DML pertama, sehingga SAVEPOINT (begin_nested) bisa
+# membuka transaksi terluar dan RELEASE-nya ikut commit. Serahkan BEGIN ke SQLAlchemy
+# (resep resmi SQLAlchemy) agar savepoint benar-benar bersarang di transaksi pemanggil.
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine, "begin")
+    def _emit_sqlite_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
 # Buat session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def create_tables():
     """Buat semua tabel dalam database"""
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    requeue_legacy_sessions()
+
+def add_missing_columns():
+    """Tambahkan kolom dan index baru ke tabel lama (create_all tidak mengubah tabel yang sudah ada)"""
+    inspector = inspect(engine)
+    
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                
+                # Baris lama diisi default model (mis. attempts = 0) agar tidak NULL
+                if column.default is not None and column.default.is_scalar:
+                    connection.execute(
+                        table.update().where(column == None).values({column.name: column.default.arg})
+                    )
+            
+            for index in table.indexes:
+                index.create(bind=connection, checkfirst=True)
+
+def requeue_legacy_sessions():
+    """Kembalikan session 'processing' tanpa lease ke antrian.
+
+    Session seperti ini hanya bisa berasal dari versi sebelum antrian job
+    (analisis berjalan sebagai background task); worker tidak pernah
+    mengambilnya karena lease-nya tidak pernah habis.
+    """
+    with engine.begin() as connection:
+        connection.execute(
+            AnalysisSession.__table__.update().where(
+                AnalysisSession.status == "processing",
+                AnalysisSession.lease_expires_at == None
+            ).values(status="pending", available_at=datetime.utcnow())
+        )
 
 def get_db():
     """Dependency untuk mendapatkan session database"""
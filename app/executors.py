@@ -0,0 +1,66 @@
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+from app.config import config
+
+# Pool dibuat lazily agar import modul ini tidak langsung membuat thread/proses
+_io_executor: Optional[ThreadPoolExecutor] = None
+_cpu_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Thread pool untuk pemanggilan klien I/O (OpenAI, Brave, Twitter, HTTP)"""
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(
+            max_workers=config.IO_POOL_SIZE,
+            thread_name_prefix="hoax-io"
+        )
+    return _io_executor
+
+
+def get_cpu_executor() -> Optional[ProcessPoolExecutor]:
+    """Process pool untuk pekerjaan CPU-bound (NetworkX, ReportLab).
+
+    Mengembalikan None jika CPU_POOL_SIZE = 0, sehingga pekerjaan CPU
+    dijalankan di thread pool I/O.
+    """
+    global _cpu_executor
+    if config.CPU_POOL_SIZE <= 0:
+        return None
+    if _cpu_executor is None:
+        # spawn lebih aman daripada fork karena proses induk sudah punya banyak thread
+        _cpu_executor = ProcessPoolExecutor(
+            max_workers=config.CPU_POOL_SIZE,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _cpu_executor
+
+
+async def run_io(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Jalankan fungsi I/O blocking di thread pool tanpa memblokir event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def run_cpu(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Jalankan fungsi CPU-bound di process pool.
+
+    func dan argumennya harus bisa di-pickle (fungsi level modul).
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_cpu_executor() or get_io_executor()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+def shutdown_executors():
+    """Matikan semua pool (dipanggil saat aplikasi berhenti)"""
+    global _io_executor, _cpu_executor
+    if _io_executor is not None:
+        _io_executor.shutdown(wait=False, cancel_futures=True)
+        _io_executor = None
+    if _cpu_executor is not None:
+        _cpu_executor.shutdown(wait=False, cancel_futures=True)
+        _cpu_executor = None
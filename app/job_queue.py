@@ -0,0 +1,199 @@
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from sqlalchemy import or_, and_, func, select
+from sqlalchemy.orm import Session, aliased
+from app.database import SessionLocal
+from app.models import AnalysisSession, AnalysisBatch
+from app.config import config
+
+
+class LeaseLostError(Exception):
+    """Lease job sudah habis dan diambil worker lain; hasil tidak boleh disimpan"""
+
+
+def _batch_slot_available(now: datetime):
+    """Job batch hanya boleh diambil selama job aktif batch tersebut di bawah max_concurrency"""
+    running = aliased(AnalysisSession)
+    running_count = select(func.count(running.id)).where(
+        running.batch_id == AnalysisSession.batch_id,
+        running.status == "processing",
+        running.lease_expires_at >= now
+    ).scalar_subquery()
+    batch_limit = select(AnalysisBatch.max_concurrency).where(
+        AnalysisBatch.batch_id == AnalysisSession.batch_id
+    ).scalar_subquery()
+
+    return or_(
+        AnalysisSession.batch_id == None,
+        func.coalesce(batch_limit, 0) <= 0,
+        running_count < batch_limit
+    )
+
+
+def _claimable_filter(now: datetime):
+    """Kondisi job yang boleh diambil: pending yang sudah jatuh tempo, atau lease yang habis.
+
+    Session yang digabung ke job lain (leader_session_id terisi) tidak pernah diambil.
+    """
+    return and_(
+        AnalysisSession.leader_session_id == None,
+        _batch_slot_available(now),
+        or_(
+            and_(
+                AnalysisSession.status == "pending",
+                or_(AnalysisSession.available_at == None, AnalysisSession.available_at <= now)
+            ),
+            and_(
+                AnalysisSession.status == "processing",
+                AnalysisSession.lease_expires_at != None,
+                AnalysisSession.lease_expires_at < now
+            )
+        )
+    )
+
+
+def _finish_followers(db: Session, leader_session_id: str, values: dict):
+    """Samakan status session yang digabung dengan hasil job leader (dalam transaksi pemanggil)"""
+    db.query(AnalysisSession).filter(
+        AnalysisSession.leader_session_id == leader_session_id,
+        AnalysisSession.status.notin_(["completed", "failed"])
+    ).update(values, synchronize_session=False)
+
+
+def complete_followers(db: Session, leader_session_id: str, analysis_id: int):
+    """Selesaikan semua session gabungan dengan hasil analisis leader"""
+    _finish_followers(db, leader_session_id, {
+        AnalysisSession.status: "completed",
+        AnalysisSession.progress: 100,
+        AnalysisSession.analysis_id: analysis_id
+    })
+
+
+def fail_followers(db: Session, leader_session_id: str, error_message: str):
+    """Gagalkan semua session gabungan jika job leader gagal permanen"""
+    _finish_followers(db, leader_session_id, {
+        AnalysisSession.status: "failed",
+        AnalysisSession.error_message: error_message
+    })
+
+
+def enqueue(db: Session, analysis_session: AnalysisSession):
+    """Masukkan session ke antrian (commit dilakukan pemanggil)"""
+    analysis_session.status = "pending"
+    analysis_session.progress = 0
+    analysis_session.attempts = 0
+    analysis_session.max_attempts = config.JOB_MAX_ATTEMPTS
+    analysis_session.available_at = datetime.utcnow()
+    analysis_session.lease_owner = None
+    analysis_session.lease_expires_at = None
+    db.add(analysis_session)
+
+
+def claim_next(worker_id: str) -> Optional[Tuple[str, str]]:
+    """Ambil satu job dari antrian dan pasang lease.
+
+    Klaim memakai UPDATE bersyarat sehingga aman dipakai beberapa proses
+    worker sekaligus di SQLite maupun Postgres. Mengembalikan
+    (session_id, tweet_url) atau None jika antrian kosong.
+    """
+    db = SessionLocal()
+    try:
+        while True:
+            now = datetime.utcnow()
+            candidate = db.query(AnalysisSession.id, AnalysisSession.attempts, AnalysisSession.max_attempts).filter(
+                _claimable_filter(now)
+            ).order_by(AnalysisSession.created_at).first()
+
+            if not candidate:
+                return None
+
+            claimed = db.query(AnalysisSession).filter(
+                AnalysisSession.id == candidate.id,
+                _claimable_filter(now)
+            ).update({
+                AnalysisSession.status: "processing",
+                AnalysisSession.lease_owner: worker_id,
+                AnalysisSession.lease_expires_at: now + timedelta(seconds=config.JOB_VISIBILITY_TIMEOUT),
+                AnalysisSession.attempts: func.coalesce(AnalysisSession.attempts, 0) + 1
+            }, synchronize_session=False)
+            db.commit()
+
+            if claimed != 1:
+                # Diambil worker lain lebih dulu, coba kandidat berikutnya
+                continue
+
+            analysis_session = db.query(AnalysisSession).filter(AnalysisSession.id == candidate.id).first()
+
+            # Lease habis berkali-kali (worker crash) juga dihitung sebagai percobaan
+            if analysis_session.attempts > (analysis_session.max_attempts or config.JOB_MAX_ATTEMPTS):
+                analysis_session.status = "failed"
+                analysis_session.error_message = analysis_session.error_message or "Batas percobaan habis"
+                analysis_session.lease_owner = None
+                analysis_session.lease_expires_at = None
+                fail_followers(db, analysis_session.session_id, analysis_session.error_message)
+                db.commit()
+                continue
+
+            return analysis_session.session_id, analysis_session.tweet_url
+    finally:
+        db.close()
+
+
+def extend_lease(session_id: str, worker_id: str, progress: int = None) -> bool:
+    """Perpanjang lease job yang sedang diproses (heartbeat).
+
+    Progress terbaru ikut ditulis di sini agar terlihat dari proses lain
+    tanpa transaksi tambahan.
+    """
+    values = {
+        AnalysisSession.lease_expires_at: datetime.utcnow() + timedelta(seconds=config.JOB_VISIBILITY_TIMEOUT)
+    }
+    if progress is not None:
+        values[AnalysisSession.progress] = progress
+    
+    db = SessionLocal()
+    try:
+        updated = db.query(AnalysisSession).filter(
+            AnalysisSession.session_id == session_id,
+            AnalysisSession.lease_owner == worker_id,
+            AnalysisSession.status == "processing"
+        ).update(values, synchronize_session=False)
+        db.commit()
+        return updated == 1
+    finally:
+        db.close()
+
+
+def fail(session_id: str, worker_id: str, error_message: str, retryable: bool = True) -> Optional[str]:
+    """Tandai job gagal; dijadwalkan ulang dengan backoff selama percobaan masih ada.
+
+    Mengembalikan status baru ("pending" atau "failed").
+    """
+    db = SessionLocal()
+    try:
+        analysis_session = db.query(AnalysisSession).filter(
+            AnalysisSession.session_id == session_id,
+            AnalysisSession.lease_owner == worker_id
+        ).first()
+
+        if not analysis_session:
+            return None
+
+        attempts = analysis_session.attempts or 1
+        max_attempts = analysis_session.max_attempts or config.JOB_MAX_ATTEMPTS
+
+        if retryable and attempts < max_attempts:
+            backoff = config.JOB_RETRY_BACKOFF * (2 ** (attempts - 1))
+            analysis_session.status = "pending"
+            analysis_session.available_at = datetime.utcnow() + timedelta(seconds=backoff)
+        else:
+            analysis_session.status = "failed"
+            fail_followers(db, session_id, error_message)
+
+        analysis_session.error_message = error_message
+        analysis_session.lease_owner = None
+        analysis_session.lease_expires_at = None
+        db.commit()
+        return analysis_session.status
+    finally:
+        db.close()
@@ -1,23 +1,26 @@
-from fastapi import FastAPI, Request, Depends, HTTPException, BackgroundTasks
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi import FastAPI, Request, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 import uvicorn
+import asyncio
+import json
 import os
-import uuid
-from datetime import datetime
 from typing import Dict, Any, Optional
 
 # Import models dan services
-from app.database import get_db, init_db
-from app.models import Tweet, TwitterUser, HoaxAnalysis, AnalysisSession
-from app.services.twitter_service import TwitterService
-from app.services.openai_service import OpenAIService
-from app.services.brave_search_service import BraveSearchService
-from app.services.bot_detection_service import BotDetectionService
-from app.services.network_analysis_service import NetworkAnalysisService
-from app.services.pdf_service import PDFService
+from app.database import get_db, init_db, SessionLocal
+from app.models import Tweet, TwitterUser, HoaxAnalysis, AnalysisSession, AnalysisBatch
+from app.services.network_analysis_service import create_influence_chart_for
+from app.executors import run_cpu, shutdown_executors
+from app.worker import AnalysisWorker
+from app.progress import progress_tracker, TERMINAL_STATUSES
+from app.scheduler import analysis_scheduler
+from app.batch import parse_batch_payload, create_batch, get_batch_summary, iter_batch_results
+from app.services.resilience import get_breaker_states
 from app.config import config
 
 # Setup FastAPI app
@@ -34,14 +37,6 @@ app.mount("/visualizations", StaticFiles(directory="visualizations"), name="visu
 
 templates = Jinja2Templates(directory="templates")
 
-# Initialize services
-twitter_service = TwitterService(use_real_api=False)  # Set True untuk API asli
-openai_service = OpenAIService()
-brave_search_service = BraveSearchService(use_real_api=False)  # Set True untuk API asli
-bot_detection_service = BotDetectionService()
-network_analysis_service = NetworkAnalysisService()
-pdf_service = PDFService()
-
 # Buat direktori yang diperlukan
 os.makedirs("reports", exist_ok=True)
 os.makedirs("visualizations", exist_ok=True)
@@ -51,6 +46,25 @@ os.makedirs("templates", exist_ok=True)
 # Initialize database
 init_db()
 
+# Worker antrian di dalam proses web (nonaktifkan jika memakai run.py --mode worker)
+embedded_worker = AnalysisWorker() if config.EMBEDDED_WORKER else None
+embedded_worker_task = None
+
+@app.on_event("startup")
+async def startup_event():
+    """Jalankan worker antrian embedded"""
+    global embedded_worker_task
+    if embedded_worker:
+        embedded_worker_task = asyncio.create_task(embedded_worker.run())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Hentikan worker dan matikan thread/process pool saat server berhenti"""
+    if embedded_worker_task:
+        embedded_worker.stop()
+        await embedded_worker_task
+    shutdown_executors()
+
 @app.get("/", response_class=HTMLResponse)
 async def dashboard(request: Request):
     """Dashboard utama"""
@@ -64,7 +78,6 @@ async def analyze_page(request: Request):
 @app.post("/api/analyze")
 async def analyze_tweet(
     request: Request,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Endpoint untuk analisis tweet"""
@@ -76,39 +89,108 @@ async def analyze_tweet(
         if not tweet_url:
             raise HTTPException(status_code=400, detail="URL tweet harus diisi")
         
-        # Buat session ID
-        session_id = str(uuid.uuid4())
-        
-        # Buat analysis session
-        analysis_session = AnalysisSession(
-            session_id=session_id,
-            tweet_url=tweet_url,
+        analysis_session = analysis_scheduler.submit(
+            db,
+            tweet_url,
             user_ip=request.client.host,
-            user_agent=request.headers.get("user-agent", ""),
-            status="processing",
-            progress=0
+            user_agent=request.headers.get("user-agent", "")
         )
-        
-        db.add(analysis_session)
         db.commit()
         
-        # Jalankan analisis di background
-        background_tasks.add_task(
-            run_full_analysis,
-            session_id,
-            tweet_url,
-            db
-        )
+        if analysis_session.cached:
+            message = "Tweet ini baru saja dianalisis. Hasil tersedia langsung."
+        else:
+            message = "Analisis dimulai. Gunakan session_id untuk cek status."
         
         return {
             "status": "success",
-            "session_id": session_id,
-            "message": "Analisis dimulai. Gunakan session_id untuk cek status."
+            "session_id": analysis_session.session_id,
+            "cached": bool(analysis_session.cached),
+            "message": message
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/analyze/batch")
+async def analyze_tweet_batch(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Endpoint untuk analisis banyak tweet (JSON, atau upload file CSV/NDJSON pada field 'file')"""
+    content_type = request.headers.get("content-type", "")
+    
+    try:
+        if content_type.startswith("multipart/form-data"):
+            form_data = await request.form()
+            upload = form_data.get("file")
+            if upload is None or isinstance(upload, str):
+                raise HTTPException(status_code=400, detail="File batch harus diupload pada field 'file'")
+            tweet_urls = parse_batch_payload(await upload.read(), upload.filename, upload.content_type)
+        else:
+            tweet_urls = parse_batch_payload(await request.body(), content_type=content_type)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not tweet_urls:
+        raise HTTPException(status_code=400, detail="Daftar URL tweet kosong")
+    
+    if len(tweet_urls) > config.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Maksimal {config.BATCH_MAX_ITEMS} URL per batch")
+    
+    try:
+        batch, invalid_urls = create_batch(
+            db,
+            tweet_urls,
+            user_ip=request.client.host,
+            user_agent=request.headers.get("user-agent", "")
+        )
+        db.commit()
+        
+        return {
+            "status": "success",
+            "batch_id": batch.batch_id,
+            "total_items": batch.total_items,
+            "duplicate_count": batch.duplicate_count,
+            "invalid_count": batch.invalid_count,
+            "invalid_urls": invalid_urls[:100],
+            "message": "Batch dijadwalkan. Gunakan batch_id untuk cek progress dan unduh hasil."
+        }
+    
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/batch/{batch_id}")
+async def get_batch_status(batch_id: str, db: Session = Depends(get_db)):
+    """Cek progress gabungan sebuah batch"""
+    
+    batch = db.query(AnalysisBatch).filter(
+        AnalysisBatch.batch_id == batch_id
+    ).first()
+    
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch tidak ditemukan")
+    
+    return get_batch_summary(db, batch)
+
+@app.get("/api/batch/{batch_id}/results")
+async def download_batch_results(batch_id: str, db: Session = Depends(get_db)):
+    """Unduh hasil batch sebagai NDJSON (satu baris per URL, di-stream)"""
+    
+    exists = db.query(AnalysisBatch.id).filter(
+        AnalysisBatch.batch_id == batch_id
+    ).first()
+    
+    if not exists:
+        raise HTTPException(status_code=404, detail="Batch tidak ditemukan")
+    
+    return StreamingResponse(
+        iter_batch_results(batch_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename=batch_{batch_id}.ndjson"}
+    )
+
 @app.get("/api/status/{session_id}")
 async def get_analysis_status(session_id: str, db: Session = Depends(get_db)):
     """Cek status analisis"""
@@ -120,14 +202,136 @@ async def get_analysis_status(session_id: str, db: Session = Depends(get_db)):
     if not session:
         raise HTTPException(status_code=404, detail="Session tidak ditemukan")
     
+    state = get_session_state(db, session)
+    
     return {
         "session_id": session_id,
-        "status": session.status,
-        "progress": session.progress,
-        "error_message": session.error_message,
+        "status": state["status"],
+        "progress": state["progress"],
+        "error_message": state["error_message"],
         "created_at": session.created_at
     }
 
+def get_session_state(db: Session, session: AnalysisSession) -> Dict[str, Any]:
+    """Status efektif session; session yang digabung mengikuti session leader-nya"""
+    source = session
+    if session.leader_session_id and session.status not in TERMINAL_STATUSES:
+        leader = db.query(AnalysisSession).filter(
+            AnalysisSession.session_id == session.leader_session_id
+        ).first()
+        if leader:
+            source = leader
+    
+    # Progress per tahap hanya ada di memori worker yang memproses session ini
+    progress = progress_tracker.get(source.session_id)
+    
+    return {
+        "tracking_id": source.session_id,
+        "status": source.status,
+        "progress": progress if progress is not None else source.progress,
+        "error_message": source.error_message
+    }
+
+def get_session_snapshot(session_id: str) -> Optional[Dict[str, Any]]:
+    """Status session saat ini dalam format event streaming"""
+    db = SessionLocal()
+    try:
+        session = db.query(AnalysisSession).filter(
+            AnalysisSession.session_id == session_id
+        ).first()
+        
+        if not session:
+            return None
+        
+        state = get_session_state(db, session)
+        return {
+            "session_id": session_id,
+            "tracking_id": state["tracking_id"],
+            "status": state["status"],
+            "progress": state["progress"],
+            "stage": None,
+            "error_message": state["error_message"]
+        }
+    finally:
+        db.close()
+
+async def iter_progress_events(session_id: str):
+    """Generator event progress; None berarti keepalive.
+    
+    Event datang dari progress bus di proses ini. Jika job diproses worker
+    di proses lain, status database dicek sekali per interval keepalive.
+    """
+    snapshot = get_session_snapshot(session_id)
+    if snapshot is None:
+        return
+    
+    # Session yang digabung menerima event dari job leader-nya
+    tracking_id = snapshot.pop("tracking_id")
+    queue = progress_tracker.subscribe(tracking_id)
+    try:
+        # Ambil ulang setelah subscribe agar tidak ada event yang terlewat
+        last_event = get_session_snapshot(session_id) or snapshot
+        last_event.pop("tracking_id", None)
+        yield last_event
+        
+        while last_event["status"] not in TERMINAL_STATUSES:
+            try:
+                event = dict(await asyncio.wait_for(queue.get(), timeout=config.STREAM_KEEPALIVE_INTERVAL))
+                event["session_id"] = session_id
+            except asyncio.TimeoutError:
+                event = get_session_snapshot(session_id)
+                if event is None or (event["status"], event["progress"]) == (last_event["status"], last_event["progress"]):
+                    yield None
+                    continue
+                event.pop("tracking_id", None)
+            
+            yield event
+            last_event = event
+    finally:
+        progress_tracker.unsubscribe(tracking_id, queue)
+
+@app.get("/api/stream/{session_id}")
+async def stream_analysis_progress(session_id: str, db: Session = Depends(get_db)):
+    """Stream progress analisis dengan Server-Sent Events"""
+    
+    exists = db.query(AnalysisSession.id).filter(
+        AnalysisSession.session_id == session_id
+    ).first()
+    
+    if not exists:
+        raise HTTPException(status_code=404, detail="Session tidak ditemukan")
+    
+    async def event_stream():
+        async for event in iter_progress_events(session_id):
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"data: {json.dumps(jsonable_encoder(event))}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.websocket("/api/stream/{session_id}")
+async def websocket_analysis_progress(websocket: WebSocket, session_id: str):
+    """Stream progress analisis melalui WebSocket"""
+    await websocket.accept()
+    
+    try:
+        found = False
+        async for event in iter_progress_events(session_id):
+            found = True
+            if event is not None:
+                await websocket.send_json(jsonable_encoder(event))
+        
+        if not found:
+            await websocket.send_json({"session_id": session_id, "status": "not_found"})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
 @app.get("/api/result/{session_id}")
 async def get_analysis_result(session_id: str, db: Session = Depends(get_db)):
     """Dapatkan hasil analisis"""
@@ -283,12 +487,9 @@ async def view_influence_chart(session_id: str, db: Session = Depends(get_db)):
         
         if analysis and analysis.network_data:
             # Generate influence chart on-the-fly
-            network_data = analysis.network_data
-            network_analysis_result = network_analysis_service.analyze_network(network_data)
-            influential_nodes = network_analysis_result.get('influential_nodes', [])
+            chart_path = await run_cpu(create_influence_chart_for, analysis.network_data)
             
-            if influential_nodes:
-                chart_path = network_analysis_service.create_influence_chart(influential_nodes)
+            if chart_path:
                 if os.path.exists(chart_path):
                     return FileResponse(
                         chart_path,
@@ -305,8 +506,10 @@ async def get_statistics(db: Session = Depends(get_db)):
     # Statistik dasar
     total_analyses = db.query(HoaxAnalysis).count()
     hoax_count = db.query(HoaxAnalysis).filter(HoaxAnalysis.is_hoax == True).count()
-    bot_count = db.query(TwitterUser).filter(TwitterUser.is_bot == True).count()
-    total_users = db.query(TwitterUser).count()
+    # Akun yang hanya muncul sebagai peserta jaringan tidak dihitung
+    analyzed_users = db.query(TwitterUser).filter(TwitterUser.is_network_participant.isnot(True))
+    bot_count = analyzed_users.filter(TwitterUser.is_bot == True).count()
+    total_users = analyzed_users.count()
     
     # Statistik bulanan
     from datetime import datetime, timedelta
@@ -315,6 +518,17 @@ async def get_statistics(db: Session = Depends(get_db)):
         HoaxAnalysis.created_at >= thirty_days_ago
     ).count()
     
+    # Pemakaian token OpenAI per versi template prompt (30 hari terakhir)
+    token_usage = db.query(
+        HoaxAnalysis.prompt_template_version,
+        func.count(HoaxAnalysis.id),
+        func.sum(HoaxAnalysis.prompt_tokens),
+        func.sum(HoaxAnalysis.completion_tokens)
+    ).filter(
+        HoaxAnalysis.created_at >= thirty_days_ago,
+        HoaxAnalysis.prompt_template_version != None
+    ).group_by(HoaxAnalysis.prompt_template_version).all()
+    
     return {
         "total_analyses": total_analyses,
         "hoax_count": hoax_count,
@@ -322,7 +536,27 @@ async def get_statistics(db: Session = Depends(get_db)):
         "bot_count": bot_count,
         "bot_percentage": round((bot_count / total_users * 100), 1) if total_users > 0 else 0,
         "recent_analyses": recent_analyses,
-        "total_users": total_users
+        "total_users": total_users,
+        "llm_token_usage": [
+            {
+                "prompt_template_version": version,
+                "analyses": count,
+                "prompt_tokens": prompt_tokens or 0,
+                "completion_tokens": completion_tokens or 0,
+                "avg_prompt_tokens": round((prompt_tokens or 0) / count, 1) if count else 0
+            }
+            for version, count, prompt_tokens, completion_tokens in token_usage
+        ]
+    }
+
+@app.get("/api/health")
+async def get_health():
+    """Status dependency eksternal (circuit breaker OpenAI dan Brave Search)"""
+    dependencies = get_breaker_states()
+    
+    return {
+        "status": "degraded" if any(state["state"] != "closed" for state in dependencies.values()) else "ok",
+        "dependencies": dependencies
     }
 
 @app.get("/result/{session_id}", response_class=HTMLResponse)
@@ -385,157 +619,5 @@ async def get_analysis_history(
         "total_pages": (total_count + limit - 1) // limit
     }
 
-async def run_full_analysis(session_id: str, tweet_url: str, db: Session):
-    """Jalankan analisis lengkap"""
-    
-    try:
-        # Update status
-        session = db.query(AnalysisSession).filter(
-            AnalysisSession.session_id == session_id
-        ).first()
-        
-        if not session:
-            return
-        
-        session.status = "processing"
-        session.progress = 10
-        db.commit()
-        
-        # 1. Ekstrak data tweet
-        tweet_data = twitter_service.get_tweet_data(tweet_url)
-        session.progress = 20
-        db.commit()
-        
-        # 2. Simpan data user
-        user_data = tweet_data.get('user', {})
-        user = db.query(TwitterUser).filter(
-            TwitterUser.user_id == user_data.get('user_id')
-        ).first()
-        
-        if not user:
-            user = TwitterUser(
-                user_id=user_data.get('user_id'),
-                username=user_data.get('username'),
-                display_name=user_data.get('display_name'),
-                bio=user_data.get('bio'),
-                followers_count=user_data.get('followers_count', 0),
-                following_count=user_data.get('following_count', 0),
-                tweet_count=user_data.get('tweet_count', 0),
-                verified=user_data.get('verified', False),
-                profile_image_url=user_data.get('profile_image_url'),
-                account_creation_date=user_data.get('account_creation_date')
-            )
-            db.add(user)
-            db.commit()
-        
-        # 3. Simpan data tweet
-        tweet = db.query(Tweet).filter(
-            Tweet.tweet_id == tweet_data.get('tweet_id')
-        ).first()
-        
-        if not tweet:
-            tweet = Tweet(
-                tweet_id=tweet_data.get('tweet_id'),
-                url=tweet_url,
-                text=tweet_data.get('text'),
-                created_at_twitter=tweet_data.get('created_at'),
-                retweet_count=tweet_data.get('retweet_count', 0),
-                like_count=tweet_data.get('like_count', 0),
-                reply_count=tweet_data.get('reply_count', 0),
-                quote_count=tweet_data.get('quote_count', 0),
-                user_id=user_data.get('user_id')
-            )
-            db.add(tweet)
-            db.commit()
-        
-        session.progress = 30
-        db.commit()
-        
-        # 4. Analisis hoax dengan OpenAI
-        hoax_analysis = openai_service.analyze_hoax(tweet_data.get('text', ''), user_data)
-        session.progress = 50
-        db.commit()
-        
-        # 5. Deteksi bot
-        bot_analysis = bot_detection_service.detect_bot(user_data)
-        
-        # Update user dengan hasil bot detection
-        user.bot_probability = bot_analysis.get('bot_probability', 0)
-        user.is_bot = bot_analysis.get('is_bot', False)
-        user.bot_detection_date = datetime.utcnow()
-        db.commit()
-        
-        session.progress = 60
-        db.commit()
-        
-        # 6. Fact-checking dengan Brave Search
-        search_query = f"fact check {tweet_data.get('text', '')[:100]}"
-        fact_check_results = brave_search_service.search_for_fact_check(search_query, tweet_data.get('text', ''))
-        session.progress = 70
-        db.commit()
-        
-        # 7. Analisis jaringan
-        network_data = twitter_service.get_tweet_network_data(tweet_data.get('tweet_id'))
-        network_analysis = network_analysis_service.analyze_network(network_data)
-        session.progress = 80
-        db.commit()
-        
-        # 8. Buat visualisasi jaringan
-        visualization_path = network_analysis_service.create_network_visualization()
-        
-        # 8.1. Buat influence chart
-        influential_nodes = network_analysis.get('influential_nodes', [])
-        influence_chart_path = ""
-        if influential_nodes:
-            influence_chart_path = network_analysis_service.create_influence_chart(influential_nodes)
-        
-        session.progress = 85
-        db.commit()
-        
-        # 9. Generate laporan PDF
-        analysis_data = {
-            'tweet_url': tweet_url,
-            'tweet_data': tweet_data,
-            'hoax_analysis': hoax_analysis,
-            'bot_detection': bot_analysis,
-            'fact_check_results': fact_check_results,
-            'network_analysis': network_analysis
-        }
-        
-        pdf_path = pdf_service.generate_hoax_report(analysis_data)
-        session.progress = 95
-        db.commit()
-        
-        # 10. Simpan hasil analisis
-        analysis = HoaxAnalysis(
-            tweet_id=tweet_data.get('tweet_id'),
-            openai_analysis=hoax_analysis.get('raw_analysis', ''),
-            hoax_probability=hoax_analysis.get('hoax_probability', 0),
-            is_hoax=hoax_analysis.get('is_hoax', False),
-            hoax_reasons=hoax_analysis.get('reasons', []),
-            fact_check_results=fact_check_results,
-            network_data=network_data,
-            influence_score=network_analysis.get('total_interactions', 0),
-            network_visualization_path=visualization_path,
-            influence_chart_path=influence_chart_path,
-            pdf_report_path=pdf_path
-        )
-        
-        db.add(analysis)
-        db.commit()
-        
-        # Update session dengan hasil
-        session.analysis_id = analysis.id
-        session.status = "completed"
-        session.progress = 100
-        db.commit()
-        
-    except Exception as e:
-        # Update session dengan error
-        session.status = "failed"
-        session.error_message = str(e)
-        db.commit()
-        print(f"Error in analysis: {e}")
-
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000, debug=config.DEBUG) 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, JSON, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -25,6 +25,9 @@ class TwitterUser(Base):
     bot_probability = Column(Float, default=0.0)
     is_bot = Column(Boolean, default=False)
     bot_detection_date = Column(DateTime)
+    bot_profile_fingerprint = Column(String)  # Hash field profil saat skor dihitung
+    bot_detection_result = Column(JSON)  # Hasil detect_bot lengkap untuk dipakai ulang
+    is_network_participant = Column(Boolean, default=False, index=True)  # Hanya dikenal sebagai peserta jaringan, tidak dihitung di statistik
     
     # Relationship dengan tweets
     tweets = relationship("Tweet", back_populates="user")
@@ -63,13 +66,17 @@ class HoaxAnalysis(Base):
     __tablename__ = "hoax_analyses"
     
     id = Column(Integer, primary_key=True, index=True)
-    tweet_id = Column(String, ForeignKey("tweets.tweet_id"))
+    tweet_id = Column(String, ForeignKey("tweets.tweet_id"), index=True)
     
     # Hasil analisis OpenAI
     openai_analysis = Column(Text)
     hoax_probability = Column(Float)
     is_hoax = Column(Boolean)
     hoax_reasons = Column(JSON)  # List alasan mengapa dianggap hoax
+    prompt_template_version = Column(String)  # Versi template prompt (kosong jika tidak memanggil OpenAI)
+    prompt_tokens = Column(Integer, default=0)  # Token prompt yang dipakai
+    completion_tokens = Column(Integer, default=0)  # Token jawaban yang dipakai
+    verdict_source = Column(String, index=True)  # llm, fallback, prescreen, atau near_duplicate
     
     # Hasil fact-checking dari Brave Search
     fact_check_results = Column(JSON)
@@ -100,20 +107,75 @@ class AnalysisSession(Base):
     
     # Input dari user
     tweet_url = Column(String)
+    tweet_id = Column(String, index=True)  # ID kanonik dari URL, kunci cache hasil
     user_ip = Column(String)
     user_agent = Column(String)
     
     # Status analisis
-    status = Column(String, default="pending")  # pending, processing, completed, failed
+    status = Column(String, default="pending", index=True)  # pending, processing, completed, failed
     progress = Column(Integer, default=0)  # 0-100
     error_message = Column(Text)
     
+    # Antrian job (leasing oleh worker)
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    available_at = Column(DateTime, default=datetime.utcnow, index=True)  # Waktu job boleh diambil
+    lease_owner = Column(String)  # ID worker yang sedang memproses
+    lease_expires_at = Column(DateTime)  # Job kembali ke antrian jika lease habis
+    
     # Hasil
     analysis_id = Column(Integer, ForeignKey("hoax_analyses.id"))
+    cached = Column(Boolean, default=False)  # True jika hasil diambil dari analisis sebelumnya
+    leader_session_id = Column(String, index=True)  # Session yang menjalankan job untuk tweet yang sama
+    batch_id = Column(String, index=True)  # Batch asal jika dikirim lewat /api/analyze/batch
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Paling banyak satu job aktif (leader) per tweet, dijaga database agar single-flight
+    # tetap berlaku untuk submission yang bersamaan dari beberapa request atau proses
+    __table_args__ = (
+        Index(
+            "ux_analysis_sessions_active_leader", "tweet_id", unique=True,
+            sqlite_where=text("leader_session_id IS NULL AND status IN ('pending', 'processing')"),
+            postgresql_where=text("leader_session_id IS NULL AND status IN ('pending', 'processing')")
+        ),
+    )
+
+class AnalysisBatch(Base):
+    """Model untuk batch analisis (banyak URL dalam satu request)"""
+    __tablename__ = "analysis_batches"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    batch_id = Column(String, unique=True, index=True)
+    
+    # Ringkasan input
+    total_items = Column(Integer, default=0)  # Jumlah session yang dijadwalkan
+    duplicate_count = Column(Integer, default=0)  # URL dengan tweet_id yang sudah ada di batch
+    invalid_count = Column(Integer, default=0)  # URL yang tidak dikenali
+    max_concurrency = Column(Integer)  # Batas job batch ini yang diproses bersamaan
+    
+    user_ip = Column(String)
+    user_agent = Column(String)
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+class CacheEntry(Base):
+    """Model untuk cache persisten (respons LLM, hasil pencarian, dll)"""
+    __tablename__ = "cache_entries"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    namespace = Column(String, index=True)  # Jenis cache, mis. "llm"
+    cache_key = Column(String, unique=True, index=True)  # Hash dari namespace dan isi request
+    value = Column(JSON)
+    
+    hit_count = Column(Integer, default=0)
+    last_accessed_at = Column(DateTime, default=datetime.utcnow, index=True)  # Dasar eviction LRU
+    expires_at = Column(DateTime, index=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+
 class TelegramUser(Base):
     """Model untuk pengguna Telegram bot"""
     __tablename__ = "telegram_users"
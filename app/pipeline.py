@@ -0,0 +1,71 @@
+import asyncio
+from typing import Dict, Any, List, Callable, Awaitable, Optional, Iterable
+
+
+class Stage:
+    """Satu tahap dalam pipeline analisis"""
+
+    def __init__(self, name: str, func: Callable[[Dict[str, Any]], Awaitable[Any]],
+                 depends_on: Iterable[str] = (), progress: int = 0):
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on)
+        self.progress = progress
+
+
+class StagePipeline:
+    """Eksekutor DAG untuk tahap-tahap analisis.
+
+    Setiap tahap dijalankan segera setelah semua dependensinya selesai,
+    sehingga tahap yang saling independen berjalan paralel.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Stage] = {}
+
+    def add_stage(self, name: str, func: Callable[[Dict[str, Any]], Awaitable[Any]],
+                  depends_on: Iterable[str] = (), progress: int = 0) -> "StagePipeline":
+        """Daftarkan tahap baru; func menerima dict hasil tahap sebelumnya"""
+        if name in self.stages:
+            raise ValueError(f"Tahap '{name}' sudah terdaftar")
+
+        for dependency in depends_on:
+            if dependency not in self.stages:
+                raise ValueError(f"Dependensi '{dependency}' untuk tahap '{name}' belum terdaftar")
+
+        self.stages[name] = Stage(name, func, depends_on, progress)
+        return self
+
+    async def run(self, on_stage_complete: Optional[Callable[[Stage, int], Awaitable[None]]] = None) -> Dict[str, Any]:
+        """Jalankan semua tahap dan kembalikan hasil per nama tahap"""
+        results: Dict[str, Any] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        completed: List[str] = []
+        total_progress = sum(stage.progress for stage in self.stages.values())
+
+        async def run_stage(stage: Stage):
+            if stage.depends_on:
+                await asyncio.gather(*(tasks[dependency] for dependency in stage.depends_on))
+
+            results[stage.name] = await stage.func(results)
+            completed.append(stage.name)
+
+            if on_stage_complete:
+                done_progress = sum(self.stages[name].progress for name in completed)
+                percent = int(done_progress * 100 / total_progress) if total_progress else 100
+                await on_stage_complete(stage, percent)
+
+        # Tahap didaftarkan setelah dependensinya, jadi urutan dict sudah topologis
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.create_task(run_stage(stage))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return results
+
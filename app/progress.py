@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class ProgressTracker:
+    """Progress analisis di memori sekaligus event bus untuk streaming.
+
+    Database menerima progress tahap secara ter-throttle (lihat
+    run_full_analysis), saat heartbeat lease, dan saat hasil akhir disimpan.
+    Setiap perubahan dikirim ke subscriber (SSE/WebSocket) tanpa polling.
+    """
+
+    def __init__(self):
+        self._progress: Dict[str, Dict[str, Any]] = {}
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, session_id: str, progress: int, stage: str = None):
+        """Catat progress terbaru sebuah session (stage = tahap yang baru selesai)"""
+        event = {
+            'session_id': session_id,
+            'status': 'processing',
+            'progress': progress,
+            'stage': stage,
+            'error_message': None
+        }
+        with self._lock:
+            self._progress[session_id] = event
+        self.publish(session_id, event)
+
+    def finish(self, session_id: str, status: str, error_message: str = None):
+        """Tandai akhir pemrosesan (completed, failed, atau pending jika dijadwalkan ulang)"""
+        with self._lock:
+            last = self._progress.pop(session_id, None)
+
+        if status == 'completed':
+            progress = 100
+        else:
+            progress = last['progress'] if last else 0
+
+        self.publish(session_id, {
+            'session_id': session_id,
+            'status': status,
+            'progress': progress,
+            'stage': None,
+            'error_message': error_message
+        })
+
+    def partial(self, session_id: str, stage: str, result: Dict[str, Any]):
+        """Kirim hasil sementara sebuah tahap (mis. verdict hoax awal) tanpa mengubah progress"""
+        with self._lock:
+            last = self._progress.get(session_id)
+
+        self.publish(session_id, {
+            'session_id': session_id,
+            'status': 'processing',
+            'progress': last['progress'] if last else 0,
+            'stage': None,
+            'partial_stage': stage,
+            'partial_result': result,
+            'error_message': None
+        })
+
+    def get(self, session_id: str) -> Optional[int]:
+        """Ambil progress terbaru, None jika session tidak diproses di proses ini"""
+        with self._lock:
+            entry = self._progress.get(session_id)
+        return entry['progress'] if entry else None
+
+    def publish(self, session_id: str, event: Dict[str, Any]):
+        """Kirim event ke semua subscriber; aman dipanggil dari thread mana pun"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(session_id, []))
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # Event loop subscriber sudah ditutup
+                pass
+
+    def subscribe(self, session_id: str) -> asyncio.Queue:
+        """Daftarkan subscriber baru di event loop yang sedang berjalan"""
+        queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers.setdefault(session_id, []).append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, session_id: str, queue: asyncio.Queue):
+        """Hapus subscriber"""
+        with self._lock:
+            subscribers = [item for item in self._subscribers.get(session_id, []) if item[1] is not queue]
+            if subscribers:
+                self._subscribers[session_id] = subscribers
+            else:
+                self._subscribers.pop(session_id, None)
+
+
+progress_tracker = ProgressTracker()
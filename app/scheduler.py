@@ -0,0 +1,177 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import AnalysisSession, HoaxAnalysis
+from app.analysis import twitter_service
+from app import job_queue
+from app.config import config
+
+# Jumlah parameter IN per query (SQLite membatasi jumlah parameter)
+LOOKUP_CHUNK_SIZE = 500
+
+
+class AnalysisScheduler:
+    """Penjadwal analysis session.
+
+    Urutan: pakai hasil cache jika masih segar, gabung ke job yang sedang
+    berjalan untuk tweet yang sama (single-flight), atau buat job baru.
+    """
+
+    def __init__(self, result_cache_ttl: int = None):
+        self.result_cache_ttl = config.RESULT_CACHE_TTL if result_cache_ttl is None else result_cache_ttl
+
+    def submit(self, db: Session, tweet_url: str, user_ip: str = None, user_agent: str = None) -> AnalysisSession:
+        """Buat analysis session baru untuk URL tweet (commit dilakukan pemanggil)"""
+        tweet_id = twitter_service.extract_tweet_id(tweet_url)
+        analysis_session = self._new_session(tweet_url, tweet_id, user_ip, user_agent)
+
+        cached_analysis = self.find_cached_analysis(db, tweet_id)
+        leader = None if cached_analysis else self.find_inflight_leader(db, tweet_id)
+
+        self._schedule(db, analysis_session, cached_analysis, leader.session_id if leader else None)
+        return analysis_session
+
+    def submit_many(self, db: Session, tweet_urls: List[str], user_ip: str = None, user_agent: str = None,
+                    batch_id: str = None) -> List[AnalysisSession]:
+        """Jadwalkan banyak URL sekaligus (commit dilakukan pemanggil).
+
+        Cache hasil dan job yang sedang berjalan dicari dengan query IN per
+        potongan, bukan dua query per URL. URL dengan tweet_id yang sama
+        digabung ke job pertama.
+        """
+        items = [(tweet_url, twitter_service.extract_tweet_id(tweet_url)) for tweet_url in tweet_urls]
+        tweet_ids = list({tweet_id for _, tweet_id in items if tweet_id})
+
+        cached_analyses = self.find_cached_analyses(db, tweet_ids)
+        leaders = self.find_inflight_leaders(db, [tweet_id for tweet_id in tweet_ids if tweet_id not in cached_analyses])
+
+        sessions = []
+        for tweet_url, tweet_id in items:
+            analysis_session = self._new_session(tweet_url, tweet_id, user_ip, user_agent)
+            analysis_session.batch_id = batch_id
+            self._schedule(db, analysis_session, cached_analyses.get(tweet_id), leaders.get(tweet_id))
+
+            # URL berikutnya dengan tweet_id yang sama ikut job ini (atau leader yang ditemukan saat klaim)
+            if tweet_id and tweet_id not in leaders and not analysis_session.cached:
+                leaders[tweet_id] = analysis_session.leader_session_id or analysis_session.session_id
+            sessions.append(analysis_session)
+
+        return sessions
+
+    def _new_session(self, tweet_url: str, tweet_id: Optional[str], user_ip: str, user_agent: str) -> AnalysisSession:
+        """Buat objek AnalysisSession baru"""
+        return AnalysisSession(
+            session_id=str(uuid.uuid4()),
+            tweet_id=tweet_id,
+            tweet_url=tweet_url,
+            user_ip=user_ip,
+            user_agent=user_agent or ""
+        )
+
+    def _schedule(self, db: Session, analysis_session: AnalysisSession,
+                  cached_analysis: Optional[HoaxAnalysis], leader_session_id: Optional[str]):
+        """Pakai hasil cache, gabung ke job yang berjalan, atau masukkan ke antrian"""
+
+        # Tweet yang sama baru saja dianalisis: pakai hasil yang ada
+        if cached_analysis:
+            analysis_session.analysis_id = cached_analysis.id
+            analysis_session.status = "completed"
+            analysis_session.progress = 100
+            analysis_session.cached = True
+            db.add(analysis_session)
+            return
+
+        while True:
+            # Tweet yang sama sedang dianalisis: gabungkan ke job yang berjalan
+            if leader_session_id:
+                analysis_session.leader_session_id = leader_session_id
+                analysis_session.status = "pending"
+                analysis_session.progress = 0
+                db.add(analysis_session)
+                return
+
+            # Masukkan ke antrian; worker akan mengambil dan menjalankan analisis
+            if self._claim_leader(db, analysis_session):
+                return
+
+            # Submission lain untuk tweet yang sama baru saja menjadi leader: ikut job tersebut
+            leader = self.find_inflight_leader(db, analysis_session.tweet_id)
+            leader_session_id = leader.session_id if leader else None
+
+    def _claim_leader(self, db: Session, analysis_session: AnalysisSession) -> bool:
+        """Masukkan session ke antrian sebagai leader tweet-nya.
+
+        Insert dijalankan dalam savepoint; index unik leader aktif menolaknya
+        jika submission lain sudah lebih dulu menjadi leader untuk tweet_id
+        yang sama, dan False dikembalikan tanpa membatalkan transaksi pemanggil.
+        """
+        try:
+            with db.begin_nested():
+                job_queue.enqueue(db, analysis_session)
+        except IntegrityError:
+            return False
+        return True
+
+    def find_cached_analysis(self, db: Session, tweet_id: Optional[str]) -> Optional[HoaxAnalysis]:
+        """Cari hasil analisis terbaru untuk tweet_id yang masih dalam TTL"""
+        if not tweet_id:
+            return None
+        return self.find_cached_analyses(db, [tweet_id]).get(tweet_id)
+
+    def find_cached_analyses(self, db: Session, tweet_ids: List[str]) -> Dict[str, HoaxAnalysis]:
+        """Hasil analisis terbaru per tweet_id yang masih dalam TTL"""
+        if not tweet_ids or self.result_cache_ttl <= 0:
+            return {}
+
+        fresh_since = datetime.utcnow() - timedelta(seconds=self.result_cache_ttl)
+        cached = {}
+        for chunk in _chunks(tweet_ids):
+            analyses = db.query(HoaxAnalysis).filter(
+                HoaxAnalysis.tweet_id.in_(chunk),
+                HoaxAnalysis.created_at >= fresh_since
+            ).order_by(HoaxAnalysis.created_at).all()
+
+            # Urut naik, jadi analisis terbaru menimpa yang lebih lama
+            for analysis in analyses:
+                cached[analysis.tweet_id] = analysis
+
+        return cached
+
+    def find_inflight_leader(self, db: Session, tweet_id: Optional[str]) -> Optional[AnalysisSession]:
+        """Cari job aktif (bukan session gabungan) untuk tweet_id yang sama"""
+        if not tweet_id:
+            return None
+
+        return db.query(AnalysisSession).filter(
+            AnalysisSession.tweet_id == tweet_id,
+            AnalysisSession.leader_session_id == None,
+            AnalysisSession.status.in_(["pending", "processing"])
+        ).order_by(AnalysisSession.created_at).first()
+
+    def find_inflight_leaders(self, db: Session, tweet_ids: List[str]) -> Dict[str, str]:
+        """session_id job aktif tertua per tweet_id"""
+        leaders = {}
+        for chunk in _chunks(tweet_ids):
+            rows = db.query(AnalysisSession.tweet_id, AnalysisSession.session_id).filter(
+                AnalysisSession.tweet_id.in_(chunk),
+                AnalysisSession.leader_session_id == None,
+                AnalysisSession.status.in_(["pending", "processing"])
+            ).order_by(AnalysisSession.created_at.desc()).all()
+
+            # Urut turun, jadi job tertua yang tersimpan terakhir
+            for tweet_id, session_id in rows:
+                leaders[tweet_id] = session_id
+
+        return leaders
+
+
+def _chunks(values: List[str]):
+    """Potong list menjadi beberapa bagian untuk query IN"""
+    for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+        yield values[start:start + LOOKUP_CHUNK_SIZE]
+
+
+analysis_scheduler = AnalysisScheduler()
@@ -1,9 +1,145 @@
 import re
 import math
+import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from app.config import config
 
+# Urutan indikator; skor total dijumlahkan dengan urutan yang sama dengan detect_bot
+INDICATORS = [
+    'username_pattern', 'display_name_pattern', 'follower_ratio', 'account_age',
+    'tweet_frequency', 'profile_completeness', 'bio_pattern'
+]
+
+# Pola username mencurigakan; nama grup dipakai untuk tahu pola mana yang cocok
+SUSPICIOUS_USERNAME_PATTERNS = {
+    'name_long_number': r'[a-zA-Z]+\d{4,}',  # nama + angka panjang
+    'name_underscore_number': r'[a-zA-Z]+_\d{4,}',  # nama_angka
+    'digit_letter_digit': r'\d+[a-zA-Z]+\d+',  # angka-huruf-angka
+    'generic_prefix': r'(?:user|bot|account)\d+',  # user/bot/account + angka
+    'short_long_number': r'[a-zA-Z]{1,3}\d{6,}',  # huruf pendek + angka panjang
+}
+
+GENERIC_DISPLAY_NAMES = ['user', 'account', 'info', 'news', 'update', 'official']
+BIO_BOT_KEYWORDS = ['bot', 'automated', 'auto', 'script', 'program']
+
+
+class BotPatternMatcher:
+    """Regex pola bot yang dikompilasi sekali.
+    
+    Semua pola username digabung menjadi satu alternation dengan grup bernama,
+    jadi satu username cukup dicek sekali. URL di bio dicocokkan dengan satu
+    kelas karakter tanpa alternation sehingga waktunya linear terhadap panjang bio.
+    """
+    
+    def __init__(self):
+        alternation = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in SUSPICIOUS_USERNAME_PATTERNS.items())
+        self.username_regex = re.compile(f'^(?:{alternation})$', re.IGNORECASE)
+        self.symbol_regex = re.compile(r'[^\w\s]')
+        self.url_regex = re.compile(r'https?://[^\s<>"]+')
+        self.generic_name_regex = re.compile('|'.join(map(re.escape, GENERIC_DISPLAY_NAMES)))
+        self.bot_keyword_regex = re.compile('|'.join(map(re.escape, BIO_BOT_KEYWORDS)))
+    
+    def username_pattern(self, username: str) -> Optional[str]:
+        """Nama pola username mencurigakan yang cocok, None jika tidak ada"""
+        match = self.username_regex.match(username)
+        return match.lastgroup if match else None
+    
+    def symbol_count(self, text: str) -> int:
+        """Jumlah karakter selain huruf, angka, dan spasi (emoji, simbol)"""
+        return len(self.symbol_regex.findall(text))
+    
+    def url_count(self, text: str) -> int:
+        """Jumlah URL http/https di teks"""
+        return len(self.url_regex.findall(text))
+    
+    def has_generic_name(self, text_lower: str) -> bool:
+        """Nama tampilan (huruf kecil) mengandung kata generik?"""
+        return self.generic_name_regex.search(text_lower) is not None
+    
+    def has_bot_keyword(self, text_lower: str) -> bool:
+        """Bio (huruf kecil) mengandung kata kunci bot?"""
+        return self.bot_keyword_regex.search(text_lower) is not None
+
+
+def _account_age_days(creation_date, now: datetime) -> float:
+    """Umur akun dalam hari penuh, NaN jika tanggal kosong atau tidak valid"""
+    if not creation_date:
+        return math.nan
+    
+    if isinstance(creation_date, str):
+        try:
+            creation_date = datetime.fromisoformat(creation_date.replace('Z', '+00:00'))
+        except ValueError:
+            return math.nan
+    
+    return float((now - creation_date.replace(tzinfo=None)).days)
+
+
+def user_columns(users_data: List[Dict[str, Any]], now: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+    """Ubah daftar profil menjadi kolom NumPy untuk score_user_columns"""
+    now = now or datetime.now()
+    
+    def column(values, dtype):
+        return np.fromiter(values, dtype=dtype, count=len(users_data))
+    
+    return {
+        'followers': column((user.get('followers_count') or 0 for user in users_data), np.float64),
+        'following': column((user.get('following_count') or 0 for user in users_data), np.float64),
+        'tweet_count': column((user.get('tweet_count') or 0 for user in users_data), np.float64),
+        'age_days': column((_account_age_days(user.get('account_creation_date'), now) for user in users_data), np.float64),
+        'has_bio': column((bool(user.get('bio')) for user in users_data), np.bool_),
+        'has_image': column((bool(user.get('profile_image_url')) for user in users_data), np.bool_),
+        'verified': column((bool(user.get('verified')) for user in users_data), np.bool_),
+        'has_display_name': column((bool(user.get('display_name')) for user in users_data), np.bool_)
+    }
+
+
+def score_user_columns(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Skor indikator numerik (rasio, umur, frekuensi, kelengkapan) untuk semua akun sekaligus.
+    
+    Aturannya sama persis dengan _analyze_follower_ratio, _analyze_account_age,
+    _analyze_tweet_frequency, dan _analyze_profile_completeness.
+    """
+    followers = columns['followers']
+    following = columns['following']
+    tweet_count = columns['tweet_count']
+    age_days = columns['age_days']
+    known_age = ~np.isnan(age_days)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = following / followers
+        tweets_per_day = tweet_count / np.maximum(age_days, 1)
+    
+    follower_ratio = np.select(
+        [(followers == 0) & (following == 0), followers == 0, ratio > 10, ratio > 5, ratio > 2, ratio < 0.1],
+        [0.7, 0.8, 0.9, 0.7, 0.5, 0.3],
+        default=0.1
+    )
+    account_age = np.select(
+        [~known_age, age_days < 30, age_days < 90, age_days < 365],
+        [0.5, 0.8, 0.6, 0.3],
+        default=0.1
+    )
+    tweet_frequency = np.select(
+        [~known_age | (tweet_count == 0), tweets_per_day > 50, tweets_per_day > 20, tweets_per_day > 10, tweets_per_day < 0.1],
+        [0.5, 0.9, 0.7, 0.5, 0.3],
+        default=0.1
+    )
+    
+    completeness = (
+        columns['has_bio'].astype(np.int64) + columns['has_image'] + columns['verified']
+        + columns['has_display_name'] + (followers > 0)
+    )
+    profile_completeness = (1 - completeness / 5) * 0.8
+    
+    return {
+        'follower_ratio': follower_ratio,
+        'account_age': account_age,
+        'tweet_frequency': tweet_frequency,
+        'profile_completeness': profile_completeness
+    }
+
 class BotDetectionService:
     """Service untuk deteksi bot Twitter"""
     
@@ -17,6 +153,7 @@ class BotDetectionService:
             'profile_completeness': 0.15,
             'bio_pattern': 0.2
         }
+        self.patterns = BotPatternMatcher()
     
     def detect_bot(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Deteksi apakah akun merupakan bot"""
@@ -75,17 +212,8 @@ class BotDetectionService:
         if not username:
             return 0.5
         
-        suspicious_patterns = [
-            r'^[a-zA-Z]+\d{4,}$',  # nama + angka panjang
-            r'^[a-zA-Z]+_\d{4,}$',  # nama_angka
-            r'^\d+[a-zA-Z]+\d+$',  # angka-huruf-angka
-            r'^(user|bot|account)\d+$',  # user/bot/account + angka
-            r'^[a-zA-Z]{1,3}\d{6,}$',  # huruf pendek + angka panjang
-        ]
-        
-        for pattern in suspicious_patterns:
-            if re.match(pattern, username, re.IGNORECASE):
-                return 0.8
+        if self.patterns.username_pattern(username):
+            return 0.8
         
         # Cek karakter berulang
         if len(set(username)) < len(username) * 0.5:
@@ -103,13 +231,12 @@ class BotDetectionService:
             return 0.3
         
         # Cek karakter aneh atau emoji berlebihan
-        emoji_count = len(re.findall(r'[^\w\s]', display_name))
+        emoji_count = self.patterns.symbol_count(display_name)
         if emoji_count > len(display_name) * 0.3:
             return 0.6
         
         # Cek nama yang terlalu umum
-        generic_names = ['user', 'account', 'info', 'news', 'update', 'official']
-        if any(name in display_name.lower() for name in generic_names):
+        if self.patterns.has_generic_name(display_name.lower()):
             return 0.5
         
         return 0.1
@@ -216,12 +343,11 @@ class BotDetectionService:
             return 0.6
         
         # Cek kata kunci bot
-        bot_keywords = ['bot', 'automated', 'auto', 'script', 'program']
-        if any(keyword in bio.lower() for keyword in bot_keywords):
+        if self.patterns.has_bot_keyword(bio.lower()):
             return 0.9
         
         # Cek link spam
-        link_count = len(re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', bio))
+        link_count = self.patterns.url_count(bio)
         if link_count > 2:
             return 0.7
         
@@ -307,15 +433,54 @@ class BotDetectionService:
         
         return recommendations[:5]  # Batasi maksimal 5 rekomendasi
     
+    def score_users(self, users_data: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Skor semua indikator untuk banyak akun; indikator numerik dihitung secara vektor"""
+        scores = score_user_columns(user_columns(users_data))
+        
+        # Indikator berbasis regex tetap per baris
+        def row_scores(analyze, field):
+            return np.fromiter((analyze(user.get(field, '')) for user in users_data), dtype=np.float64, count=len(users_data))
+        
+        scores['username_pattern'] = row_scores(self._analyze_username_pattern, 'username')
+        scores['display_name_pattern'] = row_scores(self._analyze_display_name_pattern, 'display_name')
+        scores['bio_pattern'] = row_scores(self._analyze_bio_pattern, 'bio')
+        return scores
+    
+    def weighted_score(self, scores: Dict[str, np.ndarray]) -> np.ndarray:
+        """Skor total per akun dari hasil score_users"""
+        total = np.zeros(len(scores['follower_ratio']))
+        for key in INDICATORS:
+            total = total + scores[key] * self.bot_indicators[key]
+        return total
+    
+    def bot_probabilities(self, users_data: List[Dict[str, Any]]) -> np.ndarray:
+        """Probabilitas bot (dibulatkan seperti detect_bot) untuk banyak akun"""
+        return np.round(self.weighted_score(self.score_users(users_data)), 3)
+    
     def batch_detect_bots(self, users_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Deteksi bot untuk multiple users"""
-        results = []
+        if not users_data:
+            return []
         
-        for user_data in users_data:
-            result = self.detect_bot(user_data)
-            result['user_id'] = user_data.get('user_id')
-            result['username'] = user_data.get('username')
-            results.append(result)
+        scores = self.score_users(users_data)
+        total_scores = self.weighted_score(scores).tolist()
+        score_rows = zip(*(scores[key].tolist() for key in INDICATORS))
+        
+        results = []
+        for user_data, total_score, row in zip(users_data, total_scores, score_rows):
+            user_scores = dict(zip(INDICATORS, row))
+            is_bot = total_score > config.BOT_DETECTION_THRESHOLD
+            results.append({
+                'bot_probability': round(total_score, 3),
+                'is_bot': is_bot,
+                'confidence_level': self._get_confidence_level(total_score),
+                'scores': user_scores,
+                'explanation': self._generate_explanation(user_scores, total_score),
+                'risk_factors': self._identify_risk_factors(user_scores),
+                'recommendations': self._get_recommendations(user_scores, is_bot),
+                'user_id': user_data.get('user_id'),
+                'username': user_data.get('username')
+            })
         
         return results
     
@@ -340,4 +505,9 @@ class BotDetectionService:
             'human_accounts': total_accounts - bot_accounts,
             'bot_percentage': round((bot_accounts / total_accounts) * 100, 1),
             'average_bot_probability': round(average_probability, 3)
-        } 
\ No newline at end of file
+        }
+
+
+def detect_bots_batch(users_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """batch_detect_bots sebagai fungsi level modul agar bisa dijalankan di process pool"""
+    return BotDetectionService().batch_detect_bots(users_data)
@@ -0,0 +1,151 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.database import SessionLocal
+from app.models import TwitterUser
+
+# Field profil yang dipakai indikator bot; perubahan apa pun berarti skor dihitung ulang
+PROFILE_FIELDS = ['username', 'display_name', 'bio', 'verified', 'profile_image_url', 'account_creation_date']
+
+# Metrik yang boleh berubah sedikit tanpa menghitung ulang skor
+METRIC_FIELDS = ['followers_count', 'following_count', 'tweet_count']
+
+# user_id per query IN, di bawah batas parameter SQLite
+QUERY_CHUNK_SIZE = 500
+
+
+def profile_fingerprint(user_data: Dict[str, Any]) -> str:
+    """Hash field profil yang memengaruhi skor bot"""
+    values = []
+    for field in PROFILE_FIELDS:
+        value = user_data.get(field)
+        if field in ('verified', 'profile_image_url'):
+            value = bool(value)
+        elif isinstance(value, datetime):
+            value = value.replace(tzinfo=None).isoformat()
+        values.append(value if value is not None else '')
+
+    payload = json.dumps(values, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def metric_drift(old: Optional[int], new: Optional[int]) -> float:
+    """Perubahan relatif metrik sejak skor terakhir"""
+    old = old or 0
+    new = new or 0
+    return abs(new - old) / max(old, 1)
+
+
+class BotScoreCache:
+    """Skor bot tersimpan di twitter_users dipakai ulang selama profil tidak berubah.
+
+    Skor dianggap masih berlaku jika fingerprint profil sama, umurnya
+    (bot_detection_date) belum melewati ttl, dan follower/following/jumlah
+    tweet tidak bergeser lebih dari drift_threshold secara relatif.
+    """
+
+    def __init__(self, ttl: int, drift_threshold: float):
+        self.ttl = ttl
+        self.drift_threshold = drift_threshold
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Hasil deteksi bot tersimpan untuk satu akun, None jika perlu dihitung ulang"""
+        return self.get_many([user_data]).get(user_data.get('user_id'))
+
+    def get_many(self, users_data: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Hasil tersimpan yang masih berlaku, per user_id"""
+        users_by_id = {user['user_id']: user for user in users_data if user.get('user_id')}
+        if not self.enabled or not users_by_id:
+            return {}
+
+        db = SessionLocal()
+        try:
+            scored_after = datetime.utcnow() - timedelta(seconds=self.ttl)
+            results = {}
+            for row in self._query_users(db, list(users_by_id), TwitterUser.bot_detection_date >= scored_after):
+                user_data = users_by_id[row.user_id]
+                if self._is_fresh(row, user_data):
+                    results[row.user_id] = {**row.bot_detection_result, 'cached': True}
+            return results
+        except Exception as e:
+            print(f"Error reading bot score cache: {e}")
+            return {}
+        finally:
+            db.close()
+
+    def apply(self, user: TwitterUser, user_data: Dict[str, Any], result: Dict[str, Any]):
+        """Simpan skor baru beserta profil yang dinilai ke baris twitter_users"""
+        for field in METRIC_FIELDS:
+            setattr(user, field, user_data.get(field) or 0)
+
+        user.bot_probability = result.get('bot_probability', 0)
+        user.is_bot = result.get('is_bot', False)
+        user.bot_detection_date = datetime.utcnow()
+        user.bot_profile_fingerprint = profile_fingerprint(user_data)
+        user.bot_detection_result = {key: value for key, value in result.items() if key != 'cached'}
+
+    def store_many(self, db, users_data: List[Dict[str, Any]], results: Dict[str, Dict[str, Any]]):
+        """Simpan skor baru peserta jaringan di session db milik pemanggil (belum di-commit).
+
+        Akun baru ditandai is_network_participant sehingga tidak ikut statistik pengguna.
+        Akun baru dimasukkan satu per satu dalam savepoint: job lain yang jaringannya
+        memuat akun yang sama bisa lebih dulu menyimpannya, dan baris itu yang diperbarui.
+        """
+        users_by_id = {
+            user['user_id']: user for user in users_data
+            if user.get('user_id') in results and not results[user['user_id']].get('cached')
+        }
+        if not users_by_id:
+            return
+
+        # Perubahan pemanggil di-flush dulu agar error-nya tidak tertukar dengan konflik peserta
+        db.flush()
+        rows = {row.user_id: row for row in self._query_users(db, list(users_by_id))}
+        for user_id, user_data in users_by_id.items():
+            user = rows.get(user_id) or self._insert_participant(db, user_id, user_data)
+            self.apply(user, user_data, results[user_id])
+
+    def _insert_participant(self, db, user_id: str, user_data: Dict[str, Any]) -> TwitterUser:
+        """Tambah baris peserta baru, atau ambil baris yang baru saja disimpan job lain"""
+        user = TwitterUser(
+            user_id=user_id,
+            username=user_data.get('username'),
+            display_name=user_data.get('display_name'),
+            bio=user_data.get('bio'),
+            verified=user_data.get('verified', False),
+            profile_image_url=user_data.get('profile_image_url'),
+            account_creation_date=user_data.get('account_creation_date'),
+            is_network_participant=True
+        )
+        try:
+            with db.begin_nested():
+                db.add(user)
+        except IntegrityError:
+            user = db.query(TwitterUser).filter(TwitterUser.user_id == user_id).one()
+        return user
+
+    def _query_users(self, db, user_ids: List[str], *criteria) -> List[TwitterUser]:
+        rows = []
+        for start in range(0, len(user_ids), QUERY_CHUNK_SIZE):
+            rows += db.query(TwitterUser).filter(
+                TwitterUser.user_id.in_(user_ids[start:start + QUERY_CHUNK_SIZE]), *criteria
+            ).all()
+        return rows
+
+    def _is_fresh(self, row: TwitterUser, user_data: Dict[str, Any]) -> bool:
+        if not row.bot_detection_result or row.bot_profile_fingerprint != profile_fingerprint(user_data):
+            return False
+
+        return all(
+            metric_drift(getattr(row, field), user_data.get(field)) <= self.drift_threshold
+            for field in METRIC_FIELDS
+        )
+
@@ -1,9 +1,145 @@
-import requests
+import asyncio
+import re
+import threading
+import time
+import unicodedata
+import weakref
+import httpx
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
 from app.config import config
+from app.executors import run_io
+from app.services.cache_service import PersistentCache
+from app.services.credibility_index import CredibilityIndex, DEFAULT_CREDIBILITY
+from app.services.rate_limiter import TokenBucket
+from app.services.resilience import ResiliencePolicy, CircuitOpenError
 import random
 
+# HTTP/2 butuh paket h2 (httpx[http2]); tanpa itu klien memakai HTTP/1.1 keep-alive
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Kata umum (Indonesia/Inggris) yang tidak mengubah hasil pencarian, dibuang dari kunci cache
+STOPWORDS = {
+    'yang', 'dan', 'di', 'ke', 'dari', 'ini', 'itu', 'untuk', 'dengan', 'pada', 'adalah', 'akan',
+    'juga', 'atau', 'karena', 'sudah', 'telah', 'bisa', 'ada', 'tidak', 'tak', 'saja', 'lagi',
+    'kita', 'kami', 'kamu', 'anda', 'mereka', 'dia', 'ia', 'nya', 'pun', 'lah', 'kah', 'dong',
+    'sih', 'nih', 'ya', 'yg', 'dgn', 'utk', 'gak', 'ga', 'aja', 'jadi', 'oleh', 'para', 'se', 'rt',
+    'the', 'a', 'an', 'and', 'or', 'of', 'to', 'in', 'on', 'for', 'is', 'are', 'was', 'be', 'this', 'that', 'it'
+}
+
+def normalize_query(query: str) -> str:
+    """Normalisasi query untuk kunci cache: huruf kecil, tanpa URL/mention/hashtag/emoji/tanda baca/stopword"""
+    text = unicodedata.normalize('NFKC', query or '').casefold()
+    text = re.sub(r'https?://\S+|[@#]\w+', ' ', text)
+    text = re.sub(r'[^\w\s]|_', ' ', text)
+    return ' '.join(word for word in text.split() if word not in STOPWORDS)
+
+# Kata pembuka tweet yang bukan bagian dari klaim
+ALERT_WORDS = {'breaking', 'urgent', 'viral', 'info', 'penting', 'waspada', 'darurat', 'rt', 'hoax', 'hoaks', 'cek', 'fakta'}
+
+# Prefix huruf kapital di awal tweet, mis. "BREAKING:", "HOAX ALERT:"
+ALERT_PREFIX = re.compile(r'^\s*[A-Z][A-Z ]{2,}:\s*')
+
+# Konstanta reciprocal rank fusion untuk menggabungkan peringkat beberapa query
+RRF_K = 60
+
+def extract_claim(tweet_text: str, max_words: int = 12) -> str:
+    """Klaim utama tweet: kalimat pertama yang cukup panjang tanpa URL, mention, hashtag, dan kata pembuka"""
+    text = unicodedata.normalize('NFKC', tweet_text or '')
+    text = ALERT_PREFIX.sub('', re.sub(r'^RT @\w+:\s*', '', text))
+    text = re.sub(r'https?://\S+|[@#]\w+', ' ', text)
+    
+    sentences = [sentence for sentence in re.split(r'[.!?\n]+', text) if sentence.strip()]
+    for sentence in sentences:
+        words = re.findall(r'[^\W_]+(?:-[^\W_]+)*', sentence.casefold())
+        while words and words[0] in ALERT_WORDS:
+            words.pop(0)
+        if len(words) >= 4:
+            return ' '.join(words[:max_words])
+    
+    words = [word for word in re.findall(r'[^\W_]+(?:-[^\W_]+)*', text.casefold()) if word not in ALERT_WORDS]
+    return ' '.join(words[:max_words])
+
+def extract_entities(tweet_text: str, max_entities: int = 3) -> List[str]:
+    """Nama (frasa berhuruf kapital) dan hashtag yang disebut tweet"""
+    text = ALERT_PREFIX.sub('', re.sub(r'^RT @\w+:\s*', '', tweet_text or ''))
+    text = re.sub(r'https?://\S+|@\w+', ' ', text)
+    
+    candidates = []
+    for match in re.finditer(r'\b[A-Z][\w-]*(?:\s+[A-Z][\w-]*){0,3}', text):
+        # Satu kata kapital di awal kalimat biasanya bukan nama
+        at_sentence_start = not text[:match.start()].strip() or text[:match.start()].rstrip()[-1] in '.!?:'
+        if at_sentence_start and ' ' not in match.group(0):
+            continue
+        candidates.append(match.group(0))
+    candidates += re.findall(r'#(\w+)', text)
+    
+    entities = []
+    seen = set()
+    for candidate in candidates:
+        words = [word for word in candidate.split() if word.casefold() not in ALERT_WORDS and word.casefold() not in STOPWORDS]
+        entity = ' '.join(words)
+        if len(entity) < 3 or entity.casefold() in seen:
+            continue
+        seen.add(entity.casefold())
+        entities.append(entity)
+        if len(entities) >= max_entities:
+            break
+    return entities
+
+def build_fact_check_queries(tweet_text: str, max_queries: int = 3) -> List[str]:
+    """Beberapa query terarah untuk satu tweet: klaim utama, nama yang disebut, dan varian hoaks/hoax"""
+    claim = extract_claim(tweet_text)
+    entities = extract_entities(tweet_text)
+    keywords = [word for word in claim.split() if len(word) > 3 and word not in STOPWORDS][:6]
+    
+    candidates = []
+    if claim:
+        candidates.append(f"cek fakta {claim}")
+    if entities:
+        candidates.append(f"{' '.join(entities)} hoaks")
+    if keywords:
+        candidates.append(f"{' '.join(keywords)} hoax")
+    
+    queries = []
+    seen = set()
+    for query in candidates:
+        key = normalize_query(query)
+        if key and key not in seen:
+            seen.add(key)
+            queries.append(query)
+    return queries[:max(1, max_queries)]
+
+def canonical_url(url: str) -> str:
+    """URL tanpa skema, www, query, fragment, dan garis miring akhir untuk dedup"""
+    parts = urlsplit(url or '')
+    host = parts.netloc.casefold()
+    if host.startswith('www.'):
+        host = host[4:]
+    return f"{host}{parts.path.rstrip('/')}"
+
+# Limiter request per API key, dipakai bersama oleh semua instance service di proses ini
+_key_limiters: Dict[str, TokenBucket] = {}
+_key_limiters_lock = threading.Lock()
+
+def get_key_limiter(api_key: str) -> TokenBucket:
+    """Token bucket BRAVE_REQUESTS_PER_SECOND untuk satu API key"""
+    with _key_limiters_lock:
+        limiter = _key_limiters.get(api_key)
+        if limiter is None:
+            requests_per_second = max(config.BRAVE_REQUESTS_PER_SECOND, 0.01)
+            limiter = TokenBucket(requests_per_second * 60, burst=max(1.0, requests_per_second))
+            _key_limiters[api_key] = limiter
+        return limiter
+
+class BraveServerError(Exception):
+    """Respons 5xx/429 dari Brave Search (boleh dicoba ulang)"""
+
 class BraveSearchService:
     """Service untuk pencarian web dan fact-checking menggunakan Brave Search"""
     
@@ -13,8 +149,25 @@ class BraveSearchService:
         self.headers = {
             "Accept": "application/json",
             "Accept-Encoding": "gzip",
-            "X-Subscription-Token": config.BRAVE_SEARCH_API_KEY
+            "X-Subscription-Token": config.BRAVE_SEARCH_API_KEY or ""
         }
+        self.resilience = ResiliencePolicy(
+            'brave_search',
+            timeout=config.BRAVE_TIMEOUT,
+            retries=config.BRAVE_RETRIES,
+            backoff_base=config.RETRY_BACKOFF_BASE,
+            backoff_max=config.RETRY_BACKOFF_MAX,
+            failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=config.CIRCUIT_RESET_TIMEOUT,
+            hedge_delay=config.BRAVE_HEDGE_DELAY,
+            retry_on=(httpx.TransportError, BraveServerError)
+        )
+        self.rate_limiter = get_key_limiter(self.headers["X-Subscription-Token"])
+        self.search_cache = PersistentCache("search", config.SEARCH_CACHE_TTL, config.SEARCH_CACHE_MAX_ENTRIES)
+        self.credibility_index = CredibilityIndex(config.CREDIBILITY_DATA_PATH, config.CREDIBILITY_RELOAD_INTERVAL)
+        self._client = None
+        # Pool koneksi httpx.AsyncClient terikat ke event loop, jadi satu klien per loop
+        self._async_clients = weakref.WeakKeyDictionary()
     
     def search_for_fact_check(self, query: str, tweet_text: str) -> Dict[str, Any]:
         """Cari informasi untuk fact-checking"""
@@ -24,47 +177,232 @@ class BraveSearchService:
         else:
             return self._dummy_search(query, tweet_text)
     
+    async def search_for_fact_check_async(self, query: str, tweet_text: str) -> Dict[str, Any]:
+        """Versi async dari search_for_fact_check; memakai pool koneksi bersama"""
+        
+        if self.use_real_api:
+            return await self._real_search_async(query)
+        else:
+            return self._dummy_search(query, tweet_text)
+    
+    async def fact_check_tweet_async(self, tweet_text: str) -> Dict[str, Any]:
+        """Fact-check tweet dengan beberapa query paralel yang hasilnya digabung dan diurutkan ulang"""
+        
+        if not self.use_real_api:
+            return self._dummy_search(f"fact check {tweet_text[:100]}", tweet_text)
+        
+        queries = build_fact_check_queries(tweet_text, config.FACT_CHECK_MAX_QUERIES)
+        if not queries:
+            return await self._real_search_async(f"fact check {tweet_text[:100]}")
+        
+        search_results = await asyncio.gather(*(self._search_api_async(query) for query in queries))
+        successful = [(query, result) for query, result in zip(queries, search_results) if result is not None]
+        if not successful:
+            return self._dummy_search(queries[0], "")
+        
+        return self._merge_search_results(queries, successful)
+    
     def _real_search(self, query: str) -> Dict[str, Any]:
         """Pencarian menggunakan Brave Search API asli"""
+        cache_key = self._search_cache_key(query)
+        cached_result = self._cached_search(query, cache_key)
+        if cached_result is not None:
+            return cached_result
+        
         try:
-            params = {
-                "q": query,
-                "count": 10,
-                "offset": 0,
-                "mkt": "id-ID",  # Market Indonesia
-                "safesearch": "moderate"
-            }
-            
-            response = requests.get(self.base_url, headers=self.headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            results = data.get("web", {}).get("results", [])
-            
-            # Process results
-            processed_results = []
-            for result in results:
-                processed_results.append({
-                    "title": result.get("title", ""),
-                    "url": result.get("url", ""),
-                    "description": result.get("description", ""),
-                    "source": self._extract_domain(result.get("url", "")),
-                    "relevance_score": self._calculate_relevance(result, query)
-                })
-            
-            return {
-                "query": query,
-                "total_results": len(processed_results),
-                "results": processed_results,
-                "supporting_sources": self._categorize_sources(processed_results, "supporting"),
-                "contradicting_sources": self._categorize_sources(processed_results, "contradicting"),
-                "neutral_sources": self._categorize_sources(processed_results, "neutral")
-            }
+            params = self._search_params(query)
+            data = self.resilience.call(lambda: self._fetch(params))
+            raw_results = self._raw_results(data)
+            self.search_cache.set(cache_key, raw_results)
+            return self._process_search_results(query, raw_results)
             
+        except CircuitOpenError as e:
+            # Brave sedang tidak sehat; langsung fallback tanpa menunggu timeout
+            print(f"Brave Search dilewati: {e}")
+            return self._dummy_search(query, "")
         except Exception as e:
             print(f"Error in Brave Search: {e}")
             return self._dummy_search(query, "")
     
+    async def _real_search_async(self, query: str) -> Dict[str, Any]:
+        """Versi async dari _real_search"""
+        search_result = await self._search_api_async(query)
+        if search_result is None:
+            return self._dummy_search(query, "")
+        return search_result
+    
+    async def _search_api_async(self, query: str) -> Optional[Dict[str, Any]]:
+        """Hasil Brave Search untuk satu query (dari cache jika ada), None jika gagal"""
+        cache_key = self._search_cache_key(query)
+        cached_result = await run_io(self._cached_search, query, cache_key)
+        if cached_result is not None:
+            return cached_result
+        
+        try:
+            params = self._search_params(query)
+            data = await self.resilience.call_async(lambda: self._fetch_async(params))
+            raw_results = self._raw_results(data)
+            await run_io(self.search_cache.set, cache_key, raw_results)
+            return self._process_search_results(query, raw_results)
+            
+        except CircuitOpenError as e:
+            # Brave sedang tidak sehat; langsung fallback tanpa menunggu timeout
+            print(f"Brave Search dilewati: {e}")
+            return None
+        except Exception as e:
+            print(f"Error in Brave Search: {e}")
+            return None
+    
+    def _merge_search_results(self, queries: List[str], search_results: List[Any]) -> Dict[str, Any]:
+        """Gabungkan hasil beberapa query: dedup per URL lalu urutkan dengan reciprocal rank fusion"""
+        merged = {}
+        for _, search_result in search_results:
+            for rank, result in enumerate(search_result.get("results", [])):
+                key = canonical_url(result.get("url", ""))
+                entry = merged.get(key)
+                if entry is None:
+                    entry = merged[key] = dict(result, matched_queries=0, fused_score=0.0)
+                
+                # URL yang muncul tinggi di banyak query naik ke atas
+                entry["matched_queries"] += 1
+                entry["fused_score"] += 1.0 / (RRF_K + rank + 1)
+                entry["relevance_score"] = max(entry.get("relevance_score", 0.0), result.get("relevance_score", 0.0))
+        
+        ranked = sorted(merged.values(), key=lambda entry: (entry["fused_score"], entry["relevance_score"]), reverse=True)
+        ranked = ranked[:config.FACT_CHECK_MAX_RESULTS]
+        for entry in ranked:
+            entry["fused_score"] = round(entry["fused_score"], 4)
+        
+        return {
+            "query": queries[0],
+            "queries": queries,
+            "total_results": len(ranked),
+            "results": ranked,
+            "supporting_sources": self._categorize_sources(ranked, "supporting"),
+            "contradicting_sources": self._categorize_sources(ranked, "contradicting"),
+            "neutral_sources": self._categorize_sources(ranked, "neutral"),
+            "cached": all(search_result.get("cached") for _, search_result in search_results)
+        }
+    
+    def _search_cache_key(self, query: str) -> str:
+        """Kunci cache dari query yang dinormalisasi dan parameter pencarian"""
+        params = self._search_params(normalize_query(query))
+        return self.search_cache.make_key("raw", params)
+    
+    def _cached_search(self, query: str, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Hasil pencarian dari cache (tanpa request ke Brave), None jika belum ada.
+        
+        Cache hanya menyimpan hasil mentah Brave; kredibilitas dan relevansi
+        dihitung ulang setiap kali agar indeks kredibilitas yang dimuat ulang
+        langsung berlaku.
+        """
+        raw_results = self.search_cache.get(cache_key)
+        if raw_results is None:
+            return None
+        return dict(self._process_search_results(query, raw_results), cached=True)
+    
+    def _search_params(self, query: str) -> Dict[str, Any]:
+        """Parameter query Brave Search"""
+        return {
+            "q": query,
+            "count": 10,
+            "offset": 0,
+            "mkt": "id-ID",  # Market Indonesia
+            "safesearch": "moderate"
+        }
+    
+    def _raw_results(self, data: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Field hasil web Brave Search yang dibutuhkan untuk fact-check (yang disimpan di cache)"""
+        return [
+            {
+                "title": result.get("title", ""),
+                "url": result.get("url", ""),
+                "description": result.get("description", "")
+            }
+            for result in data.get("web", {}).get("results", [])
+        ]
+    
+    def _process_search_results(self, query: str, results: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Ubah hasil mentah Brave Search menjadi hasil fact-check"""
+        
+        # Process results
+        processed_results = []
+        for result in results:
+            processed_results.append({
+                "title": result.get("title", ""),
+                "url": result.get("url", ""),
+                "description": result.get("description", ""),
+                "source": self._extract_domain(result.get("url", "")),
+                "credibility": self.get_source_credibility(result.get("url", "")),
+                "relevance_score": self._calculate_relevance(result, query)
+            })
+        
+        return {
+            "query": query,
+            "total_results": len(processed_results),
+            "results": processed_results,
+            "supporting_sources": self._categorize_sources(processed_results, "supporting"),
+            "contradicting_sources": self._categorize_sources(processed_results, "contradicting"),
+            "neutral_sources": self._categorize_sources(processed_results, "neutral")
+        }
+    
+    def _client_options(self) -> Dict[str, Any]:
+        """Opsi klien httpx: keep-alive pool, HTTP/2 jika tersedia, timeout per request"""
+        return {
+            "headers": self.headers,
+            "timeout": httpx.Timeout(self.resilience.timeout),
+            "limits": httpx.Limits(
+                max_connections=config.BRAVE_MAX_CONNECTIONS,
+                max_keepalive_connections=config.BRAVE_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=config.BRAVE_KEEPALIVE_EXPIRY
+            ),
+            "http2": config.BRAVE_HTTP2 and HTTP2_AVAILABLE
+        }
+    
+    def _get_client(self) -> httpx.Client:
+        """Klien httpx sync (dibuat sekali, koneksi dipakai ulang)"""
+        if self._client is None:
+            self._client = httpx.Client(**self._client_options())
+        return self._client
+    
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Klien httpx async untuk event loop yang sedang berjalan"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(**self._client_options())
+            self._async_clients[loop] = client
+        return client
+    
+    async def aclose(self):
+        """Tutup pool koneksi milik event loop yang sedang berjalan"""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+    
+    def _fetch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Satu percobaan request ke Brave Search API"""
+        wait = self.rate_limiter.reserve(1)
+        if wait > 0:
+            time.sleep(wait)
+        response = self._get_client().get(self.base_url, params=params)
+        return self._read_response(response)
+    
+    async def _fetch_async(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Versi async dari _fetch"""
+        wait = self.rate_limiter.reserve(1)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        response = await self._get_async_client().get(self.base_url, params=params)
+        return self._read_response(response)
+    
+    def _read_response(self, response: httpx.Response) -> Dict[str, Any]:
+        """Validasi status dan decode JSON (gzip didekode otomatis oleh httpx)"""
+        if response.status_code == 429 or response.status_code >= 500:
+            raise BraveServerError(f"Brave Search HTTP {response.status_code}")
+        response.raise_for_status()
+        return response.json()
+    
     def _dummy_search(self, query: str, tweet_text: str) -> Dict[str, Any]:
         """Generate dummy search results untuk testing"""
         
@@ -87,14 +425,13 @@ class BraveSearchService:
         category = self._determine_category(tweet_text)
         
         if category == "hoax_health":
-            return [
+            results = [
                 {
                     "title": "Fakta atau Hoax: Klaim Vaksin Mengandung Chip 5G",
                     "url": "https://www.kompas.com/tren/read/2023/10/15/fakta-vaksin-chip-5g",
                     "description": "Klaim bahwa vaksin COVID-19 mengandung chip 5G telah dibantah oleh berbagai ahli kesehatan dan organisasi kesehatan dunia...",
                     "source": "kompas.com",
                     "relevance_score": 0.9,
-                    "credibility": "tinggi",
                     "stance": "contradicting"
                 },
                 {
@@ -103,7 +440,6 @@ class BraveSearchService:
                     "description": "World Health Organization (WHO) memberikan klarifikasi mengenai keamanan vaksin COVID-19...",
                     "source": "who.int",
                     "relevance_score": 0.85,
-                    "credibility": "tinggi",
                     "stance": "contradicting"
                 },
                 {
@@ -112,20 +448,18 @@ class BraveSearchService:
                     "description": "Kementerian Kesehatan RI menjelaskan manfaat dan efek samping vaksin COVID-19...",
                     "source": "kemkes.go.id",
                     "relevance_score": 0.8,
-                    "credibility": "tinggi",
                     "stance": "neutral"
                 }
             ]
         
         elif category == "hoax_politics":
-            return [
+            results = [
                 {
                     "title": "Kenaikan Harga BBM: Fakta dan Rumor",
                     "url": "https://www.liputan6.com/bisnis/read/4567890/kenaikan-bbm-fakta-rumor",
                     "description": "Pemerintah belum mengumumkan kenaikan harga BBM. Informasi yang beredar di media sosial belum dikonfirmasi...",
                     "source": "liputan6.com",
                     "relevance_score": 0.9,
-                    "credibility": "tinggi",
                     "stance": "contradicting"
                 },
                 {
@@ -134,20 +468,18 @@ class BraveSearchService:
                     "description": "Kementerian ESDM memberikan klarifikasi resmi mengenai rumor kenaikan harga BBM...",
                     "source": "esdm.go.id",
                     "relevance_score": 0.85,
-                    "credibility": "tinggi",
                     "stance": "contradicting"
                 }
             ]
         
         elif category == "hoax_disaster":
-            return [
+            results = [
                 {
                     "title": "BMKG Bantah Prediksi Gempa Bumi Berdasarkan Paranormal",
                     "url": "https://www.bmkg.go.id/press-release/prediksi-gempa-paranormal",
                     "description": "BMKG menegaskan bahwa prediksi gempa bumi tidak dapat dilakukan berdasarkan paranormal atau hal-hal yang tidak ilmiah...",
                     "source": "bmkg.go.id",
                     "relevance_score": 0.95,
-                    "credibility": "tinggi",
                     "stance": "contradicting"
                 },
                 {
@@ -156,20 +488,18 @@ class BraveSearchService:
                     "description": "BMKG menjelaskan bagaimana sistem peringatan dini gempa bumi bekerja dan mengapa prediksi akurat sangat sulit...",
                     "source": "bmkg.go.id",
                     "relevance_score": 0.8,
-                    "credibility": "tinggi",
                     "stance": "neutral"
                 }
             ]
         
         else:  # normal content
-            return [
+            results = [
                 {
                     "title": "Manfaat Kopi untuk Kesehatan Jantung",
                     "url": "https://www.halodoc.com/artikel/manfaat-kopi-untuk-jantung",
                     "description": "Penelitian menunjukkan bahwa konsumsi kopi dalam jumlah sedang dapat memberikan manfaat untuk kesehatan jantung...",
                     "source": "halodoc.com",
                     "relevance_score": 0.7,
-                    "credibility": "sedang",
                     "stance": "supporting"
                 },
                 {
@@ -178,10 +508,14 @@ class BraveSearchService:
                     "description": "Studi terbaru dari European Society of Cardiology menunjukkan hubungan positif antara konsumsi kopi dan kesehatan jantung...",
                     "source": "cnnindonesia.com",
                     "relevance_score": 0.8,
-                    "credibility": "tinggi",
                     "stance": "supporting"
                 }
             ]
+        
+        # Kredibilitas dari indeks yang sama dengan hasil API asli
+        for result in results:
+            result["credibility"] = self.get_source_credibility(result["url"])
+        return results
     
     def _determine_category(self, text: str) -> str:
         """Tentukan kategori berdasarkan konten tweet"""
@@ -232,42 +566,8 @@ class BraveSearchService:
     
     def get_source_credibility(self, domain: str) -> Dict[str, Any]:
         """Evaluasi kredibilitas sumber"""
-        
-        # Daftar sumber terpercaya
-        trusted_sources = {
-            "kemkes.go.id": {"credibility": "tinggi", "type": "pemerintah"},
-            "bmkg.go.id": {"credibility": "tinggi", "type": "pemerintah"},
-            "who.int": {"credibility": "tinggi", "type": "internasional"},
-            "kompas.com": {"credibility": "tinggi", "type": "media"},
-            "detik.com": {"credibility": "tinggi", "type": "media"},
-            "cnn.com": {"credibility": "tinggi", "type": "media"},
-            "bbc.com": {"credibility": "tinggi", "type": "media"},
-            "reuters.com": {"credibility": "tinggi", "type": "media"},
-            "liputan6.com": {"credibility": "sedang", "type": "media"},
-            "okezone.com": {"credibility": "sedang", "type": "media"},
-            "tribunnews.com": {"credibility": "sedang", "type": "media"}
-        }
-        
-        # Sumber yang kurang kredibel
-        suspicious_sources = {
-            "blog.com": {"credibility": "rendah", "type": "blog"},
-            "wordpress.com": {"credibility": "rendah", "type": "blog"},
-            "blogspot.com": {"credibility": "rendah", "type": "blog"}
-        }
-        
-        # Cek domain
-        if domain in trusted_sources:
-            return trusted_sources[domain]
-        elif domain in suspicious_sources:
-            return suspicious_sources[domain]
-        elif domain.endswith(".go.id"):
-            return {"credibility": "tinggi", "type": "pemerintah"}
-        elif domain.endswith(".edu"):
-            return {"credibility": "tinggi", "type": "akademik"}
-        elif domain.endswith(".org"):
-            return {"credibility": "sedang", "type": "organisasi"}
-        else:
-            return {"credibility": "sedang", "type": "umum"}
+        entry = self.credibility_index.lookup(domain)
+        return dict(entry or DEFAULT_CREDIBILITY)
     
     def generate_fact_check_summary(self, search_results: Dict[str, Any]) -> Dict[str, Any]:
         """Generate ringkasan fact-checking"""
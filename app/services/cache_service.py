@@ -0,0 +1,111 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from sqlalchemy.exc import IntegrityError
+
+from app.database import SessionLocal
+from app.models import CacheEntry
+
+# Hit hanya memperbarui last_accessed_at jika lebih lama dari ini (detik),
+# agar cache yang sering dibaca tidak menulis ke database di setiap hit
+TOUCH_INTERVAL = 60
+
+
+class PersistentCache:
+    """Cache key-value di database (tabel cache_entries) dengan TTL dan eviction LRU.
+
+    Setiap namespace punya batas entri sendiri. Aman dipakai dari thread
+    atau proses worker mana pun karena setiap operasi membuka session
+    database sendiri.
+    """
+
+    def __init__(self, namespace: str, ttl: int, max_entries: int):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def make_key(self, *parts: Any) -> str:
+        """Hash stabil dari namespace dan bagian-bagian kunci"""
+        payload = json.dumps([self.namespace, *parts], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Ambil nilai dari cache, None jika tidak ada atau sudah kedaluwarsa"""
+        if not self.enabled:
+            return None
+
+        db = SessionLocal()
+        try:
+            entry = db.query(CacheEntry).filter(CacheEntry.cache_key == key).first()
+            if not entry:
+                return None
+
+            now = datetime.utcnow()
+            if entry.expires_at and entry.expires_at <= now:
+                db.delete(entry)
+                db.commit()
+                return None
+
+            if not entry.last_accessed_at or (now - entry.last_accessed_at).total_seconds() >= TOUCH_INTERVAL:
+                entry.last_accessed_at = now
+                entry.hit_count = (entry.hit_count or 0) + 1
+                db.commit()
+
+            return entry.value
+        except Exception as e:
+            print(f"Error reading cache {self.namespace}: {e}")
+            db.rollback()
+            return None
+        finally:
+            db.close()
+
+    def set(self, key: str, value: Any):
+        """Simpan nilai ke cache lalu buang entri kedaluwarsa dan entri LRU di atas batas"""
+        if not self.enabled:
+            return
+
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            entry = db.query(CacheEntry).filter(CacheEntry.cache_key == key).first()
+            if not entry:
+                entry = CacheEntry(namespace=self.namespace, cache_key=key, hit_count=0)
+                db.add(entry)
+
+            entry.value = value
+            entry.last_accessed_at = now
+            entry.expires_at = now + timedelta(seconds=self.ttl)
+            db.flush()
+
+            self._evict(db, now)
+            db.commit()
+        except IntegrityError:
+            # Worker lain menyimpan kunci yang sama lebih dulu
+            db.rollback()
+        except Exception as e:
+            print(f"Error writing cache {self.namespace}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def _evict(self, db, now: datetime):
+        """Hapus entri kedaluwarsa dan entri yang paling lama tidak dipakai"""
+        db.query(CacheEntry).filter(
+            CacheEntry.namespace == self.namespace,
+            CacheEntry.expires_at <= now
+        ).delete(synchronize_session=False)
+
+        overflow = db.query(CacheEntry.id).filter(CacheEntry.namespace == self.namespace).count() - self.max_entries
+        if overflow <= 0:
+            return
+
+        stale_ids = [row.id for row in db.query(CacheEntry.id).filter(
+            CacheEntry.namespace == self.namespace
+        ).order_by(CacheEntry.last_accessed_at).limit(overflow)]
+
+        db.query(CacheEntry).filter(CacheEntry.id.in_(stale_ids)).delete(synchronize_session=False)
@@ -0,0 +1,118 @@
+import csv
+import os
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_CREDIBILITY = {"credibility": "sedang", "type": "umum"}
+
+
+def normalize_domain(value: str) -> str:
+    """Host dari URL atau domain: huruf kecil, tanpa skema, port, dan titik di akhir"""
+    value = (value or '').strip()
+    if '//' not in value:
+        value = f"//{value}"
+    try:
+        host = urlsplit(value).hostname or ''
+    except ValueError:
+        return ''
+    return host.rstrip('.')
+
+
+class _Node:
+    __slots__ = ('children', 'entry')
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.entry: Optional[Dict[str, str]] = None
+
+
+class CredibilityIndex:
+    """Indeks kredibilitas domain berupa trie label terbalik (com -> kompas -> www).
+
+    Lookup berjalan dari TLD ke kiri dan memakai entri terdalam yang cocok,
+    sehingga subdomain (www.kompas.com, news.detik.com) ikut domain
+    terdaftarnya dan aturan akhiran (go.id, ac.id, edu) berlaku untuk semua
+    domain di bawahnya. Biayanya sebanding jumlah label, bukan jumlah domain.
+    File data dimuat ulang otomatis jika berubah.
+    """
+
+    def __init__(self, path: str, reload_interval: float = 60):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.root = _Node()
+        self.size = 0
+        self._loaded_mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def lookup(self, domain: str) -> Optional[Dict[str, str]]:
+        """Entri kredibilitas untuk domain/URL, None jika tidak ada aturan yang cocok"""
+        self._maybe_reload()
+
+        host = normalize_domain(domain)
+        if not host:
+            return None
+
+        node = self.root
+        match = None
+        for label in reversed(host.split('.')):
+            node = node.children.get(label)
+            if node is None:
+                break
+            if node.entry is not None:
+                match = node.entry
+        return match
+
+    def reload(self):
+        """Bangun ulang trie dari file data lalu tukar sekaligus"""
+        with self._lock:
+            self._load()
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if self._loaded_mtime is not None and now - self._checked_at < self.reload_interval:
+            return
+
+        with self._lock:
+            if self._loaded_mtime is not None and now - self._checked_at < self.reload_interval:
+                return
+            self._checked_at = now
+
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                mtime = None
+
+            if mtime != self._loaded_mtime or self.size == 0:
+                self._load()
+
+    def _load(self):
+        root = _Node()
+        size = 0
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, newline='', encoding='utf-8') as f:
+                for row in csv.reader(f):
+                    if not row or row[0].lstrip().startswith('#'):
+                        continue
+                    if len(row) < 3:
+                        print(f"Baris data kredibilitas tidak valid: {row}")
+                        continue
+
+                    domain, credibility, source_type = (value.strip() for value in row[:3])
+                    labels = domain.casefold().strip('.').split('.')
+                    node = root
+                    for label in reversed(labels):
+                        node = node.children.setdefault(label, _Node())
+                    node.entry = {"credibility": credibility, "type": source_type}
+                    size += 1
+        except OSError as e:
+            print(f"Error loading credibility index: {e}")
+            mtime = 0.0
+
+        # Pembaca lain tetap memakai trie lama sampai trie baru selesai dibangun
+        self.root = root
+        self.size = size
+        self._loaded_mtime = mtime
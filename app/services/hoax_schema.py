@@ -0,0 +1,185 @@
+import json
+import re
+from typing import Any, List, Optional
+
+from pydantic import BaseModel, ValidationError, field_validator
+
+CATEGORIES = ('political', 'health', 'disaster', 'celebrity', 'financial', 'conspiracy', 'normal')
+CONFIDENCE_LEVELS = ('rendah', 'sedang', 'tinggi')
+
+_decoder = json.JSONDecoder()
+
+
+def to_probability(value: Any) -> float:
+    """Ubah nilai probabilitas dari model ([0.8], "0.8", atau persen 80) ke rentang 0-1"""
+    if isinstance(value, list) and len(value) == 1:
+        value = value[0]
+    if isinstance(value, str):
+        value = value.strip().rstrip('%')
+    value = float(value)
+    if 1 < value <= 100:
+        value /= 100
+    return min(max(value, 0.0), 1.0)
+
+
+class HoaxVerdict(BaseModel):
+    """Skema jawaban JSON analisis hoax dari OpenAI"""
+
+    hoax_probability: float
+    is_hoax: bool = False
+    confidence_level: str = 'sedang'
+    analysis_summary: str = ''
+    red_flags: List[str] = []
+    reasons: List[str] = []
+    category: str = 'normal'
+    recommendations: List[str] = []
+
+    @field_validator('hoax_probability', mode='before')
+    @classmethod
+    def _parse_probability(cls, value: Any) -> float:
+        return to_probability(value)
+
+    @field_validator('is_hoax', mode='before')
+    @classmethod
+    def _parse_bool(cls, value: Any) -> Any:
+        if isinstance(value, list) and len(value) == 1:
+            value = value[0]
+        if isinstance(value, str) and value.strip().lower() in ('ya', 'yes', 'true'):
+            return True
+        if isinstance(value, str) and value.strip().lower() in ('tidak', 'no', 'false'):
+            return False
+        return value
+
+    @field_validator('confidence_level', mode='before')
+    @classmethod
+    def _parse_confidence(cls, value: Any) -> str:
+        if isinstance(value, list) and len(value) == 1:
+            value = value[0]
+        value = str(value or '').strip().lower()
+        return value if value in CONFIDENCE_LEVELS else 'sedang'
+
+    @field_validator('category', mode='before')
+    @classmethod
+    def _parse_category(cls, value: Any) -> str:
+        value = str(value or '').strip().lower()
+        return value if value in CATEGORIES else 'normal'
+
+    @field_validator('red_flags', 'reasons', 'recommendations', mode='before')
+    @classmethod
+    def _parse_list(cls, value: Any) -> List[str]:
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [value] if value.strip() else []
+        return [str(item) for item in value if item is not None]
+
+    @field_validator('analysis_summary', mode='before')
+    @classmethod
+    def _parse_summary(cls, value: Any) -> str:
+        return '' if value is None else str(value)
+
+
+class HoaxBatchItem(HoaxVerdict):
+    """Satu verdict di dalam jawaban batch, dipetakan lewat id"""
+
+    id: str
+
+    @field_validator('id', mode='before')
+    @classmethod
+    def _parse_id(cls, value: Any) -> str:
+        return str(value)
+
+
+def load_json_object(text: str) -> dict:
+    """Ambil objek JSON dari jawaban model.
+
+    JSON mode mengembalikan objek murni; jika model tetap menambahkan teks
+    atau code fence, objek JSON pertama yang valid diambil tanpa regex greedy.
+    """
+    text = (text or '').strip()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+        for match in re.finditer(r'\{', text):
+            try:
+                data, _ = _decoder.raw_decode(text, match.start())
+                break
+            except ValueError:
+                continue
+
+    if not isinstance(data, dict):
+        raise ValueError("Respons tidak berisi objek JSON")
+    return data
+
+
+def parse_verdict(text: str) -> HoaxVerdict:
+    """Parse dan validasi jawaban analisis satu tweet (ValueError jika tidak valid)"""
+    try:
+        return HoaxVerdict.model_validate(load_json_object(text))
+    except ValidationError as e:
+        raise ValueError(str(e)) from e
+
+
+def parse_batch_verdicts(text: str) -> List[HoaxBatchItem]:
+    """Parse jawaban batch; item yang tidak valid dilewati"""
+    entries = load_json_object(text).get('results', [])
+    items = []
+    for entry in entries if isinstance(entries, list) else []:
+        try:
+            items.append(HoaxBatchItem.model_validate(entry))
+        except ValidationError:
+            continue
+    return items
+
+
+class IncrementalVerdictParser:
+    """Parser streaming untuk jawaban analisis.
+
+    Potongan teks dari stream ditambahkan dengan feed(); hoax_probability
+    dan is_hoax tersedia segera setelah nilainya selesai ditulis model,
+    sebelum ringkasan dan alasan yang panjang selesai.
+    """
+
+    _PROBABILITY = re.compile(r'"hoax_probability"\s*:\s*\[?\s*"?(-?\d+(?:\.\d+)?)\s*%?"?\s*\]?\s*[,}\n]')
+    _IS_HOAX = re.compile(r'"is_hoax"\s*:\s*\[?\s*"?(true|false)\b', re.IGNORECASE)
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.hoax_probability: Optional[float] = None
+        self.is_hoax: Optional[bool] = None
+        self._scan_from = 0
+
+    @property
+    def text(self) -> str:
+        return ''.join(self.chunks)
+
+    def feed(self, chunk: str) -> bool:
+        """Tambahkan potongan teks; True jika ada field baru yang terbaca"""
+        if not chunk:
+            return False
+        self.chunks.append(chunk)
+        if self.hoax_probability is not None and self.is_hoax is not None:
+            return False
+
+        text = self.text
+        # Mulai sedikit sebelum potongan terakhir agar nama field yang terbelah tetap cocok
+        window = text[max(0, self._scan_from - 64):]
+        self._scan_from = len(text)
+
+        found = False
+        if self.hoax_probability is None:
+            match = self._PROBABILITY.search(window)
+            if match:
+                self.hoax_probability = to_probability(match.group(1))
+                found = True
+        if self.is_hoax is None:
+            match = self._IS_HOAX.search(window)
+            if match:
+                self.is_hoax = match.group(1).lower() == 'true'
+                found = True
+        return found
+
+    def partial(self) -> dict:
+        """Field yang sudah terbaca sejauh ini"""
+        return {'hoax_probability': self.hoax_probability, 'is_hoax': self.is_hoax}
@@ -0,0 +1,204 @@
+import re
+import threading
+import unicodedata
+import zlib
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Set, Tuple, Iterable
+
+from sqlalchemy import and_, or_
+
+from app.database import SessionLocal
+from app.models import Tweet, HoaxAnalysis
+
+# Panjang shingle karakter dan ukuran signature MinHash (BANDS x ROWS)
+SHINGLE_SIZE = 5
+BANDS = 16
+ROWS = 4
+NUM_PERM = BANDS * ROWS
+
+# Teks yang terlalu pendek mudah dianggap mirip, jadi tidak diindeks
+MIN_TEXT_LENGTH = 30
+
+# Bilangan prima Mersenne 2^31 - 1; a * x tetap muat di uint64
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.RandomState(42)
+_PERM_A = _rng.randint(1, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+
+
+def normalize_for_similarity(text: str) -> str:
+    """Buang URL, mention, hashtag, emoji, tanda baca, dan huruf besar"""
+    text = unicodedata.normalize('NFKC', text or '')
+    text = re.sub(r'^RT @\w+:\s*', '', text)
+    text = re.sub(r'https?://\S+|[@#]\w+', ' ', text)
+    text = re.sub(r'[^\w\s]|_', ' ', text.casefold())
+    return ' '.join(text.split())
+
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """Signature MinHash dari shingle karakter, None jika teks terlalu pendek"""
+    normalized = normalize_for_similarity(text)
+    if len(normalized) < MIN_TEXT_LENGTH:
+        return None
+
+    shingles = {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    ) % _PRIME
+
+    # (a * x + b) mod p untuk semua permutasi sekaligus, lalu ambil minimum per permutasi
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _PRIME
+    return permuted.min(axis=0)
+
+
+class NearDuplicateIndex:
+    """Indeks MinHash + LSH atas teks tweet yang sudah dianalisis.
+
+    Indeks disimpan di memori dan diisi dari database; setiap pencarian
+    memuat analisis baru (id lebih besar dari yang terakhir dimuat),
+    sehingga hasil dari proses worker lain ikut terindeks. Analisis yang
+    lebih tua dari ttl (sama dengan TTL cache LLM) tidak dipakai ulang,
+    begitu juga analisis sebelumnya dari tweet yang sama (analisis ulang
+    tunduk pada TTL dan versi template cache LLM, bukan indeks ini).
+    """
+
+    def __init__(self, threshold: float, ttl: int, exclude_raw_analyses: Iterable[str] = ()):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.exclude_raw_analyses = list(exclude_raw_analyses)
+        self.signatures: Dict[int, np.ndarray] = {}
+        self.created_at: Dict[int, datetime] = {}
+        self.tweet_ids: Dict[int, str] = {}
+        self.buckets: List[Dict[bytes, Set[int]]] = [{} for _ in range(BANDS)]
+        self.last_analysis_id = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return 0 < self.threshold <= 1 and self.ttl > 0
+
+    def add(self, analysis_id: int, text: str, created_at: datetime = None, tweet_id: str = None):
+        """Tambahkan teks hasil analisis ke indeks"""
+        signature = minhash_signature(text)
+        if signature is None:
+            return
+
+        with self._lock:
+            self.signatures[analysis_id] = signature
+            self.created_at[analysis_id] = created_at or datetime.utcnow()
+            if tweet_id is not None:
+                self.tweet_ids[analysis_id] = tweet_id
+            for band, key in enumerate(self._band_keys(signature)):
+                self.buckets[band].setdefault(key, set()).add(analysis_id)
+
+    def refresh(self):
+        """Muat analisis yang tersimpan sejak refresh terakhir"""
+        db = SessionLocal()
+        try:
+            query = db.query(HoaxAnalysis.id, Tweet.text, HoaxAnalysis.created_at, HoaxAnalysis.tweet_id).join(
+                Tweet, Tweet.tweet_id == HoaxAnalysis.tweet_id
+            ).filter(
+                HoaxAnalysis.id > self.last_analysis_id,
+                HoaxAnalysis.created_at >= self._oldest_allowed()
+            )
+
+            # Hanya verdict LLM yang lolos validasi dipakai ulang; baris lama tanpa
+            # verdict_source disaring dengan raw_analysis fallback/pra-klasifikasi
+            legacy_filter = HoaxAnalysis.verdict_source == None
+            if self.exclude_raw_analyses:
+                legacy_filter = and_(legacy_filter, HoaxAnalysis.openai_analysis.notin_(self.exclude_raw_analyses))
+            query = query.filter(or_(HoaxAnalysis.verdict_source == 'llm', legacy_filter))
+
+            rows = query.order_by(HoaxAnalysis.id).all()
+        finally:
+            db.close()
+
+        for analysis_id, text, created_at, tweet_id in rows:
+            self.add(analysis_id, text, created_at, tweet_id)
+            self.last_analysis_id = max(self.last_analysis_id, analysis_id)
+
+    def find_similar(self, text: str, exclude_tweet_id: str = None) -> Optional[Tuple[int, float]]:
+        """Cari analisis dengan teks paling mirip; (analysis_id, similarity) jika di atas threshold.
+
+        Analisis milik exclude_tweet_id (tweet yang sedang dianalisis ulang) dilewati.
+        """
+        if not self.enabled:
+            return None
+
+        signature = minhash_signature(text)
+        if signature is None:
+            return None
+
+        self.refresh()
+
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates |= self.buckets[band].get(key, set())
+
+            # Verdict yang lebih tua dari TTL cache LLM tidak dipakai ulang lagi
+            oldest_allowed = self._oldest_allowed()
+            expired = {analysis_id for analysis_id in candidates if self.created_at[analysis_id] < oldest_allowed}
+            self._remove(expired)
+
+            best = None
+            for analysis_id in candidates - expired:
+                if exclude_tweet_id is not None and self.tweet_ids.get(analysis_id) == exclude_tweet_id:
+                    continue
+                similarity = float(np.mean(self.signatures[analysis_id] == signature))
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (analysis_id, similarity)
+
+        return best
+
+    def find_prior_verdict(self, text: str, exclude_tweet_id: str = None) -> Optional[Dict[str, Any]]:
+        """Ambil verdict analisis sebelumnya untuk teks yang hampir sama dari tweet lain"""
+        match = self.find_similar(text, exclude_tweet_id)
+        if not match:
+            return None
+
+        analysis_id, similarity = match
+        db = SessionLocal()
+        try:
+            analysis = db.query(HoaxAnalysis).filter(
+                HoaxAnalysis.id == analysis_id,
+                HoaxAnalysis.created_at >= self._oldest_allowed()
+            ).first()
+            if not analysis:
+                return None
+
+            return {
+                'analysis_id': analysis.id,
+                'tweet_id': analysis.tweet_id,
+                'similarity': similarity,
+                'hoax_probability': analysis.hoax_probability or 0.0,
+                'is_hoax': bool(analysis.is_hoax),
+                'reasons': analysis.hoax_reasons or [],
+                'raw_analysis': analysis.openai_analysis or ''
+            }
+        finally:
+            db.close()
+
+    def _oldest_allowed(self) -> datetime:
+        return datetime.utcnow() - timedelta(seconds=self.ttl)
+
+    def _remove(self, analysis_ids: Set[int]):
+        """Buang analisis dari indeks (dipanggil dengan lock dipegang)"""
+        for analysis_id in analysis_ids:
+            signature = self.signatures.pop(analysis_id)
+            self.created_at.pop(analysis_id, None)
+            self.tweet_ids.pop(analysis_id, None)
+            for band, key in enumerate(self._band_keys(signature)):
+                bucket = self.buckets[band].get(key)
+                if bucket is not None:
+                    bucket.discard(analysis_id)
+                    if not bucket:
+                        del self.buckets[band][key]
+
+    def _band_keys(self, signature: np.ndarray):
+        """Kunci bucket LSH per band"""
+        for band in range(BANDS):
+            yield signature[band * ROWS:(band + 1) * ROWS].tobytes()
@@ -6,14 +6,75 @@ import matplotlib.pyplot as plt
 import numpy as np
 import json
 import os
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Iterable
 from datetime import datetime
+from app.config import config
+
+class CentralityEngine:
+    """Centrality satu graf yang dihitung sekali lalu dipakai ulang.
+    
+    Setiap measure baru dihitung saat pertama diminta; hasil (atau errornya)
+    disimpan sehingga metrik jaringan dan node berpengaruh tidak mengulang
+    pagerank/degree yang sama. Betweenness dan closeness (O(VE)) hanya
+    dihitung untuk graf sampai expensive_max_nodes node.
+    """
+    
+    MEASURES = ('degree', 'betweenness', 'closeness', 'pagerank')
+    EXPENSIVE_MEASURES = ('betweenness', 'closeness')
+    
+    def __init__(self, graph: nx.DiGraph, expensive_max_nodes: int = 0):
+        self.graph = graph
+        self.expensive_max_nodes = expensive_max_nodes
+        self._results: Dict[str, Dict[Any, float]] = {}
+        self._errors: Dict[str, Exception] = {}
+    
+    def get(self, measure: str) -> Dict[Any, float]:
+        """Nilai satu measure per node"""
+        if measure in self._results:
+            return self._results[measure]
+        if measure in self._errors:
+            raise self._errors[measure]
+        if measure not in self.MEASURES:
+            raise ValueError(f"Centrality tidak dikenal: {measure}")
+        
+        try:
+            self._results[measure] = self._compute(measure)
+        except Exception as e:
+            self._errors[measure] = e
+            raise
+        return self._results[measure]
+    
+    def compute(self, measures: Iterable[str]) -> Dict[str, Dict[Any, float]]:
+        """Measure yang diminta; measure yang gagal atau terlalu mahal untuk graf ini dilewati"""
+        results = {}
+        for measure in measures:
+            if measure in self.EXPENSIVE_MEASURES and not self.is_affordable():
+                continue
+            try:
+                results[measure] = self.get(measure)
+            except Exception as e:
+                print(f"Error calculating {measure} centrality: {e}")
+        return results
+    
+    def is_affordable(self) -> bool:
+        """Graf cukup kecil untuk betweenness/closeness?"""
+        return self.expensive_max_nodes <= 0 or self.graph.number_of_nodes() <= self.expensive_max_nodes
+    
+    def _compute(self, measure: str) -> Dict[Any, float]:
+        if measure == 'degree':
+            return nx.degree_centrality(self.graph)
+        if measure == 'betweenness':
+            return nx.betweenness_centrality(self.graph)
+        if measure == 'closeness':
+            return nx.closeness_centrality(self.graph)
+        return nx.pagerank(self.graph)
 
 class NetworkAnalysisService:
     """Service untuk analisis jaringan penyebaran tweet"""
     
     def __init__(self):
         self.graph = nx.DiGraph()
+        self.centrality = CentralityEngine(self.graph)
         self.pos = None
         
     def analyze_network(self, network_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -21,6 +82,7 @@ class NetworkAnalysisService:
         
         # Buat graf dari data
         self.graph = self._create_graph(network_data)
+        self.centrality = CentralityEngine(self.graph, config.NETWORK_CENTRALITY_MAX_NODES)
         
         # Hitung metrik jaringan
         metrics = self._calculate_network_metrics()
@@ -55,7 +117,8 @@ class NetworkAnalysisService:
                 label=node.get('label', ''),
                 type=node.get('type', 'user'),
                 followers=node.get('followers', 0),
-                influence_score=node.get('influence_score', 0.0)
+                influence_score=node.get('influence_score', 0.0),
+                bot_probability=node.get('bot_probability')
             )
         
         # Tambahkan edges
@@ -79,15 +142,8 @@ class NetworkAnalysisService:
         num_edges = len(self.graph.edges())
         density = nx.density(self.graph)
         
-        # Centrality measures
-        centrality_measures = {}
-        try:
-            centrality_measures['degree'] = nx.degree_centrality(self.graph)
-            centrality_measures['betweenness'] = nx.betweenness_centrality(self.graph)
-            centrality_measures['closeness'] = nx.closeness_centrality(self.graph)
-            centrality_measures['pagerank'] = nx.pagerank(self.graph)
-        except:
-            centrality_measures = {}
+        # Centrality measures (hasilnya dipakai ulang oleh _identify_influential_nodes)
+        centrality_measures = self.centrality.compute(config.NETWORK_CENTRALITY_MEASURES)
         
         # Komponen terhubung
         num_components = nx.number_weakly_connected_components(self.graph)
@@ -111,11 +167,9 @@ class NetworkAnalysisService:
         influential_nodes = []
         
         try:
-            # Hitung PageRank
-            pagerank = nx.pagerank(self.graph)
-            
-            # Hitung degree centrality
-            degree_centrality = nx.degree_centrality(self.graph)
+            # PageRank dan degree centrality dari perhitungan metrik jaringan
+            pagerank = self.centrality.get('pagerank')
+            degree_centrality = self.centrality.get('degree')
             
             # Kombinasi skor
             for node in self.graph.nodes():
@@ -266,6 +320,13 @@ class NetworkAnalysisService:
         if len(self.graph.nodes()) == 0:
             return 0.0
         
+        # Pakai skor BotDetectionService jika peserta jaringan sudah dinilai
+        bot_probabilities = [data['bot_probability'] for _, data in self.graph.nodes(data=True)
+                             if data.get('bot_probability') is not None]
+        if bot_probabilities:
+            bot_nodes = [probability for probability in bot_probabilities if probability > config.BOT_DETECTION_THRESHOLD]
+            return round(len(bot_nodes) / len(bot_probabilities), 3)
+        
         # Asumsi: node dengan influence_score rendah adalah bot
         bot_nodes = [node for node, data in self.graph.nodes(data=True) 
                     if data.get('influence_score', 0) < 0.3]
@@ -372,13 +433,11 @@ class NetworkAnalysisService:
                        ))
         
         # Simpan visualization
-        if output_path:
-            fig.write_html(output_path)
-        else:
+        if not output_path:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_path = f"visualizations/network_{timestamp}.html"
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            fig.write_html(output_path)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        fig.write_html(output_path)
         
         return output_path
     
@@ -433,13 +492,11 @@ class NetworkAnalysisService:
         fig.update_xaxes(tickangle=45)
         
         # Simpan chart
-        if output_path:
-            fig.write_html(output_path)
-        else:
+        if not output_path:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_path = f"visualizations/influence_{timestamp}.html"
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            fig.write_html(output_path)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        fig.write_html(output_path)
         
         return output_path
     
@@ -554,4 +611,32 @@ class NetworkAnalysisService:
         if risk_score > 0.5:
             recommendations.append("Tingkat risiko tinggi - perlu investigasi lebih lanjut")
         
-        return recommendations 
\ No newline at end of file
+        return recommendations
+
+def run_network_analysis(network_data: Dict[str, Any], visualization_path: str = None,
+                         influence_chart_path: str = None) -> Tuple[Dict[str, Any], str, str]:
+    """Analisis jaringan beserta visualisasinya dalam satu panggilan.
+
+    Fungsi level modul agar bisa dijalankan di process pool; graf disimpan
+    di instance service, jadi setiap panggilan memakai instance baru.
+    Path output sebaiknya unik per job karena beberapa analisis bisa
+    selesai pada detik yang sama.
+    """
+    service = NetworkAnalysisService()
+    network_analysis = service.analyze_network(network_data)
+    visualization_path = service.create_network_visualization(visualization_path)
+    
+    influential_nodes = network_analysis.get('influential_nodes', [])
+    chart_path = ""
+    if influential_nodes:
+        chart_path = service.create_influence_chart(influential_nodes, influence_chart_path)
+    
+    return network_analysis, visualization_path, chart_path
+
+def create_influence_chart_for(network_data: Dict[str, Any]) -> str:
+    """Analisis jaringan lalu buat chart pengaruh (untuk process pool)"""
+    service = NetworkAnalysisService()
+    influential_nodes = service.analyze_network(network_data).get('influential_nodes', [])
+    if not influential_nodes:
+        return ""
+    return service.create_influence_chart(influential_nodes)
@@ -1,130 +1,572 @@
+import asyncio
 import openai
-import json
 import re
-from typing import Dict, Any, List
+import unicodedata
+import weakref
+from typing import Dict, Any, List, Optional, Tuple, Callable
 from app.config import config
+from app.executors import run_io
+from app.services.cache_service import PersistentCache
+from app.services.near_duplicate_service import NearDuplicateIndex
+from app.services.rate_limiter import OpenAIRateLimiter
+from app.services.resilience import ResiliencePolicy
+from app.services.prescreen_service import PreScreenClassifier, HOAX_KEYWORDS, classify_category
+from app.services.prompt_builder import PromptBuilder, TokenCounter
+from app.services.hoax_schema import HoaxVerdict, IncrementalVerdictParser, parse_verdict, parse_batch_verdicts
 
 class OpenAIService:
     """Service untuk analisis hoax menggunakan OpenAI"""
     
+    # raw_analysis untuk hasil rule-based (verdict_source selain 'llm' tidak pernah dipakai ulang)
+    FALLBACK_RAW_ANALYSIS = 'Analisis menggunakan sistem rule-based (fallback)'
+    PRESCREEN_RAW_ANALYSIS = 'Analisis menggunakan pra-klasifikasi lokal (tidak dikirim ke OpenAI)'
+    
+    SYSTEM_PROMPT = "Anda adalah ahli fact-checker dan analisis hoax di media sosial. Analisis dengan objektif dan berdasarkan bukti."
+    BATCH_MAX_TOKENS_PER_TWEET = 350
+    BATCH_MAX_TOKENS = 4000
+    TEMPERATURE = 0.3
+    
     def __init__(self):
-        openai.api_key = config.OPENAI_API_KEY
+        self.api_key = config.OPENAI_API_KEY
+        self.model = config.OPENAI_MODEL
+        self.max_completion_tokens = config.OPENAI_MAX_COMPLETION_TOKENS
+        self.token_counter = TokenCounter(self.model)
+        self.prompt_builder = PromptBuilder(
+            self.token_counter,
+            config.PROMPT_MAX_TOKENS,
+            config.PROMPT_MAX_TWEET_TOKENS,
+            config.PROMPT_MAX_BIO_TOKENS
+        )
+        self.response_cache = PersistentCache("llm", config.LLM_CACHE_TTL, config.LLM_CACHE_MAX_ENTRIES)
+        self.near_duplicates = NearDuplicateIndex(
+            config.NEAR_DUPLICATE_THRESHOLD,
+            config.LLM_CACHE_TTL,
+            [self.FALLBACK_RAW_ANALYSIS, self.PRESCREEN_RAW_ANALYSIS]
+        )
+        self.prescreen = PreScreenClassifier(
+            config.PRESCREEN_THRESHOLD,
+            config.PRESCREEN_MODEL_PATH,
+            config.PRESCREEN_MIN_TRAINING_VERDICTS,
+            config.PRESCREEN_RELOAD_INTERVAL
+        )
+        self.rate_limiter = OpenAIRateLimiter(
+            config.OPENAI_REQUESTS_PER_MINUTE,
+            config.OPENAI_TOKENS_PER_MINUTE,
+            config.OPENAI_MAX_CONCURRENCY,
+            self.token_counter
+        )
+        self.resilience = ResiliencePolicy(
+            'openai',
+            timeout=config.OPENAI_TIMEOUT,
+            retries=config.OPENAI_RETRIES,
+            backoff_base=config.RETRY_BACKOFF_BASE,
+            backoff_max=config.RETRY_BACKOFF_MAX,
+            failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=config.CIRCUIT_RESET_TIMEOUT,
+            hedge_delay=config.OPENAI_HEDGE_DELAY,
+            retry_on=(openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+        )
+        self._client = None
+        # AsyncOpenAI memakai koneksi yang terikat ke event loop, jadi satu klien per loop
+        self._async_clients = weakref.WeakKeyDictionary()
+        # Antrian analisis yang menunggu digabung menjadi request batch, per event loop
+        self._coalesce_queues = weakref.WeakKeyDictionary()
+        self._coalesce_tasks = set()
     
-    def analyze_hoax(self, tweet_text: str, user_data: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_hoax(self, tweet_text: str, user_data: Dict[str, Any], tweet_id: str = None) -> Dict[str, Any]:
         """Analisis apakah tweet mengandung hoax atau tidak"""
         
+        cache_key, reused_result = self._resolve_without_llm(tweet_text, tweet_id)
+        if reused_result is not None:
+            return reused_result
+        
+        return self._analyze_single(tweet_text, user_data, cache_key)
+    
+    async def analyze_hoax_async(self, tweet_text: str, user_data: Dict[str, Any],
+                                 on_partial: Optional[Callable[[Dict[str, Any]], None]] = None,
+                                 tweet_id: str = None) -> Dict[str, Any]:
+        """Versi async dari analyze_hoax; request OpenAI tidak memakai thread pool.
+        
+        Panggilan yang datang bersamaan dalam OPENAI_BATCH_WINDOW digabung
+        menjadi satu request batch. Jika on_partial diberikan, jawaban
+        di-stream sendiri agar verdict awal bisa ditampilkan lebih cepat.
+        """
+        
+        cache_key, reused_result = await run_io(self._resolve_without_llm, tweet_text, tweet_id)
+        if reused_result is not None:
+            return reused_result
+        
+        if on_partial is None and config.OPENAI_BATCH_WINDOW > 0 and config.OPENAI_BATCH_SIZE > 1:
+            return await self._analyze_coalesced_async(tweet_text, user_data, cache_key)
+        
+        return await self._analyze_single_async(tweet_text, user_data, cache_key, on_partial)
+    
+    def analyze_hoax_batch(self, tweets: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Analisis banyak tweet dengan sesedikit mungkin request.
+        
+        tweets berisi dict {'id', 'text', 'user'} dan opsional 'tweet_id'
+        (agar verdict lama tweet yang sama tidak dipakai sebagai near-duplicate);
+        hasil dipetakan per id.
+        Tweet dikemas OPENAI_BATCH_SIZE per request, dan tweet yang gagal
+        diparsing dianalisis ulang satu per satu.
+        """
+        results = {}
+        pending = []
+        for tweet in tweets:
+            cache_key, reused_result = self._resolve_without_llm(tweet['text'], tweet.get('tweet_id'))
+            if reused_result is not None:
+                results[tweet['id']] = reused_result
+            else:
+                pending.append((tweet, cache_key))
+        
+        for chunk in self._batch_chunks(pending):
+            batch_results = {}
+            item_usage = {}
+            if len(chunk) > 1:
+                try:
+                    messages = self._build_messages(self._create_batch_analysis_prompt([tweet for tweet, _ in chunk]))
+                    analysis_text, usage = self._complete(messages, self._batch_max_tokens(len(chunk)))
+                    batch_results = self._parse_batch_analysis_result(analysis_text, [tweet['id'] for tweet, _ in chunk])
+                    item_usage = self._split_usage(usage, len(chunk))
+                except Exception as e:
+                    print(f"Error in OpenAI batch analysis: {e}")
+            
+            for tweet, cache_key in chunk:
+                if tweet['id'] in batch_results:
+                    self._cache_verdict(cache_key, batch_results[tweet['id']])
+                    results[tweet['id']] = self._with_usage(batch_results[tweet['id']], item_usage)
+                else:
+                    results[tweet['id']] = self._analyze_single(tweet['text'], tweet.get('user') or {}, cache_key)
+        
+        return results
+    
+    async def analyze_hoax_batch_async(self, tweets: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Versi async dari analyze_hoax_batch; semua potongan dikirim paralel"""
+        results = {}
+        pending = []
+        for tweet in tweets:
+            cache_key, reused_result = await run_io(self._resolve_without_llm, tweet['text'], tweet.get('tweet_id'))
+            if reused_result is not None:
+                results[tweet['id']] = reused_result
+            else:
+                pending.append((tweet, cache_key))
+        
+        for chunk_results in await asyncio.gather(*(self._analyze_chunk_async(chunk) for chunk in self._batch_chunks(pending))):
+            results.update(chunk_results)
+        
+        return results
+    
+    def _analyze_single(self, tweet_text: str, user_data: Dict[str, Any], cache_key: str) -> Dict[str, Any]:
+        """Analisis satu tweet dengan OpenAI, fallback ke rule-based jika gagal"""
+        
         # Buat prompt untuk analisis hoax
         prompt = self._create_hoax_analysis_prompt(tweet_text, user_data)
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "Anda adalah ahli fact-checker dan analisis hoax di media sosial. Analisis dengan objektif dan berdasarkan bukti."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.3
-            )
-            
-            analysis_text = response.choices[0].message.content
+            analysis_text, usage = self._complete(self._build_messages(prompt))
             
             # Parse hasil analisis
             analysis_result = self._parse_analysis_result(analysis_text)
+            self._cache_verdict(cache_key, analysis_result)
             
-            return analysis_result
+            return self._with_usage(analysis_result, usage)
             
         except Exception as e:
             print(f"Error in OpenAI analysis: {e}")
             # Fallback ke analisis rule-based sederhana
             return self._fallback_analysis(tweet_text, user_data)
     
-    def _create_hoax_analysis_prompt(self, tweet_text: str, user_data: Dict[str, Any]) -> str:
-        """Buat prompt untuk analisis hoax"""
+    async def _analyze_single_async(self, tweet_text: str, user_data: Dict[str, Any], cache_key: str,
+                                    on_partial: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Versi async dari _analyze_single"""
+        prompt = self._create_hoax_analysis_prompt(tweet_text, user_data)
         
-        prompt = f"""
-        Analisis tweet berikut untuk mendeteksi apakah berpotensi hoax atau misinformasi:
-
-        TWEET: "{tweet_text}"
-
-        INFORMASI PENGGUNA:
-        - Username: @{user_data.get('username', 'unknown')}
-        - Display Name: {user_data.get('display_name', 'unknown')}
-        - Bio: {user_data.get('bio', 'tidak ada')}
-        - Followers: {user_data.get('followers_count', 0):,}
-        - Following: {user_data.get('following_count', 0):,}
-        - Total Tweet: {user_data.get('tweet_count', 0):,}
-        - Verified: {'Ya' if user_data.get('verified', False) else 'Tidak'}
-
-        KRITERIA ANALISIS:
-        1. Klaim yang tidak didukung bukti
-        2. Bahasa sensasional atau clickbait
-        3. Informasi medis/kesehatan tanpa sumber
-        4. Klaim politik yang tidak terverifikasi
-        5. Informasi bencana atau darurat yang tidak resmi
-        6. Konspirasi atau teori tidak berdasar
-        7. Informasi keuangan/ekonomi yang mencurigakan
-
-        BERIKAN ANALISIS DALAM FORMAT JSON:
-        {{
-            "hoax_probability": [0.0-1.0],
-            "is_hoax": [true/false],
-            "confidence_level": ["rendah"/"sedang"/"tinggi"],
-            "analysis_summary": "ringkasan analisis dalam bahasa Indonesia",
-            "red_flags": ["daftar", "tanda", "bahaya"],
-            "reasons": ["alasan 1", "alasan 2", "dst"],
-            "category": "kategori hoax (political/health/disaster/celebrity/financial/conspiracy/normal)",
-            "recommendations": ["saran untuk pembaca"]
-        }}
-
-        Berikan respons dalam format JSON yang valid.
+        try:
+            analysis_text, usage = await self._complete_async(self._build_messages(prompt), on_partial=on_partial)
+            
+            analysis_result = self._parse_analysis_result(analysis_text)
+            await run_io(self._cache_verdict, cache_key, analysis_result)
+            
+            return self._with_usage(analysis_result, usage)
+            
+        except Exception as e:
+            print(f"Error in OpenAI analysis: {e}")
+            return self._fallback_analysis(tweet_text, user_data)
+    
+    async def _analyze_chunk_async(self, chunk: List[Tuple[Dict[str, Any], str]]) -> Dict[str, Dict[str, Any]]:
+        """Analisis satu potongan batch; item yang gagal diparsing dianalisis satu per satu"""
+        batch_results = {}
+        item_usage = {}
+        if len(chunk) > 1:
+            try:
+                messages = self._build_messages(self._create_batch_analysis_prompt([tweet for tweet, _ in chunk]))
+                analysis_text, usage = await self._complete_async(messages, self._batch_max_tokens(len(chunk)))
+                batch_results = self._parse_batch_analysis_result(analysis_text, [tweet['id'] for tweet, _ in chunk])
+                item_usage = self._split_usage(usage, len(chunk))
+            except Exception as e:
+                print(f"Error in OpenAI batch analysis: {e}")
+        
+        results = {}
+        retries = []
+        for tweet, cache_key in chunk:
+            if tweet['id'] in batch_results:
+                await run_io(self._cache_verdict, cache_key, batch_results[tweet['id']])
+                results[tweet['id']] = self._with_usage(batch_results[tweet['id']], item_usage)
+            else:
+                retries.append((tweet, cache_key))
+        
+        single_results = await asyncio.gather(*(
+            self._analyze_single_async(tweet['text'], tweet.get('user') or {}, cache_key) for tweet, cache_key in retries
+        ))
+        for (tweet, _), result in zip(retries, single_results):
+            results[tweet['id']] = result
+        
+        return results
+    
+    async def _analyze_coalesced_async(self, tweet_text: str, user_data: Dict[str, Any], cache_key: str) -> Dict[str, Any]:
+        """Tunggu sebentar agar analisis lain yang datang bersamaan ikut dalam satu request batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        pending = self._coalesce_queues.setdefault(loop, [])
+        pending.append(({'text': tweet_text, 'user': user_data}, cache_key, future))
+        
+        if len(pending) >= config.OPENAI_BATCH_SIZE:
+            self._flush_coalesced(loop)
+        elif len(pending) == 1:
+            loop.call_later(config.OPENAI_BATCH_WINDOW, self._flush_coalesced, loop)
+        
+        return await future
+    
+    def _flush_coalesced(self, loop):
+        """Kirim semua analisis yang sedang menunggu sebagai satu potongan batch"""
+        pending = self._coalesce_queues.pop(loop, [])
+        if not pending:
+            return
+        
+        task = loop.create_task(self._dispatch_coalesced(pending))
+        self._coalesce_tasks.add(task)
+        task.add_done_callback(self._coalesce_tasks.discard)
+    
+    async def _dispatch_coalesced(self, pending: List[Tuple[Dict[str, Any], str, asyncio.Future]]):
+        """Jalankan potongan batch dan teruskan hasilnya ke masing-masing pemanggil"""
+        chunk = []
+        for index, (tweet, cache_key, _) in enumerate(pending):
+            chunk.append((dict(tweet, id=str(index)), cache_key))
+        
+        try:
+            results = await self._analyze_chunk_async(chunk)
+        except Exception as e:
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for index, (_, _, future) in enumerate(pending):
+            if not future.done():
+                future.set_result(results[str(index)])
+    
+    def _batch_chunks(self, items: List[Any]) -> List[List[Any]]:
+        """Potong item menjadi potongan sebesar OPENAI_BATCH_SIZE"""
+        size = max(1, config.OPENAI_BATCH_SIZE)
+        return [items[start:start + size] for start in range(0, len(items), size)]
+    
+    def _split_usage(self, usage: Dict[str, int], count: int) -> Dict[str, int]:
+        """Bagi rata pemakaian token request batch ke setiap tweet di dalamnya"""
+        return {key: value // count for key, value in usage.items()}
+    
+    def _cache_verdict(self, cache_key: str, analysis_result: Dict[str, Any]):
+        """Simpan hasil ke cache LLM, hanya jika lolos validasi skema (bukan fallback)"""
+        if analysis_result.get('verdict_source') == 'llm':
+            self.response_cache.set(cache_key, analysis_result)
+    
+    def _with_usage(self, analysis_result: Dict[str, Any], usage: Dict[str, int]) -> Dict[str, Any]:
+        """Tambahkan versi template dan jumlah token ke hasil analisis (tidak ikut di-cache)"""
+        return dict(analysis_result, prompt_template_version=self.prompt_builder.template_version, **usage)
+    
+    def _batch_max_tokens(self, count: int) -> int:
+        """Batas token jawaban untuk request batch"""
+        return min(self.BATCH_MAX_TOKENS_PER_TWEET * count, self.BATCH_MAX_TOKENS)
+    
+    def _resolve_without_llm(self, tweet_text: str, tweet_id: str = None) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Cari hasil tanpa memanggil LLM; kembalikan (cache_key, hasil atau None)"""
+        
+        # Teks yang sama (retweet, copy-paste) tidak perlu dianalisis ulang
+        cache_key = self.response_cache.make_key(self.model, self.prompt_builder.template_version, self._normalize_text(tweet_text))
+        cached_result = self.response_cache.get(cache_key)
+        if cached_result is not None and cached_result.get('verdict_source') == 'llm':
+            return cache_key, cached_result
+        
+        # Klaim yang sama dengan sedikit perubahan (hashtag, emoji, huruf besar) memakai verdict sebelumnya
+        try:
+            prior_verdict = self.near_duplicates.find_prior_verdict(tweet_text, tweet_id)
+        except Exception as e:
+            print(f"Error in near-duplicate lookup: {e}")
+            prior_verdict = None
+        
+        if prior_verdict:
+            return cache_key, self._reuse_prior_verdict(tweet_text, prior_verdict)
+        
+        # Tweet yang jelas biasa (olahraga, teknologi, sapaan) tidak perlu dikirim ke LLM
+        try:
+            prescreen_score = self.prescreen.screen(tweet_text)
+        except Exception as e:
+            print(f"Error in pre-screen: {e}")
+            prescreen_score = None
+        
+        if prescreen_score is not None:
+            return cache_key, self._prescreened_result(tweet_text, prescreen_score)
+        
+        return cache_key, None
+    
+    def _build_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """Susun pesan chat untuk OpenAI"""
+        return [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _get_client(self) -> openai.OpenAI:
+        """Klien OpenAI sync (dibuat sekali)"""
+        if self._client is None:
+            # Retry 429 ditangani rate limiter, retry lain oleh resilience policy
+            self._client = openai.OpenAI(api_key=self.api_key, max_retries=0, timeout=self.resilience.timeout)
+        return self._client
+    
+    def _get_async_client(self) -> openai.AsyncOpenAI:
+        """Klien AsyncOpenAI untuk event loop yang sedang berjalan"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = openai.AsyncOpenAI(api_key=self.api_key, max_retries=0, timeout=self.resilience.timeout)
+            self._async_clients[loop] = client
+        return client
+    
+    def _request_options(self, messages: List[Dict[str, str]], max_tokens: int) -> Dict[str, Any]:
+        """Parameter chat completion; JSON mode memaksa jawaban berupa objek JSON"""
+        options = {
+            'model': self.model,
+            'messages': messages,
+            'max_tokens': max_tokens,
+            'temperature': self.TEMPERATURE
+        }
+        if config.OPENAI_JSON_MODE:
+            options['response_format'] = {'type': 'json_object'}
+        return options
+    
+    def _complete(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> Tuple[str, Dict[str, int]]:
+        """Kirim chat completion (blocking) dengan timeout, retry, dan circuit breaker"""
+        max_tokens = max_tokens or self.max_completion_tokens
+        return self.resilience.call(lambda: self._request(messages, max_tokens))
+    
+    async def _complete_async(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None,
+                              on_partial: Optional[Callable[[Dict[str, Any]], None]] = None) -> Tuple[str, Dict[str, int]]:
+        """Kirim chat completion secara async dengan timeout, retry, dan circuit breaker.
+        
+        Jika on_partial diberikan, jawaban di-stream dan on_partial dipanggil
+        begitu hoax_probability/is_hoax terbaca.
         """
+        max_tokens = max_tokens or self.max_completion_tokens
+        return await self.resilience.call_async(lambda: self._request_async(messages, max_tokens, on_partial))
+    
+    def _request(self, messages: List[Dict[str, str]], max_tokens: int) -> Tuple[str, Dict[str, int]]:
+        """Satu percobaan chat completion (blocking) melalui rate limiter"""
+        client = self._get_client()
+        estimated_tokens = self.rate_limiter.estimate_tokens(messages, max_tokens)
+        
+        for attempt in range(config.OPENAI_RATE_LIMIT_RETRIES + 1):
+            self.rate_limiter.acquire_blocking(estimated_tokens)
+            try:
+                with self.rate_limiter.thread_concurrency():
+                    raw_response = client.chat.completions.with_raw_response.create(
+                        **self._request_options(messages, max_tokens)
+                    )
+            except openai.RateLimitError as e:
+                if attempt >= config.OPENAI_RATE_LIMIT_RETRIES:
+                    raise
+                self.rate_limiter.pause(e.response.headers)
+                continue
+            
+            return self._read_completion(raw_response, messages, estimated_tokens)
+    
+    async def _request_async(self, messages: List[Dict[str, str]], max_tokens: int,
+                             on_partial: Optional[Callable[[Dict[str, Any]], None]]) -> Tuple[str, Dict[str, int]]:
+        """Satu percobaan chat completion async melalui rate limiter; timeout tidak menghitung antrean rate limit"""
+        client = self._get_async_client()
+        estimated_tokens = self.rate_limiter.estimate_tokens(messages, max_tokens)
+        
+        for attempt in range(config.OPENAI_RATE_LIMIT_RETRIES + 1):
+            await self.rate_limiter.acquire(estimated_tokens)
+            try:
+                async with self.rate_limiter.concurrency():
+                    return await self.resilience.timed(
+                        self._send_async(client, messages, max_tokens, estimated_tokens, on_partial)
+                    )
+            except openai.RateLimitError as e:
+                if attempt >= config.OPENAI_RATE_LIMIT_RETRIES:
+                    raise
+                self.rate_limiter.pause(e.response.headers)
+                continue
+    
+    async def _send_async(self, client: openai.AsyncOpenAI, messages: List[Dict[str, str]], max_tokens: int,
+                          estimated_tokens: int, on_partial: Optional[Callable[[Dict[str, Any]], None]]) -> Tuple[str, Dict[str, int]]:
+        """Kirim request dan baca jawabannya (biasa atau streaming)"""
+        if on_partial is None:
+            raw_response = await client.chat.completions.with_raw_response.create(
+                **self._request_options(messages, max_tokens)
+            )
+            return self._read_completion(raw_response, messages, estimated_tokens)
+        
+        raw_response = await client.chat.completions.with_raw_response.create(
+            stream=True,
+            stream_options={'include_usage': True},
+            **self._request_options(messages, max_tokens)
+        )
+        return await self._read_stream(raw_response, messages, estimated_tokens, on_partial)
+    
+    def _read_completion(self, raw_response, messages: List[Dict[str, str]], estimated_tokens: int) -> Tuple[str, Dict[str, int]]:
+        """Ambil teks completion dan jumlah token; perbarui rate limiter dari header dan usage"""
+        self.rate_limiter.update_from_headers(raw_response.headers)
+        completion = raw_response.parse()
+        content = completion.choices[0].message.content or ''
+        
+        return content, self._token_usage(getattr(completion, 'usage', None), messages, content, estimated_tokens)
+    
+    async def _read_stream(self, raw_response, messages: List[Dict[str, str]], estimated_tokens: int,
+                           on_partial: Callable[[Dict[str, Any]], None]) -> Tuple[str, Dict[str, int]]:
+        """Baca jawaban streaming; verdict awal dikirim ke on_partial sebelum jawaban selesai"""
+        self.rate_limiter.update_from_headers(raw_response.headers)
+        stream = raw_response.parse()
+        parser = IncrementalVerdictParser()
+        usage = None
+        
+        async for chunk in stream:
+            if getattr(chunk, 'usage', None):
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            
+            if parser.feed(chunk.choices[0].delta.content or ''):
+                try:
+                    on_partial(parser.partial())
+                except Exception as e:
+                    print(f"Error publishing partial verdict: {e}")
+        
+        content = parser.text
+        return content, self._token_usage(usage, messages, content, estimated_tokens)
+    
+    def _token_usage(self, usage, messages: List[Dict[str, str]], content: str, estimated_tokens: int) -> Dict[str, int]:
+        """Jumlah token request; diestimasi sendiri jika respons tidak menyertakan usage"""
+        self.rate_limiter.record_usage(estimated_tokens, usage.total_tokens if usage else None)
+        
+        if usage:
+            return {'prompt_tokens': usage.prompt_tokens, 'completion_tokens': usage.completion_tokens}
+        return {
+            'prompt_tokens': self.rate_limiter.count_prompt_tokens(messages),
+            'completion_tokens': self.token_counter.count(content)
+        }
+    
+    def _prescreened_result(self, tweet_text: str, score: float) -> Dict[str, Any]:
+        """Hasil analisis untuk tweet yang lolos pra-klasifikasi sebagai berisiko rendah"""
+        return {
+            'hoax_probability': score,
+            'is_hoax': False,
+            'confidence_level': 'sedang',
+            'analysis_summary': f'Pra-klasifikasi lokal memberi skor risiko {score:.0%}; tidak ada indikator hoax sehingga tidak dianalisis lebih lanjut oleh OpenAI.',
+            'red_flags': [],
+            'reasons': ['Tidak ada kata kunci hoax dan pola konten menyerupai tweet biasa'],
+            'category': self._classify_category(tweet_text.lower()),
+            'recommendations': [
+                'Tetap verifikasi informasi dari sumber terpercaya sebelum membagikan'
+            ],
+            'raw_analysis': self.PRESCREEN_RAW_ANALYSIS,
+            'verdict_source': 'prescreen',
+            'prescreened': True,
+            'prescreen_score': score
+        }
+    
+    def _reuse_prior_verdict(self, tweet_text: str, prior_verdict: Dict[str, Any]) -> Dict[str, Any]:
+        """Bentuk hasil analisis dari verdict tweet yang hampir sama"""
+        similarity = prior_verdict['similarity']
+        reasons = list(prior_verdict['reasons'])
+        reasons.append(f"Teks {similarity:.0%} mirip dengan tweet {prior_verdict['tweet_id']} yang sudah dianalisis")
         
-        return prompt
+        return {
+            'hoax_probability': float(prior_verdict['hoax_probability']),
+            'is_hoax': prior_verdict['is_hoax'],
+            'confidence_level': 'sedang',
+            'analysis_summary': f"Verdict dipakai ulang dari tweet {prior_verdict['tweet_id']} dengan kemiripan teks {similarity:.0%}.",
+            'red_flags': [],
+            'reasons': reasons,
+            'category': self._classify_category(tweet_text.lower()),
+            'recommendations': [
+                'Verifikasi informasi dari sumber terpercaya',
+                'Waspadai klaim yang disebarkan berulang dengan sedikit perubahan'
+            ],
+            'raw_analysis': prior_verdict['raw_analysis'],
+            'verdict_source': 'near_duplicate',
+            'reused': True,
+            'similarity': similarity,
+            'reused_from_tweet_id': prior_verdict['tweet_id']
+        }
+    
+    def _normalize_text(self, tweet_text: str) -> str:
+        """Normalisasi teks tweet untuk kunci cache (prefix RT, URL, huruf besar, spasi)"""
+        text = unicodedata.normalize('NFKC', tweet_text or '')
+        text = re.sub(r'^RT @\w+:\s*', '', text)
+        text = re.sub(r'https?://\S+', '', text)
+        return ' '.join(text.casefold().split())
+    
+    def _create_hoax_analysis_prompt(self, tweet_text: str, user_data: Dict[str, Any]) -> str:
+        """Buat prompt untuk analisis hoax"""
+        return self.prompt_builder.build_single(tweet_text, user_data)
+    
+    def _create_batch_analysis_prompt(self, tweets: List[Dict[str, Any]]) -> str:
+        """Buat prompt untuk analisis hoax beberapa tweet sekaligus"""
+        return self.prompt_builder.build_batch(tweets)
     
     def _parse_analysis_result(self, analysis_text: str) -> Dict[str, Any]:
         """Parse hasil analisis dari OpenAI"""
         try:
-            # Coba extract JSON dari respons
-            json_match = re.search(r'\{.*\}', analysis_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                result = json.loads(json_str)
-                
-                # Validasi dan normalisasi hasil
-                return {
-                    'hoax_probability': float(result.get('hoax_probability', 0.0)),
-                    'is_hoax': bool(result.get('is_hoax', False)),
-                    'confidence_level': result.get('confidence_level', 'sedang'),
-                    'analysis_summary': result.get('analysis_summary', ''),
-                    'red_flags': result.get('red_flags', []),
-                    'reasons': result.get('reasons', []),
-                    'category': result.get('category', 'normal'),
-                    'recommendations': result.get('recommendations', []),
-                    'raw_analysis': analysis_text
-                }
-            else:
-                # Jika tidak ada JSON, gunakan fallback
-                return self._fallback_analysis_from_text(analysis_text)
-                
-        except Exception as e:
+            verdict = parse_verdict(analysis_text)
+        except ValueError as e:
+            # Jawaban tanpa JSON yang valid, gunakan fallback
             print(f"Error parsing OpenAI result: {e}")
             return self._fallback_analysis_from_text(analysis_text)
+        
+        return self._verdict_result(verdict, analysis_text)
+    
+    def _parse_batch_analysis_result(self, analysis_text: str, tweet_ids: List[Any]) -> Dict[Any, Dict[str, Any]]:
+        """Parse hasil analisis batch; hanya tweet dengan hasil valid yang dikembalikan"""
+        try:
+            verdicts = parse_batch_verdicts(analysis_text)
+        except ValueError as e:
+            print(f"Error parsing OpenAI batch result: {e}")
+            return {}
+        
+        # ID di prompt berupa teks, jadi cocokkan dalam bentuk string
+        ids_by_key = {str(tweet_id): tweet_id for tweet_id in tweet_ids}
+        results = {}
+        for verdict in verdicts:
+            tweet_id = ids_by_key.get(verdict.id)
+            if tweet_id is not None and tweet_id not in results:
+                results[tweet_id] = self._verdict_result(verdict, verdict.model_dump_json())
+        
+        return results
+    
+    def _verdict_result(self, verdict: HoaxVerdict, raw_analysis: str) -> Dict[str, Any]:
+        """Bentuk hasil analisis dari verdict yang sudah tervalidasi"""
+        result = verdict.model_dump(include=set(HoaxVerdict.model_fields))
+        result['raw_analysis'] = raw_analysis
+        result['verdict_source'] = 'llm'
+        return result
     
     def _fallback_analysis(self, tweet_text: str, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analisis fallback berbasis rule jika OpenAI gagal"""
         
-        # Keywords yang mencurigakan
-        hoax_keywords = [
-            'breaking', 'urgent', 'viral', 'rahasia', 'tersembunyi', 'konspirasi',
-            'jangan percaya', 'pemerintah menyembunyikan', 'fakta tersembunyi',
-            'akan terjadi', 'prediksi', 'ramalan', 'paranormal', 'chip 5g',
-            'vaksin berbahaya', 'obat ajaib', 'sembuh total', 'tanpa efek samping'
-        ]
-        
-        # Hitung skor hoax berdasarkan keywords
+        # Hitung skor hoax berdasarkan keywords yang mencurigakan
         text_lower = tweet_text.lower()
-        keyword_matches = sum(1 for keyword in hoax_keywords if keyword in text_lower)
+        keyword_matches = sum(1 for keyword in HOAX_KEYWORDS if keyword in text_lower)
         
         # Analisis user metrics
         user_suspicious_score = 0
@@ -150,7 +592,7 @@ class OpenAIService:
             'is_hoax': total_score > config.HOAX_THRESHOLD,
             'confidence_level': 'sedang',
             'analysis_summary': f'Analisis berdasarkan {keyword_matches} kata kunci mencurigakan dan metrik akun pengguna.',
-            'red_flags': [keyword for keyword in hoax_keywords if keyword in text_lower],
+            'red_flags': [keyword for keyword in HOAX_KEYWORDS if keyword in text_lower],
             'reasons': self._generate_fallback_reasons(keyword_matches, user_suspicious_score),
             'category': self._classify_category(text_lower),
             'recommendations': [
@@ -158,7 +600,9 @@ class OpenAIService:
                 'Periksa tanggal dan konteks informasi',
                 'Cari konfirmasi dari media massa resmi'
             ],
-            'raw_analysis': 'Analisis menggunakan sistem rule-based (fallback)'
+            'raw_analysis': self.FALLBACK_RAW_ANALYSIS,
+            'verdict_source': 'fallback',
+            'fallback': True
         }
     
     def _fallback_analysis_from_text(self, analysis_text: str) -> Dict[str, Any]:
@@ -180,7 +624,9 @@ class OpenAIService:
                 'Verifikasi lebih lanjut diperlukan',
                 'Konsultasi dengan ahli terkait'
             ],
-            'raw_analysis': analysis_text
+            'raw_analysis': analysis_text,
+            'verdict_source': 'fallback',
+            'fallback': True
         }
     
     def _generate_fallback_reasons(self, keyword_matches: int, user_score: float) -> List[str]:
@@ -200,21 +646,7 @@ class OpenAIService:
     
     def _classify_category(self, text_lower: str) -> str:
         """Klasifikasi kategori berdasarkan konten"""
-        
-        categories = {
-            'health': ['vaksin', 'obat', 'virus', 'covid', 'kesehatan', 'penyakit', 'dokter'],
-            'political': ['pemerintah', 'presiden', 'politik', 'pemilu', 'partai', 'menteri'],
-            'disaster': ['gempa', 'banjir', 'tsunami', 'bencana', 'darurat', 'evakuasi'],
-            'celebrity': ['artis', 'selebriti', 'aktor', 'penyanyi', 'viral'],
-            'financial': ['investasi', 'saham', 'crypto', 'bitcoin', 'uang', 'bisnis'],
-            'conspiracy': ['konspirasi', 'rahasia', 'tersembunyi', 'illuminati', 'freemason']
-        }
-        
-        for category, keywords in categories.items():
-            if any(keyword in text_lower for keyword in keywords):
-                return category
-        
-        return 'normal'
+        return classify_category(text_lower)
     
     def get_fact_check_suggestions(self, tweet_text: str) -> List[str]:
         """Berikan saran untuk fact-checking"""
@@ -521,4 +521,13 @@ class PDFService:
         elif hoax_prob > 0.5 or bot_prob > 0.5:
             return "Tweet ini memiliki indikator yang perlu diwaspadai. Lakukan verifikasi sebelum mempercayai informasi."
         else:
-            return "Tweet ini tampak normal, namun tetap disarankan untuk melakukan verifikasi informasi dari sumber terpercaya." 
\ No newline at end of file
+            return "Tweet ini tampak normal, namun tetap disarankan untuk melakukan verifikasi informasi dari sumber terpercaya."
+
+_pdf_service = None
+
+def generate_hoax_report(analysis_data: Dict[str, Any], output_path: str = None) -> str:
+    """Generate laporan PDF dari process pool (instance dibuat sekali per proses)"""
+    global _pdf_service
+    if _pdf_service is None:
+        _pdf_service = PDFService()
+    return _pdf_service.generate_hoax_report(analysis_data, output_path)
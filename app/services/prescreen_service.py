@@ -0,0 +1,264 @@
+import os
+import re
+import threading
+import time
+import zlib
+import numpy as np
+from typing import List, Optional, Tuple, Iterable
+
+from app.database import SessionLocal
+from app.models import Tweet, HoaxAnalysis
+
+# Kata kunci yang sering muncul di hoax (juga dipakai analisis fallback)
+HOAX_KEYWORDS = [
+    'breaking', 'urgent', 'viral', 'rahasia', 'tersembunyi', 'konspirasi',
+    'jangan percaya', 'pemerintah menyembunyikan', 'fakta tersembunyi',
+    'akan terjadi', 'prediksi', 'ramalan', 'paranormal', 'chip 5g',
+    'vaksin berbahaya', 'obat ajaib', 'sembuh total', 'tanpa efek samping'
+]
+
+CATEGORY_KEYWORDS = {
+    'health': ['vaksin', 'obat', 'virus', 'covid', 'kesehatan', 'penyakit', 'dokter'],
+    'political': ['pemerintah', 'presiden', 'politik', 'pemilu', 'partai', 'menteri'],
+    'disaster': ['gempa', 'banjir', 'tsunami', 'bencana', 'darurat', 'evakuasi'],
+    'celebrity': ['artis', 'selebriti', 'aktor', 'penyanyi', 'viral'],
+    'financial': ['investasi', 'saham', 'crypto', 'bitcoin', 'uang', 'bisnis'],
+    'conspiracy': ['konspirasi', 'rahasia', 'tersembunyi', 'illuminati', 'freemason']
+}
+
+# Penanda tweet yang menyebut sumber
+SOURCE_MARKERS = ['sumber:', 'menurut data', 'dilansir', 'siaran pers']
+
+# Ukuran ruang fitur hash dan parameter training
+NUM_FEATURES = 2 ** 18
+TRAINING_EPOCHS = 300
+LEARNING_RATE = 0.5
+L2_PENALTY = 1e-4
+MAX_TRAINING_ANALYSES = 5000
+
+
+def classify_category(text_lower: str) -> str:
+    """Klasifikasi kategori berdasarkan konten"""
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        if any(keyword in text_lower for keyword in keywords):
+            return category
+    return 'normal'
+
+
+def find_hoax_keywords(text_lower: str) -> List[str]:
+    """Kata kunci hoax yang muncul di teks"""
+    return [keyword for keyword in HOAX_KEYWORDS if keyword in text_lower]
+
+
+def extract_features(text: str) -> List[str]:
+    """Fitur n-gram kata plus fitur dari logika kata kunci dan bentuk teks"""
+    text = text or ''
+    text_lower = re.sub(r'https?://\S+', ' URL ', text).casefold()
+    tokens = re.findall(r'\w+', text_lower)
+
+    features = [f'w:{token}' for token in tokens]
+    features += [f'b:{first} {second}' for first, second in zip(tokens, tokens[1:])]
+
+    keywords = find_hoax_keywords(text_lower)
+    features += [f'kw:{keyword}' for keyword in keywords]
+    features.append(f'kw_count:{min(len(keywords), 3)}')
+    features.append(f'cat:{classify_category(text_lower)}')
+
+    letters = [char for char in text if char.isalpha()]
+    if letters and sum(char.isupper() for char in letters) / len(letters) > 0.3:
+        features.append('shape:caps')
+    if text.count('!') >= 2:
+        features.append('shape:exclaim')
+    if re.match(r'^\s*[A-Z][A-Z ]{3,}:', text):
+        features.append('shape:alert_prefix')
+    if any(marker in text_lower for marker in SOURCE_MARKERS):
+        features.append('shape:source')
+
+    return features
+
+
+def hash_features(features: Iterable[str]) -> np.ndarray:
+    """Indeks fitur di ruang hash (tanpa duplikat)"""
+    return np.unique(np.fromiter(
+        (zlib.crc32(feature.encode('utf-8')) % NUM_FEATURES for feature in features),
+        dtype=np.int64
+    ))
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+
+class PreScreenClassifier:
+    """Pra-klasifikasi lokal: regresi logistik atas fitur n-gram yang di-hash.
+
+    Dilatih hanya dari verdict LLM yang tersimpan (verdict_source 'llm')
+    lewat perintah train-prescreen; jalur request hanya memuat bobot dari
+    file. Tweet dengan skor di bawah threshold dan tanpa kata kunci hoax
+    dianggap jelas aman sehingga tidak perlu dikirim ke LLM, tetapi hanya
+    jika model dilatih dari minimal min_training_verdicts verdict. File
+    model dicek ulang setiap reload_interval detik.
+    """
+
+    def __init__(self, threshold: float, model_path: str, min_training_verdicts: int, reload_interval: float = 300):
+        self.threshold = threshold
+        self.model_path = model_path
+        self.min_training_verdicts = min_training_verdicts
+        self.reload_interval = reload_interval
+        self.weights: Optional[np.ndarray] = None
+        self.bias = 0.0
+        self.training_size = 0
+        self._loaded_mtime = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def screen(self, text: str) -> Optional[float]:
+        """Skor tweet jika jelas berisiko rendah, None jika harus dieskalasi ke LLM"""
+        if not self.enabled or find_hoax_keywords((text or '').casefold()):
+            return None
+
+        score = self.score(text)
+        return score if score is not None and score < self.threshold else None
+
+    def score(self, text: str) -> Optional[float]:
+        """Probabilitas hoax menurut model lokal, None jika belum ada model yang layak dipakai"""
+        self._maybe_reload()
+        weights, bias = self.weights, self.bias
+        if weights is None:
+            return None
+
+        indices = hash_features(extract_features(text))
+        return float(_sigmoid(bias + weights[indices].sum()))
+
+    def retrain(self):
+        """Latih ulang dari data terbaru dan simpan model (perintah train-prescreen)"""
+        with self._lock:
+            examples = self.training_examples()
+            weights, bias = self.train(examples)
+            self.training_size = len(examples)
+            self._save(weights, bias)
+            self._use(weights, bias)
+
+    def _maybe_reload(self):
+        """Muat ulang model jika file berubah; file yang tidak ada dicek lagi setelah reload_interval"""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.reload_interval:
+            return
+
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.reload_interval:
+                return
+            self._checked_at = now
+
+            try:
+                mtime = os.path.getmtime(self.model_path) if self.model_path else None
+            except OSError:
+                mtime = None
+
+            if mtime is None:
+                self.weights = None
+                self.training_size = 0
+                self._loaded_mtime = None
+            elif mtime != self._loaded_mtime:
+                self._load(mtime)
+
+    def _load(self, mtime: float):
+        try:
+            with np.load(self.model_path) as data:
+                weights = data['weights']
+                bias = float(data['bias'])
+                self.training_size = int(data['training_size']) if 'training_size' in data else 0
+        except Exception as e:
+            # mtime tidak dicatat supaya file yang sama dicoba lagi pada pengecekan berikutnya
+            print(f"Error loading pre-screen model: {e}")
+            self.weights = None
+            self._loaded_mtime = None
+            return
+
+        self._loaded_mtime = mtime
+        self._use(weights, bias)
+
+    def _use(self, weights: np.ndarray, bias: float):
+        # Model yang dilatih dari terlalu sedikit verdict LLM tidak boleh melewati OpenAI
+        if self.training_size < self.min_training_verdicts:
+            self.weights = None
+            return
+        self.bias = bias
+        self.weights = weights
+
+    def _save(self, weights: np.ndarray, bias: float):
+        if self.model_path:
+            try:
+                os.makedirs(os.path.dirname(self.model_path) or '.', exist_ok=True)
+                temp_path = f"{self.model_path}.tmp.npz"
+                np.savez_compressed(
+                    temp_path,
+                    weights=weights,
+                    bias=np.array(bias),
+                    training_size=np.array(self.training_size)
+                )
+                os.replace(temp_path, self.model_path)
+            except Exception as e:
+                print(f"Error saving pre-screen model: {e}")
+
+    def training_examples(self) -> List[Tuple[str, float]]:
+        """Verdict LLM yang tersimpan di database (tanpa fallback, pra-klasifikasi, atau near-duplicate)"""
+        examples = []
+
+        db = SessionLocal()
+        try:
+            query = db.query(Tweet.text, HoaxAnalysis.hoax_probability).join(
+                Tweet, Tweet.tweet_id == HoaxAnalysis.tweet_id
+            ).filter(
+                HoaxAnalysis.hoax_probability != None,
+                HoaxAnalysis.verdict_source == 'llm'
+            )
+
+            rows = query.order_by(HoaxAnalysis.id.desc()).limit(MAX_TRAINING_ANALYSES).all()
+            examples += [(text, min(max(float(probability), 0.0), 1.0)) for text, probability in rows if text]
+        except Exception as e:
+            print(f"Error loading pre-screen training data: {e}")
+        finally:
+            db.close()
+
+        return examples
+
+    def train(self, examples: List[Tuple[str, float]]) -> Tuple[np.ndarray, float]:
+        """Gradient descent batch untuk regresi logistik dengan bobot kelas seimbang"""
+        if not examples:
+            return np.zeros(NUM_FEATURES), 0.0
+
+        rows, columns = [], []
+        for row, (text, _) in enumerate(examples):
+            indices = hash_features(extract_features(text))
+            rows.append(np.full(len(indices), row, dtype=np.int64))
+            columns.append(indices)
+
+        rows = np.concatenate(rows)
+        columns = np.concatenate(columns)
+        labels = np.array([label for _, label in examples])
+        count = len(examples)
+
+        # Seimbangkan kontribusi contoh positif dan negatif
+        positive = labels.sum()
+        negative = count - positive
+        sample_weights = np.where(
+            labels >= 0.5,
+            count / (2 * positive) if positive else 1.0,
+            count / (2 * negative) if negative else 1.0
+        )
+
+        weights = np.zeros(NUM_FEATURES)
+        bias = 0.0
+        for _ in range(TRAINING_EPOCHS):
+            logits = bias + np.bincount(rows, weights=weights[columns], minlength=count)
+            errors = (_sigmoid(logits) - labels) * sample_weights
+            gradient = np.bincount(columns, weights=errors[rows], minlength=NUM_FEATURES) / count
+            weights -= LEARNING_RATE * (gradient + L2_PENALTY * weights)
+            bias -= LEARNING_RATE * errors.mean()
+
+        return weights, float(bias)
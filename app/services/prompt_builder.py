@@ -0,0 +1,180 @@
+import threading
+import tiktoken
+from typing import Dict, Any, List
+
+# Versi template prompt; naikkan jika isi prompt atau format jawaban berubah
+# (ikut menjadi bagian kunci cache respons LLM)
+TEMPLATE_VERSION = "2"
+
+CRITERIA = """KRITERIA ANALISIS:
+1. Klaim yang tidak didukung bukti
+2. Bahasa sensasional atau clickbait
+3. Informasi medis/kesehatan tanpa sumber
+4. Klaim politik yang tidak terverifikasi
+5. Informasi bencana atau darurat yang tidak resmi
+6. Konspirasi atau teori tidak berdasar
+7. Informasi keuangan/ekonomi yang mencurigakan"""
+
+RESULT_FIELDS = """"hoax_probability": [0.0-1.0],
+"is_hoax": [true/false],
+"confidence_level": ["rendah"/"sedang"/"tinggi"],
+"analysis_summary": "ringkasan analisis dalam bahasa Indonesia",
+"red_flags": ["daftar", "tanda", "bahaya"],
+"reasons": ["alasan 1", "alasan 2", "dst"],
+"category": "kategori hoax (political/health/disaster/celebrity/financial/conspiracy/normal)",
+"recommendations": ["saran untuk pembaca"]"""
+
+TRUNCATION_MARKER = "…"
+
+
+def compact_whitespace(text: str) -> str:
+    """Gabungkan spasi, tab, dan baris baru berurutan menjadi satu spasi"""
+    return ' '.join((text or '').split())
+
+
+class TokenCounter:
+    """Penghitung token tiktoken untuk satu model.
+
+    Jika encoding tidak bisa dimuat (mis. offline), jumlah token diestimasi
+    dari panjang teks (sekitar 4 karakter per token).
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self._encoding = None
+        self._encoding_loaded = False
+        self._lock = threading.Lock()
+
+    def count(self, text: str) -> int:
+        """Jumlah token teks"""
+        encoding = self._get_encoding()
+        if encoding:
+            return len(encoding.encode(text or ''))
+        return len(text or '') // 4 + 1
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Potong teks menjadi paling banyak max_tokens token"""
+        text = text or ''
+        if max_tokens <= 0:
+            return ''
+        if self.count(text) <= max_tokens:
+            return text
+
+        encoding = self._get_encoding()
+        if encoding:
+            truncated = encoding.decode(encoding.encode(text)[:max_tokens - 1])
+        else:
+            truncated = text[:(max_tokens - 1) * 4]
+        return truncated.rstrip() + TRUNCATION_MARKER
+
+    def _get_encoding(self):
+        """Encoder tiktoken untuk model, None jika tidak tersedia (mis. offline)"""
+        if not self._encoding_loaded:
+            with self._lock:
+                if not self._encoding_loaded:
+                    try:
+                        try:
+                            self._encoding = tiktoken.encoding_for_model(self.model)
+                        except KeyError:
+                            self._encoding = tiktoken.get_encoding('cl100k_base')
+                    except Exception as e:
+                        print(f"tiktoken tidak tersedia, estimasi token dari panjang teks: {e}")
+                        self._encoding = None
+                    self._encoding_loaded = True
+        return self._encoding
+
+
+class PromptBuilder:
+    """Penyusun prompt analisis hoax dengan anggaran token.
+
+    Template ditulis tanpa indentasi, whitespace field dirapatkan, dan
+    field panjang (teks tweet, bio, nama) dipotong ke anggaran token
+    masing-masing. Jika prompt masih melebihi max_prompt_tokens, bio lalu
+    teks tweet dipangkas lebih jauh.
+    """
+
+    def __init__(self, token_counter: TokenCounter, max_prompt_tokens: int,
+                 max_text_tokens: int, max_bio_tokens: int, max_name_tokens: int = 16):
+        self.token_counter = token_counter
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_text_tokens = max_text_tokens
+        self.max_bio_tokens = max_bio_tokens
+        self.max_name_tokens = max_name_tokens
+
+    @property
+    def template_version(self) -> str:
+        return TEMPLATE_VERSION
+
+    def count_tokens(self, text: str) -> int:
+        return self.token_counter.count(text)
+
+    def build_single(self, tweet_text: str, user_data: Dict[str, Any]) -> str:
+        """Prompt analisis satu tweet"""
+        text = compact_whitespace(tweet_text)
+        bio = compact_whitespace(user_data.get('bio') or 'tidak ada')
+
+        text_budget, bio_budget = self.max_text_tokens, self.max_bio_tokens
+        while True:
+            prompt = self._render_single(
+                self.token_counter.truncate(text, text_budget),
+                self.token_counter.truncate(bio, bio_budget),
+                user_data
+            )
+            overflow = self.count_tokens(prompt) - self.max_prompt_tokens
+            if overflow <= 0 or (bio_budget <= 0 and text_budget <= 1):
+                return prompt
+
+            # Bio dikorbankan lebih dulu karena paling sedikit pengaruhnya ke verdict
+            if bio_budget > 0:
+                bio_budget = max(0, bio_budget - overflow)
+            else:
+                text_budget = max(1, text_budget - overflow)
+
+    def build_batch(self, tweets: List[Dict[str, Any]]) -> str:
+        """Prompt analisis beberapa tweet sekaligus (bio tidak disertakan)"""
+        blocks = []
+        for tweet in tweets:
+            user_data = tweet.get('user') or {}
+            text = self.token_counter.truncate(compact_whitespace(tweet['text']), self.max_text_tokens)
+            blocks.append(
+                f"[ID: {tweet['id']}]\n"
+                f"TWEET: \"{text}\"\n"
+                f"PENGGUNA: {self._user_line(user_data)}"
+            )
+        tweets_text = "\n\n".join(blocks)
+
+        return (
+            "Analisis setiap tweet berikut secara terpisah untuk mendeteksi apakah berpotensi hoax atau misinformasi:\n\n"
+            f"{tweets_text}\n\n"
+            f"{CRITERIA}\n\n"
+            "BERIKAN ANALISIS DALAM FORMAT JSON, SATU OBJEK PER TWEET DENGAN ID YANG SAMA:\n"
+            '{"results": [{"id": "ID tweet",\n'
+            f"{RESULT_FIELDS}}}]}}\n\n"
+            "Berikan respons dalam format JSON yang valid."
+        )
+
+    def _render_single(self, text: str, bio: str, user_data: Dict[str, Any]) -> str:
+        display_name = self.token_counter.truncate(
+            compact_whitespace(user_data.get('display_name') or 'unknown'), self.max_name_tokens
+        )
+        return (
+            "Analisis tweet berikut untuk mendeteksi apakah berpotensi hoax atau misinformasi:\n\n"
+            f"TWEET: \"{text}\"\n\n"
+            "INFORMASI PENGGUNA:\n"
+            f"- Display Name: {display_name}\n"
+            + (f"- Bio: {bio}\n" if bio else "")
+            + f"- {self._user_line(user_data)}\n\n"
+            f"{CRITERIA}\n\n"
+            "BERIKAN ANALISIS DALAM FORMAT JSON:\n"
+            f"{{{RESULT_FIELDS}}}\n\n"
+            "Berikan respons dalam format JSON yang valid."
+        )
+
+    def _user_line(self, user_data: Dict[str, Any]) -> str:
+        return (
+            f"@{user_data.get('username', 'unknown')} | "
+            f"Followers: {user_data.get('followers_count', 0):,} | "
+            f"Following: {user_data.get('following_count', 0):,} | "
+            f"Total Tweet: {user_data.get('tweet_count', 0):,} | "
+            f"Verified: {'Ya' if user_data.get('verified', False) else 'Tidak'}"
+        )
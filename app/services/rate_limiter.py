@@ -0,0 +1,173 @@
+import asyncio
+import re
+import threading
+import time
+import weakref
+from typing import Dict, Any, List, Optional
+
+from app.services.prompt_builder import TokenCounter
+
+
+class TokenBucket:
+    """Token bucket thread-safe yang terisi ulang linear sampai kapasitas per menit.
+
+    reserve() langsung memotong saldo (boleh negatif) dan mengembalikan lama
+    tunggu, sehingga bisa dipakai dari kode sync maupun async tanpa terikat
+    ke satu event loop.
+    """
+
+    def __init__(self, capacity_per_minute: float, burst: Optional[float] = None):
+        self.capacity = float(capacity_per_minute)
+        self.rate = self.capacity / 60.0
+        # Saldo maksimum; default satu menit penuh, lebih kecil untuk limit per detik
+        self.burst = float(burst) if burst else None
+        self.tokens = self._max_tokens()
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _max_tokens(self) -> float:
+        return min(self.capacity, self.burst) if self.burst else self.capacity
+
+    def _refill(self, now: float):
+        self.tokens = min(self._max_tokens(), self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, amount: float) -> float:
+        """Potong saldo sebanyak amount; kembalikan detik yang harus ditunggu"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= amount
+            if self.tokens >= 0 or self.rate <= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def refund(self, amount: float):
+        """Kembalikan saldo yang tidak terpakai (estimasi lebih besar dari pemakaian)"""
+        with self._lock:
+            self.tokens = min(self._max_tokens(), self.tokens + amount)
+
+    def sync_remaining(self, remaining: float):
+        """Samakan saldo dengan sisa kuota yang dilaporkan server (tidak pernah menambah)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, remaining)
+
+    def set_capacity(self, capacity_per_minute: float):
+        """Ganti kapasitas sesuai limit dari header respons"""
+        with self._lock:
+            if capacity_per_minute > 0 and capacity_per_minute != self.capacity:
+                self.capacity = float(capacity_per_minute)
+                self.rate = self.capacity / 60.0
+                self.tokens = min(self.tokens, self._max_tokens())
+
+
+def parse_reset_duration(value: str) -> Optional[float]:
+    """Ubah durasi header x-ratelimit-reset-* (mis. "1s", "6m0s", "20ms") menjadi detik"""
+    if not value:
+        return None
+
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    units = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+    parts = re.findall(r'([\d.]+)(ms|h|m|s)', value)
+    if not parts:
+        return None
+    return sum(float(number) * units[unit] for number, unit in parts)
+
+
+class OpenAIRateLimiter:
+    """Pembatas request dan token per menit untuk OpenAI.
+
+    Setiap request memesan estimasi token (prompt dihitung dengan tiktoken
+    ditambah max_tokens) sebelum dikirim. Header x-ratelimit-* dari respons
+    menyamakan saldo dan limit dengan kondisi server, dan 429 menahan semua
+    request sampai waktu retry-after lewat. Limit berlaku per proses.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_concurrency: int, token_counter: TokenCounter):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max(1, max_concurrency)
+        self.token_counter = token_counter
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._thread_semaphore = threading.BoundedSemaphore(self.max_concurrency)
+
+    def estimate_tokens(self, messages: List[Dict[str, str]], max_tokens: int) -> int:
+        """Estimasi token sebuah request: prompt + overhead per pesan + max_tokens"""
+        return self.count_prompt_tokens(messages) + max_tokens
+
+    def count_prompt_tokens(self, messages: List[Dict[str, str]]) -> int:
+        """Token prompt chat: isi pesan + overhead format per pesan"""
+        return 3 + sum(4 + self.token_counter.count(message.get('content', '')) for message in messages)
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        """Pesan satu request dan estimasi token; kembalikan lama tunggu"""
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+        return max(wait, self.paused_until - time.monotonic())
+
+    async def acquire(self, estimated_tokens: int):
+        """Tunggu (async) sampai kuota request dan token tersedia"""
+        wait = self._reserve(estimated_tokens)
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self.paused_until - time.monotonic()
+
+    def acquire_blocking(self, estimated_tokens: int):
+        """Versi blocking dari acquire untuk pemanggilan dari thread"""
+        wait = self._reserve(estimated_tokens)
+        while wait > 0:
+            time.sleep(wait)
+            wait = self.paused_until - time.monotonic()
+
+    def concurrency(self) -> asyncio.Semaphore:
+        """Semaphore pembatas request paralel untuk event loop yang sedang berjalan"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    def thread_concurrency(self) -> threading.BoundedSemaphore:
+        """Semaphore pembatas request paralel untuk pemanggilan dari thread"""
+        return self._thread_semaphore
+
+    def record_usage(self, estimated_tokens: int, used_tokens: Optional[int]):
+        """Kembalikan selisih estimasi dengan pemakaian token sebenarnya"""
+        if used_tokens is not None and used_tokens < estimated_tokens:
+            self.tokens.refund(estimated_tokens - used_tokens)
+
+    def update_from_headers(self, headers: Any):
+        """Sesuaikan bucket dengan header x-ratelimit-* dari respons OpenAI"""
+        if not headers:
+            return
+
+        for bucket, kind in ((self.requests, 'requests'), (self.tokens, 'tokens')):
+            limit = headers.get(f'x-ratelimit-limit-{kind}')
+            remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+            try:
+                if limit is not None:
+                    bucket.set_capacity(float(limit))
+                if remaining is not None:
+                    bucket.sync_remaining(float(remaining))
+            except ValueError:
+                continue
+
+    def pause(self, headers: Any = None, default_seconds: float = 1.0):
+        """Tahan semua request setelah 429 sampai retry-after atau reset berikutnya"""
+        seconds = None
+        if headers:
+            retry_after_ms = headers.get('retry-after-ms')
+            seconds = float(retry_after_ms) / 1000 if retry_after_ms else parse_reset_duration(headers.get('retry-after'))
+            seconds = seconds or parse_reset_duration(headers.get('x-ratelimit-reset-tokens'))
+        seconds = seconds or default_seconds
+
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        return seconds
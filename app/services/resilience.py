@@ -0,0 +1,230 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Callable, Awaitable, Tuple, Type, TypeVar
+
+T = TypeVar('T')
+
+# Semua circuit breaker yang dibuat, untuk endpoint health
+_breakers: Dict[str, "CircuitBreaker"] = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """Dependency sedang dianggap tidak sehat; panggilan langsung ditolak"""
+
+
+class CircuitBreaker:
+    """Circuit breaker per dependency (closed -> open -> half_open).
+
+    Setelah failure_threshold kegagalan berturut-turut, semua panggilan
+    ditolak selama reset_timeout detik. Sesudahnya satu panggilan percobaan
+    diizinkan; sukses menutup circuit, gagal membukanya lagi.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+        with _breakers_lock:
+            _breakers[name] = self
+
+    def allow(self) -> bool:
+        """Boleh memanggil dependency sekarang?"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self._probe_in_flight = False
+
+            if self.state == 'half_open' and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def release(self):
+        """Lepas slot percobaan half-open tanpa mencatat sukses atau gagal"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    print(f"Circuit '{self.name}' terbuka setelah {self.failures} kegagalan")
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)) if self.state == 'open' else 0.0
+            return {'state': self.state, 'consecutive_failures': self.failures, 'retry_in_seconds': round(retry_in, 1)}
+
+
+def get_breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Status semua circuit breaker"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+class ResiliencePolicy:
+    """Timeout, retry dengan exponential backoff, circuit breaker, dan hedging.
+
+    Hanya exception di retry_on (plus timeout) yang diulang, dan circuit
+    breaker mencatat satu kegagalan per panggilan setelah semua percobaan
+    habis. Exception lain (mis. request tidak valid) dilempar tanpa
+    dihitung sebagai kegagalan dependency. Jika hedge_delay > 0, percobaan kedua
+    dijalankan paralel saat percobaan pertama belum selesai setelah
+    hedge_delay detik, dan hasil yang lebih dulu selesai dipakai.
+    """
+
+    def __init__(self, name: str, timeout: float, retries: int, backoff_base: float, backoff_max: float,
+                 failure_threshold: int, reset_timeout: float, hedge_delay: float = 0.0,
+                 retry_on: Tuple[Type[BaseException], ...] = (Exception,)):
+        self.name = name
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_delay = hedge_delay
+        self.retry_on = tuple(retry_on) + (TimeoutError, asyncio.TimeoutError)
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self._hedge_executor = None
+        self._hedge_lock = threading.Lock()
+
+    def backoff(self, attempt: int) -> float:
+        """Lama tunggu sebelum percobaan ulang ke-attempt (full jitter)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def call(self, func: Callable[[], T]) -> T:
+        """Panggil func (blocking) dengan retry, breaker, dan hedging.
+
+        func harus memakai self.timeout untuk request-nya sendiri.
+        """
+        return self._with_retries(lambda: self._hedged(func), time.sleep)
+
+    async def timed(self, awaitable: Awaitable[T]) -> T:
+        """Tunggu awaitable paling lama self.timeout detik"""
+        try:
+            return await asyncio.wait_for(awaitable, self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"{self.name} tidak merespons dalam {self.timeout} detik")
+
+    async def call_async(self, func: Callable[[], Awaitable[T]]) -> T:
+        """Versi async dari call; func membungkus request-nya dengan timed()"""
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} sedang tidak tersedia")
+
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    result = await self._hedged_async(func)
+                except self.retry_on:
+                    if attempt == self.retries:
+                        raise
+                    await asyncio.sleep(self.backoff(attempt))
+                    continue
+
+                self.breaker.record_success()
+                return result
+        except self.retry_on:
+            # Satu kegagalan per panggilan, setelah semua percobaan habis
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+
+    def _with_retries(self, attempt_func: Callable[[], T], sleep: Callable[[float], None]) -> T:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} sedang tidak tersedia")
+
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    result = attempt_func()
+                except self.retry_on:
+                    if attempt == self.retries:
+                        raise
+                    sleep(self.backoff(attempt))
+                    continue
+
+                self.breaker.record_success()
+                return result
+        except self.retry_on:
+            # Satu kegagalan per panggilan, setelah semua percobaan habis
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+
+    def _hedged(self, func: Callable[[], T]) -> T:
+        if self.hedge_delay <= 0:
+            return func()
+
+        executor = self._get_hedge_executor()
+        futures = [executor.submit(func)]
+        done, _ = wait(futures, timeout=self.hedge_delay)
+        if not done:
+            futures.append(executor.submit(func))
+
+        # Ambil hasil sukses pertama; exception hanya dilempar jika semua percobaan gagal
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def _hedged_async(self, func: Callable[[], Awaitable[T]]) -> T:
+        if self.hedge_delay <= 0:
+            return await func()
+
+        tasks = [asyncio.ensure_future(func())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay)
+            if not done:
+                tasks.append(asyncio.ensure_future(func()))
+
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        if self._hedge_executor is None:
+            with self._hedge_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix=f"hedge-{self.name}")
+        return self._hedge_executor
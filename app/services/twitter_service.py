@@ -2,9 +2,15 @@ import tweepy
 import re
 import random
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from app.config import config
 
+# Field profil yang diminta dari API (dipakai deteksi bot)
+USER_FIELDS = ['username', 'name', 'description', 'public_metrics', 'verified', 'created_at', 'profile_image_url']
+
+# Batas ID per request users lookup Twitter API v2
+USER_LOOKUP_BATCH_SIZE = 100
+
 class TwitterService:
     """Service untuk mengekstrak data dari Twitter"""
     
@@ -61,7 +67,7 @@ class TwitterService:
             tweet = self.client.get_tweet(
                 tweet_id,
                 tweet_fields=['created_at', 'public_metrics', 'author_id', 'conversation_id'],
-                user_fields=['username', 'name', 'description', 'public_metrics', 'verified', 'created_at', 'profile_image_url'],
+                user_fields=USER_FIELDS,
                 expansions=['author_id']
             )
             
@@ -80,23 +86,27 @@ class TwitterService:
                 'like_count': tweet_data.public_metrics.get('like_count', 0),
                 'reply_count': tweet_data.public_metrics.get('reply_count', 0),
                 'quote_count': tweet_data.public_metrics.get('quote_count', 0),
-                'user': {
-                    'user_id': user_data.id if user_data else None,
-                    'username': user_data.username if user_data else None,
-                    'display_name': user_data.name if user_data else None,
-                    'bio': user_data.description if user_data else None,
-                    'followers_count': user_data.public_metrics.get('followers_count', 0) if user_data else 0,
-                    'following_count': user_data.public_metrics.get('following_count', 0) if user_data else 0,
-                    'tweet_count': user_data.public_metrics.get('tweet_count', 0) if user_data else 0,
-                    'verified': user_data.verified if user_data else False,
-                    'profile_image_url': user_data.profile_image_url if user_data else None,
-                    'account_creation_date': user_data.created_at if user_data else None
-                }
+                'user': self._user_to_dict(user_data)
             }
         except Exception as e:
             print(f"Error fetching real tweet data: {e}")
             raise
     
+    def _user_to_dict(self, user_data) -> Dict[str, Any]:
+        """Ubah objek User tweepy menjadi dict profil"""
+        return {
+            'user_id': user_data.id if user_data else None,
+            'username': user_data.username if user_data else None,
+            'display_name': user_data.name if user_data else None,
+            'bio': user_data.description if user_data else None,
+            'followers_count': user_data.public_metrics.get('followers_count', 0) if user_data else 0,
+            'following_count': user_data.public_metrics.get('following_count', 0) if user_data else 0,
+            'tweet_count': user_data.public_metrics.get('tweet_count', 0) if user_data else 0,
+            'verified': user_data.verified if user_data else False,
+            'profile_image_url': user_data.profile_image_url if user_data else None,
+            'account_creation_date': user_data.created_at if user_data else None
+        }
+    
     def _get_dummy_tweet_data(self, tweet_id: str, tweet_url: str) -> Dict[str, Any]:
         """Generate dummy tweet data yang realistis"""
         
@@ -535,6 +545,65 @@ class TwitterService:
         else:
             return self._get_dummy_network_data(tweet_id)
     
+    def get_user_profiles(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Ambil profil banyak pengguna sekaligus, per user_id (untuk deteksi bot peserta jaringan)"""
+        if self.use_real_api:
+            return self._get_real_user_profiles(user_ids)
+        else:
+            return self._get_dummy_user_profiles(user_ids)
+    
+    def _get_real_user_profiles(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Ambil profil dari API asli dengan users lookup, 100 ID per request"""
+        profiles = {}
+        for start in range(0, len(user_ids), USER_LOOKUP_BATCH_SIZE):
+            chunk = user_ids[start:start + USER_LOOKUP_BATCH_SIZE]
+            try:
+                response = self.client.get_users(ids=chunk, user_fields=USER_FIELDS)
+            except Exception as e:
+                print(f"Error fetching user profiles: {e}")
+                continue
+            
+            for user in response.data or []:
+                profile = self._user_to_dict(user)
+                profile['user_id'] = str(user.id)
+                profiles[profile['user_id']] = profile
+        return profiles
+    
+    def _get_dummy_user_profiles(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Generate profil dummy yang sama untuk user_id yang sama (sebagian mirip bot)"""
+        # Tanggal acuan harian agar profil stabil dan skor bot tersimpan bisa dipakai ulang
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        profiles = {}
+        for user_id in user_ids:
+            rng = random.Random(user_id)
+            if rng.random() < 0.3:
+                profile = {
+                    'username': f"{rng.choice(['info', 'news', 'user', 'akun'])}{rng.randint(10000, 9999999)}",
+                    'display_name': rng.choice(['', 'Info Update', 'News Official']),
+                    'bio': rng.choice(['', 'auto post', 'promo']),
+                    'followers_count': rng.randint(0, 50),
+                    'following_count': rng.randint(1000, 20000),
+                    'tweet_count': rng.randint(500, 50000),
+                    'verified': False,
+                    'profile_image_url': None,
+                    'account_creation_date': today - timedelta(days=rng.randint(1, 90))
+                }
+            else:
+                profile = {
+                    'username': f"{rng.choice(['budi', 'siti', 'andi', 'dewi', 'rina', 'agus'])}_{rng.choice(['santoso', 'lestari', 'pratama', 'wijaya'])}",
+                    'display_name': rng.choice(['Budi Santoso', 'Siti Lestari', 'Andi Pratama', 'Dewi Wijaya']),
+                    'bio': rng.choice(['Guru, suka membaca dan bersepeda', 'Mahasiswa teknik di Bandung', 'Ibu rumah tangga, pecinta kuliner']),
+                    'followers_count': rng.randint(100, 5000),
+                    'following_count': rng.randint(100, 1000),
+                    'tweet_count': rng.randint(200, 20000),
+                    'verified': rng.random() < 0.05,
+                    'profile_image_url': f"https://pbs.twimg.com/profile_images/{rng.randint(1000000000, 9999999999)}/image.jpg",
+                    'account_creation_date': today - timedelta(days=rng.randint(400, 4000))
+                }
+            profile['user_id'] = user_id
+            profiles[user_id] = profile
+        return profiles
+    
     def _get_real_network_data(self, tweet_id: str) -> Dict[str, Any]:
         """Ambil data jaringan dari API asli"""
         # Implementasi untuk API asli
@@ -1,6 +1,8 @@
 import logging
 import asyncio
+import json
 import os
+import httpx
 import requests
 from datetime import datetime
 from typing import Dict, Any
@@ -17,6 +19,7 @@ from app.services.brave_search_service import BraveSearchService
 from app.services.bot_detection_service import BotDetectionService
 from app.services.network_analysis_service import NetworkAnalysisService
 from app.services.pdf_service import PDFService
+from app.executors import run_io
 from app.config import config
 
 # Setup logging
@@ -37,6 +40,10 @@ pdf_service = PDFService()
 class TelegramBot:
     """Telegram Bot untuk Twitter Hoax Detector"""
     
+    # Detik tanpa event sebelum dianggap timeout; minimal satu masa lease agar job sehat
+    # yang tahapnya lama (atau diambil alih worker lain) tidak dianggap macet
+    PROGRESS_TIMEOUT = max(180, config.JOB_VISIBILITY_TIMEOUT + config.STREAM_KEEPALIVE_INTERVAL)
+    
     def __init__(self, token: str):
         self.token = token
         self.application = Application.builder().token(token).build()
@@ -367,7 +374,8 @@ Atau langsung kirim URL tweet ke chat ini!
         
         try:
             # Panggil API untuk memulai analisis
-            response = requests.post(
+            response = await run_io(
+                requests.post,
                 f"{self.get_api_base_url()}/api/analyze",
                 data={"tweet_url": tweet_url},
                 timeout=30
@@ -404,51 +412,53 @@ Atau langsung kirim URL tweet ke chat ini!
             )
     
     async def track_analysis_progress(self, message, session_id: str, user_id: int):
-        """Track progress analisis"""
+        """Track progress analisis lewat stream SSE (tanpa polling status)"""
         
-        max_attempts = 60  # 2 menit maksimal
-        attempt = 0
+        last_progress = None
         
-        while attempt < max_attempts:
-            try:
-                response = requests.get(
-                    f"{self.get_api_base_url()}/api/status/{session_id}",
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    status_data = response.json()
-                    progress = status_data.get('progress', 0)
-                    status = status_data.get('status', 'processing')
+        try:
+            async with httpx.AsyncClient(timeout=httpx.Timeout(10.0, read=None)) as client:
+                async with client.stream("GET", f"{self.get_api_base_url()}/api/stream/{session_id}") as response:
+                    response.raise_for_status()
                     
-                    # Update progress message
-                    progress_text = self.get_progress_text(progress)
-                    await message.edit_text(
-                        f"🔍 **Analisis Tweet**\n\n"
-                        f"📊 Progress: {progress}%\n"
-                        f"⏳ Status: {progress_text}\n\n"
-                        f"{'🔄 Sedang memproses...' if status == 'processing' else '✅ Selesai!' if status == 'completed' else '❌ Gagal!'}"
-                    )
+                    async def read_events():
+                        async for line in response.aiter_lines():
+                            if line.startswith("data:"):
+                                yield json.loads(line[5:].strip())
                     
-                    if status == 'completed':
-                        await self.send_analysis_result(message, session_id, user_id)
-                        return
-                    elif status == 'failed':
-                        await message.edit_text(
-                            "❌ **Analisis Gagal**\n\n"
-                            "Terjadi kesalahan saat memproses tweet."
-                        )
-                        return
-                
-                await asyncio.sleep(3)
-                attempt += 1
-                
-            except Exception as e:
-                logger.error(f"Error tracking progress: {e}")
-                await asyncio.sleep(5)
-                attempt += 1
+                    events = read_events()
+                    while True:
+                        event = await asyncio.wait_for(events.__anext__(), timeout=self.PROGRESS_TIMEOUT)
+                        progress = event.get('progress', 0)
+                        status = event.get('status', 'processing')
+                        
+                        if status == 'completed':
+                            await self.send_analysis_result(message, session_id, user_id)
+                            return
+                        elif status == 'failed':
+                            await message.edit_text(
+                                "❌ **Analisis Gagal**\n\n"
+                                "Terjadi kesalahan saat memproses tweet."
+                            )
+                            return
+                        
+                        # Edit pesan hanya jika progress berubah (batas rate Telegram)
+                        if progress != last_progress:
+                            last_progress = progress
+                            progress_text = self.get_progress_text(progress)
+                            await message.edit_text(
+                                f"🔍 **Analisis Tweet**\n\n"
+                                f"📊 Progress: {progress}%\n"
+                                f"⏳ Status: {progress_text}\n\n"
+                                f"🔄 Sedang memproses..."
+                            )
+        
+        except (asyncio.TimeoutError, StopAsyncIteration):
+            pass
+        except Exception as e:
+            logger.error(f"Error tracking progress: {e}")
         
-        # Timeout
+        # Timeout atau stream terputus
         await message.edit_text(
             "⏰ **Timeout**\n\n"
             "Analisis memakan waktu terlalu lama. Gunakan /status untuk cek status terbaru."
@@ -473,7 +483,8 @@ Atau langsung kirim URL tweet ke chat ini!
         """Kirim hasil analisis"""
         
         try:
-            response = requests.get(
+            response = await run_io(
+                requests.get,
                 f"{self.get_api_base_url()}/api/result/{session_id}",
                 timeout=30
             )
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import socket
+import uuid
+from typing import Set
+
+from app.executors import run_io, shutdown_executors
+from app.analysis import run_full_analysis, close_service_clients
+from app.progress import progress_tracker
+from app import job_queue
+from app.config import config
+
+
+class AnalysisWorker:
+    """Worker yang mengambil job analisis dari antrian database"""
+
+    def __init__(self, concurrency: int = None, worker_id: str = None):
+        self.concurrency = concurrency or config.WORKER_CONCURRENCY
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.running = False
+        self.active_jobs: Set[asyncio.Task] = set()
+
+    async def run(self):
+        """Loop utama: klaim job selama masih ada slot kosong"""
+        self.running = True
+        print(f"Worker {self.worker_id} started (concurrency={self.concurrency})")
+
+        try:
+            while self.running:
+                if len(self.active_jobs) >= self.concurrency:
+                    await asyncio.wait(self.active_jobs, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+
+                try:
+                    job = await run_io(job_queue.claim_next, self.worker_id)
+                except Exception as e:
+                    # Error sementara (mis. database is locked) tidak boleh menghentikan worker
+                    print(f"Error claiming job in worker {self.worker_id}: {e}")
+                    await asyncio.sleep(config.JOB_POLL_INTERVAL)
+                    continue
+
+                if not job:
+                    await asyncio.sleep(config.JOB_POLL_INTERVAL)
+                    continue
+
+                task = asyncio.create_task(self.process_job(*job))
+                self.active_jobs.add(task)
+                task.add_done_callback(self.active_jobs.discard)
+        finally:
+            if self.active_jobs:
+                await asyncio.gather(*self.active_jobs, return_exceptions=True)
+            await close_service_clients()
+
+    def stop(self):
+        """Hentikan loop setelah job yang sedang berjalan selesai"""
+        self.running = False
+
+    async def process_job(self, session_id: str, tweet_url: str):
+        """Jalankan satu job dengan heartbeat lease; job dibatalkan jika lease hilang"""
+        analysis = asyncio.create_task(run_full_analysis(session_id, tweet_url, self.worker_id))
+        heartbeat = asyncio.create_task(self._heartbeat(session_id, analysis))
+
+        try:
+            await analysis
+        except job_queue.LeaseLostError as e:
+            # Worker lain sudah memegang job ini; jangan ubah status atau progress-nya di database,
+            # cukup lepas entry di memori agar subscriber beralih ke status database
+            print(f"Analysis {session_id} not saved: {e}")
+            progress_tracker.finish(session_id, 'pending')
+        except asyncio.CancelledError:
+            progress_tracker.finish(session_id, 'pending')
+            if not heartbeat.done():
+                raise
+            print(f"Analysis {session_id} cancelled: lease lost")
+        except Exception as e:
+            print(f"Error in analysis {session_id}: {e}")
+            # ValueError berarti input tidak valid (mis. URL salah), percuma diulang
+            retryable = not isinstance(e, ValueError)
+            status = await run_io(job_queue.fail, session_id, self.worker_id, str(e), retryable)
+            progress_tracker.finish(session_id, status or 'failed', str(e))
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, session_id: str, analysis: asyncio.Task):
+        """Perpanjang lease secara berkala selama job berjalan; batalkan job jika lease hilang"""
+        interval = max(config.JOB_VISIBILITY_TIMEOUT / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                progress = progress_tracker.get(session_id)
+                extended = await run_io(job_queue.extend_lease, session_id, self.worker_id, progress)
+            except Exception as e:
+                print(f"Error extending lease for {session_id}: {e}")
+                continue
+
+            if not extended:
+                analysis.cancel()
+                return
+
+def main():
+    """Entry point untuk proses worker terpisah"""
+    worker = AnalysisWorker()
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_executors()
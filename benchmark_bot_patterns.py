@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark regex pola bot: pola terpisah per panggilan vs BotPatternMatcher
+"""
+
+import argparse
+import random
+import re
+import string
+import time
+
+from app.services.bot_detection_service import BotPatternMatcher, SUSPICIOUS_USERNAME_PATTERNS
+
+# Regex URL lama dari _analyze_bio_pattern, hanya sebagai pembanding
+LEGACY_URL_PATTERN = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
+LEGACY_USERNAME_PATTERNS = [f'^{pattern}$' for pattern in SUSPICIOUS_USERNAME_PATTERNS.values()]
+
+
+def generate_usernames(count: int, seed: int = 42):
+    """Campuran username normal dan username dengan pola bot"""
+    rng = random.Random(seed)
+    letters = string.ascii_lowercase
+    usernames = []
+    for _ in range(count):
+        kind = rng.random()
+        name = ''.join(rng.choices(letters, k=rng.randint(3, 12)))
+        if kind < 0.15:
+            name += str(rng.randint(1000, 99999999))
+        elif kind < 0.2:
+            name = f"{rng.choice(['user', 'bot', 'account'])}{rng.randint(1, 99999)}"
+        elif kind < 0.25:
+            name = f"{rng.randint(1, 99)}{name}{rng.randint(1, 99)}"
+        elif kind < 0.5:
+            name += '_' + ''.join(rng.choices(letters, k=rng.randint(2, 6)))
+        usernames.append(name)
+    return usernames
+
+
+def generate_bios(count: int, seed: int = 42):
+    """Bio dengan 0-4 link"""
+    rng = random.Random(seed)
+    words = ['berita', 'terkini', 'jakarta', 'info', 'promo', 'follow', 'kopi', 'dm']
+    bios = []
+    for _ in range(count):
+        parts = rng.choices(words, k=rng.randint(3, 10))
+        parts += [f"https://{rng.choice(words)}.com/{rng.randint(1, 9999)}?ref=bio" for _ in range(rng.randint(0, 4))]
+        rng.shuffle(parts)
+        bios.append(' '.join(parts))
+    return bios
+
+
+def legacy_username_match(username: str) -> bool:
+    for pattern in LEGACY_USERNAME_PATTERNS:
+        if re.match(pattern, username, re.IGNORECASE):
+            return True
+    return False
+
+
+def timed(label: str, func, items):
+    start = time.perf_counter()
+    matches = sum(1 for item in items if func(item))
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed:7.2f} s  {len(items) / elapsed:>12,.0f} /s  ({matches:,} cocok)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark regex pola bot")
+    parser.add_argument("--usernames", type=int, default=1_000_000, help="Jumlah username")
+    parser.add_argument("--bios", type=int, default=200_000, help="Jumlah bio")
+    args = parser.parse_args()
+
+    matcher = BotPatternMatcher()
+
+    print(f"🔄 Username ({args.usernames:,})")
+    usernames = generate_usernames(args.usernames)
+    legacy = timed("pola terpisah (re.match)", legacy_username_match, usernames)
+    combined = timed("alternation gabungan", matcher.username_pattern, usernames)
+    print(f"  ⚡ {legacy / combined:.1f}x lebih cepat")
+
+    print(f"\n🔄 URL di bio ({args.bios:,})")
+    bios = generate_bios(args.bios)
+    legacy = timed("regex URL lama", lambda bio: len(re.findall(LEGACY_URL_PATTERN, bio)) > 2, bios)
+    fixed = timed("regex URL baru", lambda bio: matcher.url_count(bio) > 2, bios)
+    print(f"  ⚡ {legacy / fixed:.1f}x lebih cepat")
+
+if __name__ == "__main__":
+    main()
@@ -40,6 +40,44 @@ def run_telegram_bot():
         print(f"Error running telegram bot: {e}")
         sys.exit(1)
 
+def run_worker(num_workers: int = 1):
+    """Run worker antrian analisis (N proses terpisah dari web server)"""
+    try:
+        from app.worker import main as worker_main
+        
+        print(f"⚙️  Starting {num_workers} analysis worker(s)...")
+        if num_workers <= 1:
+            worker_main()
+            return
+        
+        import multiprocessing
+        context = multiprocessing.get_context("spawn")
+        processes = [context.Process(target=worker_main) for _ in range(num_workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"Error running worker: {e}")
+        sys.exit(1)
+
+def train_prescreen():
+    """Latih ulang model pra-klasifikasi dari verdict OpenAI yang tersimpan"""
+    try:
+        from app.analysis import openai_service
+        
+        print("🧠 Training pre-screen model...")
+        openai_service.prescreen.retrain()
+        prescreen = openai_service.prescreen
+        print(f"✅ Model saved to {prescreen.model_path} ({prescreen.training_size} LLM verdicts)")
+        if prescreen.training_size < prescreen.min_training_verdicts:
+            print(f"⚠️  Model belum dipakai: butuh minimal {prescreen.min_training_verdicts} verdict LLM")
+    except Exception as e:
+        print(f"Error training pre-screen model: {e}")
+        sys.exit(1)
+
 def run_both():
     """Run both web server and telegram bot"""
     import threading
@@ -60,10 +98,16 @@ def main():
     parser = argparse.ArgumentParser(description="Twitter Hoax Detector")
     parser.add_argument(
         "--mode", 
-        choices=["web", "telegram", "both"], 
+        choices=["web", "telegram", "both", "worker", "train-prescreen"], 
         default="web",
         help="Mode to run the application"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes (mode worker)"
+    )
     
     args = parser.parse_args()
     
@@ -86,6 +130,10 @@ def main():
     elif args.mode == "both":
         print("🚀 Starting both Web Server and Telegram Bot...")
         run_both()
+    elif args.mode == "worker":
+        run_worker(args.workers)
+    elif args.mode == "train-prescreen":
+        train_prescreen()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file